@@ -1,87 +1,349 @@
+import time
+from contextlib import nullcontext
+
 import streamlit as st
-from jobspy import scrape_jobs
 import pandas as pd
-import requests
-from urllib.parse import quote
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import yaml
+import cassette
 import company_monitor
+import compaction
+import global_search
+import instrumentation
+import link_cache
+from linkedin import add_linkedin_columns
+import rate_limiter
+import results_archive
+import scrape_cache
+import search_index
+import single_flight
+import task_runner
+
+SEARCH_DISPLAY_COLS = [
+    'change', 'first_seen', 'score',
+    'title', 'company', 'location', 'date_posted', 'job_type',
+    'interval', 'min_amount', 'max_amount', 'is_remote',
+    'emails', 'site', 'sources', 'job_url', 'job_url_direct', 'source',
+    'url_status', 'best_url', 'find_recruiter', 'find_manager', 'find_team',
+]
+WATCHLIST_DISPLAY_COLS = [
+    'change', 'first_seen',
+    'title', 'company', 'location', 'date_posted', 'job_url', 'site',
+    'find_recruiter', 'find_manager', 'find_team',
+]
+HISTORY_DEFAULT_COLS = ['scraped_at', 'title', 'company', 'location', 'date_posted', 'site', 'job_url']
+HISTORY_MAX_ROWS = 5000
+TASK_POLL_SECONDS = 1.0
+ARCHIVE_CACHE_SECONDS = 60
+
+
+def submit_task(session_key, fn, label, **kwargs):
+    """Start fn(**kwargs) as a background task owned by this session, replacing its previous one."""
+    runner = task_runner.get_runner()
+    previous = runner.get(st.session_state.get(session_key))
+    if previous is not None and previous.active:
+        previous.cancel()
+    st.session_state[session_key] = runner.submit(fn, label=label, **kwargs).id
+
+
+@st.cache_data(ttl=ARCHIVE_CACHE_SECONDS, show_spinner=False)
+def archive_stats():
+    """Archive size, cached briefly: listing the files of a large archive takes a while."""
+    return results_archive.get_archive().stats()
+
+
+@st.cache_data(ttl=ARCHIVE_CACHE_SECONDS, show_spinner=False)
+def load_history(columns, company, title, sites, days):
+    """Archived postings matching the History filters, cached briefly across sessions."""
+    return results_archive.get_archive().query(
+        columns=list(columns), company=company, title=title, sites=list(sites), days=days,
+        limit=HISTORY_MAX_ROWS,
+    )
 
 
-def build_linkedin_url(keywords):
-    """Build a LinkedIn people search URL from keywords."""
-    return f"https://www.linkedin.com/search/results/people/?keywords={quote(keywords)}"
-
-
-def add_linkedin_columns(df):
-    """Add LinkedIn people search columns to a DataFrame with job results."""
-    if df.empty:
-        return df
-
-    def _recruiter(row):
-        company = str(row.get('company', '') or '')
-        loc = str(row.get('location', '') or '')
-        if not company:
-            return None
-        return build_linkedin_url(f"recruiter {company} {loc}".strip())
-
-    def _hiring_mgr(row):
-        company = str(row.get('company', '') or '')
-        loc = str(row.get('location', '') or '')
-        if not company:
-            return None
-        return build_linkedin_url(f"hiring manager {company} {loc}".strip())
-
-    def _team(row):
-        company = str(row.get('company', '') or '')
-        title = str(row.get('title', '') or '')
-        if not company:
-            return None
-        return build_linkedin_url(f"{title} {company}".strip())
-
-    df['find_recruiter'] = df.apply(_recruiter, axis=1)
-    df['find_manager'] = df.apply(_hiring_mgr, axis=1)
-    df['find_team'] = df.apply(_team, axis=1)
-    return df
-
-def check_url(row):
-    """Check if the direct application URL returns a valid response."""
-    direct_url = row.get('job_url') # We check the main URL now
-
-    result = {'index': row.name, 'status': None, 'url_to_use': None}
-
-    if pd.isna(direct_url) or not direct_url:
-        result['status'] = 'Missing Link'
-        return result
-
-    headers = company_monitor.DEFAULT_HEADERS
-
-    try:
-        # Use GET with stream=True to be more reliable than HEAD for some ATS
-        resp = requests.get(str(direct_url), headers=headers, timeout=10, stream=True)
-
-        # Check for soft 404s (redirects to error pages)
-        final_url_lower = resp.url.lower()
-        error_keywords = ['error', 'expired', 'notfound', 'job-closed', 'job_closed']
-
-        if any(keyword in final_url_lower for keyword in error_keywords):
-            result['status'] = 'Unavailable (Redirected)'
-            result['url_to_use'] = resp.url
-        elif resp.status_code == 200:
-            result['status'] = '200 OK'
-            result['url_to_use'] = resp.url
+def refresh_archive_views(session_keys):
+    """
+    Drop the cached archive stats and history once one of this session's tasks
+    has finished, since it may have archived new results.
+    """
+    runner = task_runner.get_runner()
+    for session_key in session_keys:
+        task = runner.get(st.session_state.get(session_key))
+        if task is not None and not task.active and st.session_state.get(f"{session_key}_archived") != task.id:
+            st.session_state[f"{session_key}_archived"] = task.id
+            archive_stats.clear()
+            load_history.clear()
+
+
+def poll_task(session_key, show_result, show_partial=None):
+    """
+    Show this session's task under `session_key`: progress, a Cancel button and any
+    partial results while it runs, then show_result(task) once it has finished.
+    While the task is active only this fragment re-runs, once a second, so the rest
+    of the page stays usable; a full rerun follows when the task finishes.
+    """
+    task = task_runner.get_runner().get(st.session_state.get(session_key))
+    if task is None:
+        return
+    was_active = task.active
+
+    @st.fragment(run_every=TASK_POLL_SECONDS if was_active else None)
+    def _view():
+        if not task.active:
+            if was_active:
+                st.rerun()
+            show_result(task)
+            return
+        fraction = task.done / task.total if task.total else 0.0
+        st.progress(min(fraction, 1.0), text=task.message or f"{task.label}...")
+        if st.button("Cancel", key=f"cancel_{session_key}", disabled=task.cancel_requested):
+            task.cancel()
+        if show_partial is not None and task.partial is not None:
+            show_partial(task.partial)
+
+    _view()
+
+
+def show_jobs(jobs, key=None):
+    """
+    Render Global Search results (partial or final). With a key, rows can be
+    selected to show their description.
+    """
+    existing_cols = [c for c in SEARCH_DISPLAY_COLS if c in jobs.columns]
+    selectable = dict(on_select="rerun", selection_mode="single-row", key=key) if key else {}
+    # Only final tables are timed: partial ones are redrawn every second while a search runs
+    with instrumentation.stage('render', target='search', rows=len(jobs)) if key else nullcontext():
+        event = st.dataframe(
+            jobs[existing_cols],
+            column_config={
+                "score": st.column_config.NumberColumn("Relevance", format="%.2f"),
+                "job_url": st.column_config.LinkColumn("Job Board", display_text="View Posting"),
+                "job_url_direct": st.column_config.LinkColumn("Direct Link", display_text="Apply Direct"),
+                "find_recruiter": st.column_config.LinkColumn("Recruiter", display_text="Search"),
+                "find_manager": st.column_config.LinkColumn("Hiring Mgr", display_text="Search"),
+                "find_team": st.column_config.LinkColumn("Team", display_text="Search"),
+            },
+            use_container_width=True,
+            **selectable
+        )
+    if key:
+        show_selected_description(jobs, event.selection.rows)
+
+
+def show_selected_description(jobs, rows):
+    """Description of the selected row, loaded from the description store only now."""
+    if not rows:
+        st.caption("Select a row to read its description.")
+        return
+    job = compaction.with_descriptions(jobs.iloc[rows[:1]]).iloc[0]
+    with st.expander(f"{job.get('title')} at {job.get('company')}", expanded=True):
+        description = job.get('description')
+        st.markdown(description if isinstance(description, str) and description else "_No description._")
+
+
+def show_search_results(task):
+    """Final view of a finished Global Search task."""
+    if task.status == 'cancelled':
+        st.info("Search cancelled.")
+        return
+    if task.status == 'failed':
+        st.error(f"An error occurred: {task.error}")
+        return
+    jobs = task.result
+    new_only = task.params.get('new_only')
+    for message in jobs.attrs.get('errors', []):
+        st.warning(message)
+    if new_only:
+        show_delta_summary(jobs, jobs.attrs.get('disappeared', []))
+    coverage = jobs.attrs.get('coverage')
+    if coverage:
+        show_coverage(coverage)
+    if jobs.attrs.get('shards'):
+        show_shard_report(jobs.attrs['shards'])
+
+    if jobs.empty:
+        st.warning("No new jobs since the last scan." if new_only
+                   else "No jobs found with the current parameters.")
+        show_performance(jobs.attrs.get('timings', []))
+        return
+    st.success(f"Found {len(jobs)} jobs!")
+    show_jobs(jobs, key="search_results_table")
+
+    csv = compaction.with_descriptions(jobs).to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Download Results as CSV",
+        data=csv,
+        file_name='job_search_results.csv',
+        mime='text/csv',
+    )
+    show_performance(jobs.attrs.get('timings', []))
+
+
+def show_watchlist_results(task):
+    """Final view of a finished watchlist scan task."""
+    if task.status == 'cancelled':
+        st.info("Scan cancelled.")
+        return
+    if task.status == 'failed':
+        st.error(f"Error scanning aggregators: {task.error}")
+        return
+    agg_jobs = task.result
+    new_only = task.params.get('new_only')
+
+    query_plan = agg_jobs.attrs.get('query_plan')
+    if query_plan:
+        st.caption(company_monitor.describe_query_plan(query_plan))
+
+    if agg_jobs.attrs.get('shards'):
+        show_shard_report(agg_jobs.attrs['shards'])
+
+    if new_only:
+        show_delta_summary(agg_jobs, agg_jobs.attrs.get('disappeared', []))
+
+    if agg_jobs.empty:
+        st.info("No new jobs since the last scan." if new_only
+                else "No jobs found matching your filters.")
+        show_performance(agg_jobs.attrs.get('timings', []))
+        return
+    st.success(f"Found {len(agg_jobs)} jobs!")
+    with instrumentation.stage('linkedin', target='watchlist', rows=len(agg_jobs)):
+        agg_jobs = add_linkedin_columns(agg_jobs)
+    existing_cols = [c for c in WATCHLIST_DISPLAY_COLS if c in agg_jobs.columns]
+    with instrumentation.stage('render', target='watchlist', rows=len(agg_jobs)):
+        event = st.dataframe(
+            agg_jobs[existing_cols],
+            column_config={
+                "job_url": st.column_config.LinkColumn("Apply Link", display_text="View Posting"),
+                "find_recruiter": st.column_config.LinkColumn("Recruiter", display_text="Search"),
+                "find_manager": st.column_config.LinkColumn("Hiring Mgr", display_text="Search"),
+                "find_team": st.column_config.LinkColumn("Team", display_text="Search"),
+            },
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="watchlist_results_table"
+        )
+    show_selected_description(agg_jobs, event.selection.rows)
+    show_performance(agg_jobs.attrs.get('timings', []))
+
+
+def show_performance(timings):
+    """
+    Where a search or scan spent its time: per-stage wall time, rows, bytes and
+    errors of this run (per site and company or term), and latency percentiles
+    per stage and site accumulated over every run since the app started.
+    """
+    with st.expander("Performance"):
+        if timings:
+            stages = pd.DataFrame(timings)
+            total = stages.loc[stages['stage'] == 'total', 'seconds'].sum()
+            slowest = stages[stages['stage'] != 'total'].sort_values('seconds', ascending=False).head(1)
+            caption = f"Took {total:.1f}s"
+            if not slowest.empty:
+                caption += f"; slowest stage: {slowest.iloc[0]['stage']} ({slowest.iloc[0]['seconds']:.1f}s)"
+            st.caption(caption + ". Seconds add up over concurrent calls.")
+            stages['rows_per_s'] = (stages['rows'] / stages['seconds'].where(stages['seconds'] > 0)).round(0)
+            stages['mb'] = (stages['bytes'] / 1e6).round(2)
+            st.dataframe(
+                stages[['stage', 'site', 'target', 'calls', 'seconds', 'max_seconds', 'rows', 'rows_per_s', 'mb',
+                        'errors']],
+                column_config={
+                    "target": "Company / Term",
+                    "seconds": st.column_config.NumberColumn("Seconds", format="%.2f"),
+                    "max_seconds": st.column_config.NumberColumn("Slowest Call", format="%.2f"),
+                    "rows_per_s": "Rows/s",
+                    "mb": "MB",
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        st.markdown("**Latency percentiles across runs (seconds)**")
+        percentiles = instrumentation.get_recorder().percentiles()
+        if percentiles.empty:
+            st.caption("No timings yet.")
         else:
-            result['status'] = f"Status {resp.status_code}"
-            result['url_to_use'] = resp.url
-
-    except Exception:
-        result['status'] = 'Error'
+            st.dataframe(percentiles.round(3), hide_index=True, use_container_width=True)
+
+
+def show_coverage(coverage):
+    """Per-query report of an adaptive fetch: complete, or possibly truncated at the cap."""
+    truncated = [c for c in coverage if not c['complete']]
+    st.caption(f"Adaptive fetch: {len(coverage) - len(truncated)} of {len(coverage)} queries fully covered, "
+               f"{sum(c['fetches'] for c in coverage)} page fetches.")
+    with st.expander("Coverage by query", expanded=bool(truncated)):
+        if truncated:
+            st.warning(f"{len(truncated)} queries hit Max Results and may be missing postings.")
+        st.dataframe(pd.DataFrame(coverage), hide_index=True, use_container_width=True)
+
+
+def show_shard_report(shards):
+    """Per-shard report of a sharded search: postings each metro added over the unsharded query."""
+    metros = [s for s in shards if s['shard'] != 'unsharded']
+    useful = [s for s in metros if s['added']]
+    st.caption(f"Location sharding: {len(useful)} of {len(metros)} shards found postings "
+               f"the unsharded search missed.")
+    with st.expander("Postings added by shard"):
+        st.dataframe(pd.DataFrame(shards), hide_index=True, use_container_width=True)
+
+
+def show_delta_summary(jobs, disappeared):
+    """Summarize a "new since last scan" result and list postings that dropped off."""
+    counts = jobs['change'].value_counts() if 'change' in jobs.columns else {}
+    st.caption(f"{counts.get('new', 0)} new and {counts.get('changed', 0)} changed since the last scan, "
+               f"{len(disappeared)} no longer listed.")
+    if len(disappeared):
+        with st.expander("No longer listed"):
+            st.dataframe(pd.DataFrame(disappeared), use_container_width=True)
+
+
+@st.fragment
+def show_history(site_options):
+    """
+    The Archived Results filters and table. The archive is only queried when the
+    filters are submitted, and only this fragment re-runs then; the result stays
+    in the session for later reruns.
+    """
+    with st.form("history_filters"):
+        hist_company_col, hist_title_col = st.columns(2)
+        history_company = hist_company_col.text_input("Company contains", key="history_company")
+        history_title = hist_title_col.text_input("Title contains", key="history_title")
+        hist_sites_col, hist_days_col = st.columns(2)
+        history_sites = hist_sites_col.multiselect("Sites", options=site_options, default=[], key="history_sites")
+        history_days = hist_days_col.number_input("Last N days", min_value=1, max_value=3650, value=30,
+                                                  key="history_days")
+        history_cols = st.multiselect(
+            "Columns", options=[f.name for f in results_archive.ARCHIVE_SCHEMA] + ['site', 'scrape_date'],
+            default=HISTORY_DEFAULT_COLS, key="history_cols"
+        )
+        if st.form_submit_button("Show History"):
+            st.session_state['history'] = load_history(
+                tuple(history_cols or HISTORY_DEFAULT_COLS),
+                history_company.strip() or None,
+                history_title.strip() or None,
+                tuple(history_sites),
+                history_days,
+            )
+
+    history = st.session_state.get('history')
+    if history is None:
+        return
+    if history.empty:
+        st.info("No archived results match these filters.")
+    else:
+        st.caption(f"{len(history)} archived postings"
+                   + (f" (newest {HISTORY_MAX_ROWS} shown)" if len(history) >= HISTORY_MAX_ROWS else ""))
+        st.dataframe(
+            history,
+            column_config={
+                "job_url": st.column_config.LinkColumn("Apply Link", display_text="View Posting"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
 
-    return result
 
 st.set_page_config(page_title="Job Hunt", page_icon="🎯", layout="wide")
 
 st.title("🎯 Job Hunt")
+refresh_archive_views(["search_task", "watchlist_task"])
 
 # --- Shared Sidebar (applies to both tabs) ---
 with st.sidebar:
@@ -92,6 +354,17 @@ with st.sidebar:
     sites = st.multiselect("Sites to Scrape", options=site_options, default=["indeed", "linkedin"])
 
     max_results = st.number_input("Max Results (per site)", min_value=1, max_value=1000, value=20)
+    adaptive_fetch = st.checkbox(
+        "Adaptive Fetch", value=False,
+        help="Start with a small page and fetch more only while the board keeps returning full pages. "
+             "Max Results becomes the cap, and each query reports whether it got everything."
+    )
+
+    shard_locations = st.checkbox(
+        "Shard Broad Locations", value=False,
+        help="Also search a state or the whole country metro by metro, to get past the cap on results "
+             "a board returns for one query. Runs one extra query per metro area."
+    )
 
     days_old = st.number_input("Days Old", min_value=1, max_value=30, value=7)
     hours_old = days_old * 24
@@ -101,9 +374,105 @@ with st.sidebar:
 
     is_remote = st.checkbox("Remote Only", value=False)
 
+    new_only = st.checkbox(
+        "New Since Last Scan Only", value=False,
+        help="Only show postings that are new or changed since the last identical search or scan."
+    )
+
+    with st.expander("Result Cache"):
+        scrape_cache_store = scrape_cache.get_cache()
+        # Per session: passed to each search and scan, never set on the shared cache
+        use_scrape_cache = st.checkbox(
+            "Reuse cached results", value=True,
+            help="Serve your repeated searches from the on-disk cache instead of re-scraping."
+        )
+        cache_ttl_hours = st.number_input("Cache TTL (hours)", min_value=1,
+                                          max_value=scrape_cache.MAX_TTL // 3600,
+                                          value=scrape_cache.DEFAULT_TTL // 3600,
+                                          help="The oldest cached results your searches accept.")
+        cache_stats = scrape_cache_store.stats()
+        hit_col, miss_col = st.columns(2)
+        hit_col.metric("Hits", cache_stats['hits'])
+        miss_col.metric("Misses", cache_stats['misses'])
+        st.caption(f"{cache_stats['entries']} cached queries, {cache_stats['bytes'] / 1e6:.1f} MB")
+        link_cache_store = link_cache.get_cache()
+        link_stats = link_cache_store.stats()
+        st.caption(f"{link_stats['entries']} verified links cached "
+                   f"({link_stats['hits']} hits, {link_stats['misses']} misses)")
+        flight_stats = single_flight.stats()
+        scrape_flights = flight_stats.get('scrape_jobs', {}).get('coalesced', 0)
+        link_flights = flight_stats.get('check_url', {}).get('coalesced', 0)
+        st.caption(f"Shared with concurrent sessions: {scrape_flights} searches, {link_flights} link checks")
+        if st.button("Clear Cache", key="clear_scrape_cache"):
+            scrape_cache_store.clear()
+            link_cache_store.clear()
+            st.rerun()
+
+    with st.expander("History Archive"):
+        # Per session: passed to each search and scan, never set on the shared archive
+        archive_runs = st.checkbox(
+            "Archive every search and scan", value=True,
+            help="Append your results to the Parquet history shown in the Search History tab."
+        )
+        stats = archive_stats()
+        st.caption(f"{stats['rows']} archived rows in {stats['files']} files, "
+                   f"{stats['bytes'] / 1e6:.1f} MB")
+        if st.button("Compact Archive", key="compact_archive",
+                     help="Merge each day's files per site into one for faster history queries."):
+            results_archive.get_archive().compact()
+            archive_stats.clear()
+            load_history.clear()
+            st.rerun()
+
+    with st.expander("Rate Limits"):
+        limiters = rate_limiter.get_registry()
+        # Per session: passed to each search and scan, never set on the shared registry
+        use_rate_limits = st.checkbox(
+            "Adaptive rate limiting", value=True,
+            help="Pace each board and ATS host in your searches, slowing down when it answers 429 / blocked."
+        )
+        limiter_stats = limiters.stats()
+        if limiter_stats:
+            st.dataframe(
+                pd.DataFrame(limiter_stats).round({'rate': 2, 'paused_for': 1}),
+                column_config={
+                    "name": "Site",
+                    "rate": "Requests/s",
+                    "successes": "OK",
+                    "throttles": "Throttled",
+                    "paused_for": "Paused (s)",
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("No requests yet.")
+
+    with st.expander("Record / Replay"):
+        # Shared by every session, so it is chosen once per process, not from here
+        tape = cassette.get_cassette()
+        if tape is None:
+            st.caption("Off. Start the app with JOBHUNT_CASSETTE_MODE=record or replay to record every "
+                       "scrape and link check to a cassette, or replay them from it without network.")
+        else:
+            tape_stats = tape.stats()
+            st.caption(f"{tape.mode.title()} ({tape.latency} latency): {tape.path}")
+            st.caption(f"{tape_stats['scrapes']} searches ({tape_stats['rows']} rows, "
+                       f"{tape_stats['bytes'] / 1e6:.1f} MB) and {tape_stats['checks']} link checks recorded")
+            if tape.replaying:
+                st.caption(f"Replayed {tape_stats['hits']}, not recorded {tape_stats['misses']}")
+
+    with st.expander("Background Tasks"):
+        recent_tasks = task_runner.get_runner().tasks()[:10]
+        if not recent_tasks:
+            st.caption("No searches or scans yet.")
+        for recent in recent_tasks:
+            progress = f" ({recent.done}/{recent.total})" if recent.active and recent.total else ""
+            st.caption(f"{recent.label}: {recent.status}{progress}")
+
 
 # Create Tabs
-tab1, tab2 = st.tabs(["Global Search", "Dream Company Watchlist"])
+tab1, tab2, tab3 = st.tabs(["Global Search", "Dream Company Watchlist", "Search History"])
 
 with tab1:
     st.markdown("Search **Indeed, LinkedIn, Glassdoor, ZipRecruiter** simultaneously.")
@@ -114,118 +483,45 @@ with tab1:
         help="Enter multiple job titles separated by commas."
     )
     verify_links = st.checkbox("Verify Links", value=False, help="Check if the links are still valid (takes longer).")
+    fuzzy_dedup = st.checkbox(
+        "Match Similar Descriptions", value=False,
+        help="Also merge cross-site copies whose descriptions are near-identical (slower on large searches)."
+    )
+    top_k = st.number_input(
+        "Top Results", min_value=0, max_value=10000, value=0,
+        help="Results are sorted by relevance to the keywords; keep only this many (0 keeps all)."
+    )
 
-    # Main Search Logic
+    # Main Search Logic: the search runs as a background task and this page polls it
     if st.button("Search Jobs", type="primary", key="global_search_btn"):
         if not sites:
             st.error("Please select at least one site to scrape.")
         else:
-            with st.spinner(f"Searching for '{search_term}'..."):
-                try:
-                    search_terms = [t.strip() for t in search_term.split(',') if t.strip()]
-                    if not search_terms:
-                        search_terms = [""]
-
-                    combined_results = []
-                    status_text = st.empty()
-
-                    # 1. JobSpy Search
-                    job_type_list = job_types if job_types else [None]
-                    for term in search_terms:
-                        for j_type in job_type_list:
-                            label = f"'{term}'" + (f" ({j_type})" if j_type else "")
-                            status_text.text(f"Scraping Job Boards for {label}...")
-                            try:
-                                result = scrape_jobs(
-                                    site_name=sites,
-                                    search_term=term,
-                                    location=location,
-                                    results_wanted=max_results,
-                                    hours_old=hours_old,
-                                    job_type=j_type,
-                                    is_remote=is_remote,
-                                    country_indeed='USA',
-                                )
-                                combined_results.append(result)
-                            except Exception as inner_e:
-                                st.warning(f"JobSpy error for {label}: {inner_e}")
-
-                    status_text.empty()
-
-                    if combined_results:
-                        jobs = pd.concat(combined_results, ignore_index=True)
-                        jobs = jobs.drop_duplicates(subset=['job_url'], keep='first')
-                    else:
-                        jobs = pd.DataFrame()
-
-                    if jobs.empty:
-                        st.warning("No jobs found with the current parameters.")
-                    else:
-                        st.success(f"Found {len(jobs)} jobs!")
-
-                        # 4. Optional Link Verification
-                        if verify_links:
-                            st.info("Verifying links... this may take a moment.")
-                            progress_bar = st.progress(0)
-                            results = []
-                            total_jobs = len(jobs)
-                            jobs = jobs.reset_index(drop=True)
-
-                            with ThreadPoolExecutor(max_workers=10) as executor:
-                                futures = {executor.submit(check_url, row): idx for idx, row in jobs.iterrows()}
-                                completed_count = 0
-                                for future in as_completed(futures):
-                                    results.append(future.result())
-                                    completed_count += 1
-                                    progress_bar.progress(completed_count / total_jobs)
-
-                            if results:
-                                url_df = pd.DataFrame(results).set_index('index')
-                                jobs['url_status'] = url_df['status']
-                                jobs['best_url'] = url_df['url_to_use'] # Store the real URL
-
-                        display_cols = [
-                            'title', 'company', 'location', 'date_posted', 'job_type',
-                            'interval', 'min_amount', 'max_amount', 'is_remote',
-                            'emails', 'site', 'job_url', 'job_url_direct', 'source'
-                        ]
-
-                        if verify_links and 'url_status' in jobs.columns:
-                            display_cols.append('url_status')
-                            if 'best_url' in jobs.columns:
-                                display_cols.append('best_url') # Show the direct link column if we have it
-
-                        # Add 'source' col if not present
-                        if 'source' not in jobs.columns:
-                            jobs['source'] = 'Job Board'
-
-                        # Add LinkedIn people search links
-                        jobs = add_linkedin_columns(jobs)
-                        display_cols.extend(['find_recruiter', 'find_manager', 'find_team'])
-
-                        existing_cols = [c for c in display_cols if c in jobs.columns]
-
-                        st.dataframe(
-                            jobs[existing_cols],
-                            column_config={
-                                "job_url": st.column_config.LinkColumn("Job Board", display_text="View Posting"),
-                                "job_url_direct": st.column_config.LinkColumn("Direct Link", display_text="Apply Direct"),
-                                "find_recruiter": st.column_config.LinkColumn("Recruiter", display_text="Search"),
-                                "find_manager": st.column_config.LinkColumn("Hiring Mgr", display_text="Search"),
-                                "find_team": st.column_config.LinkColumn("Team", display_text="Search"),
-                            },
-                            use_container_width=True
-                        )
-
-                        csv = jobs.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            label="Download Results as CSV",
-                            data=csv,
-                            file_name='job_search_results.csv',
-                            mime='text/csv',
-                        )
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
+            search_terms = [t.strip() for t in search_term.split(',') if t.strip()]
+            if not search_terms:
+                search_terms = [""]
+            submit_task(
+                "search_task", global_search.run_search, f"Search for '{search_term}'",
+                sites=sites,
+                search_terms=search_terms,
+                job_types=job_types,
+                location=location,
+                hours_old=hours_old,
+                is_remote=is_remote,
+                max_results=max_results,
+                fuzzy_dedup=fuzzy_dedup,
+                new_only=new_only,
+                verify_links=verify_links,
+                adaptive=adaptive_fetch,
+                shard=shard_locations,
+                top_k=top_k or None,
+                use_cache=use_scrape_cache,
+                cache_ttl=cache_ttl_hours * 3600,
+                use_limiter=use_rate_limits,
+                archive=archive_runs,
+            )
+
+    poll_task("search_task", show_search_results, show_partial=show_jobs)
 
 with tab2:
     st.header("Dream Company Watchlist")
@@ -244,18 +540,7 @@ with tab2:
     if not agg_companies:
         st.info("No companies configured. Add one below!")
 
-    df_agg = pd.DataFrame(agg_companies) if agg_companies else pd.DataFrame(columns=["name", "keywords"])
-    # Drop legacy columns if present
-    for col in ['search_term', 'location']:
-        if col in df_agg.columns:
-            df_agg = df_agg.drop(columns=[col])
-    if 'keywords' in df_agg.columns and not df_agg.empty:
-        df_agg['keywords'] = df_agg['keywords'].apply(lambda x: ', '.join(x) if isinstance(x, list) else str(x))
-    else:
-        df_agg['keywords'] = ""
-    # Add scan checkbox column (default checked)
-    if 'scan' not in df_agg.columns:
-        df_agg.insert(0, 'scan', True)
+    df_agg = company_monitor.watchlist_frame()
 
     edited_df = st.data_editor(
         df_agg,
@@ -280,13 +565,22 @@ with tab2:
                 })
 
         config['aggregator_companies'] = cleaned_companies
-        with open("companies.yaml", "w") as f:
-            yaml.dump(config, f, sort_keys=False)
+        company_monitor.save_config(config)
 
         st.toast("Watchlist updated successfully!")
         st.rerun()
 
 
+    scan_workers = st.number_input(
+        "Parallel Company Scans", min_value=1, max_value=16,
+        value=company_monitor.DEFAULT_SCAN_WORKERS,
+        help="How many companies to scan at the same time."
+    )
+    keyword_index = st.checkbox(
+        "Match keywords with the full-text index", value=False,
+        help="Look filter keywords up in the index of scraped postings instead of scanning every title."
+    )
+
     if st.button("Scan Aggregators Now", type="secondary", key="agg_monitor_btn"):
         if not sites:
             st.error("Please select at least one site in the sidebar.")
@@ -301,34 +595,56 @@ with tab2:
             if not companies_to_scan:
                 st.warning("No companies selected to scan. Check the 'Scan' column for companies you want to include.")
             else:
-                with st.spinner("Scanning aggregators for target companies..."):
-                    try:
-                        agg_jobs = company_monitor.scrape_aggregator_companies(
-                            companies=companies_to_scan,
-                            sites=sites,
-                            location=location,
-                            hours_old=hours_old,
-                            results_wanted=max_results,
-                            job_type=job_types[0] if len(job_types) == 1 else None,
-                            is_remote=is_remote,
-                        )
-
-                        if agg_jobs.empty:
-                            st.info("No jobs found matching your filters.")
-                        else:
-                            st.success(f"Found {len(agg_jobs)} jobs!")
-                            agg_jobs = add_linkedin_columns(agg_jobs)
-                            display_cols = ['title', 'company', 'location', 'date_posted', 'job_url', 'site', 'find_recruiter', 'find_manager', 'find_team']
-                            existing_cols = [c for c in display_cols if c in agg_jobs.columns]
-                            st.dataframe(
-                                agg_jobs[existing_cols],
-                                column_config={
-                                    "job_url": st.column_config.LinkColumn("Apply Link", display_text="View Posting"),
-                                    "find_recruiter": st.column_config.LinkColumn("Recruiter", display_text="Search"),
-                                    "find_manager": st.column_config.LinkColumn("Hiring Mgr", display_text="Search"),
-                                    "find_team": st.column_config.LinkColumn("Team", display_text="Search"),
-                                },
-                                use_container_width=True
-                            )
-                    except Exception as e:
-                        st.error(f"Error scanning aggregators: {e}")
+                submit_task(
+                    "watchlist_task", company_monitor.scrape_aggregator_companies,
+                    f"Watchlist scan of {len(companies_to_scan)} companies",
+                    companies=companies_to_scan,
+                    sites=sites,
+                    location=location,
+                    hours_old=hours_old,
+                    results_wanted=max_results,
+                    job_types=job_types,
+                    max_workers=scan_workers,
+                    is_remote=is_remote,
+                    new_only=new_only,
+                    adaptive=adaptive_fetch,
+                    shard=shard_locations,
+                    keyword_index=keyword_index,
+                    use_cache=use_scrape_cache,
+                    cache_ttl=cache_ttl_hours * 3600,
+                    use_limiter=use_rate_limits,
+                    archive=archive_runs,
+                )
+
+    poll_task("watchlist_task", show_watchlist_results)
+
+with tab3:
+    st.header("Search History")
+    st.markdown("Every search and watchlist scan is archived and indexed. Search every posting seen so far, "
+                "or filter past results by company, title, board and date.")
+
+    fulltext = st.text_input(
+        "Search titles and descriptions", key="history_fulltext",
+        placeholder='e.g. "cell culture" python sci*',
+        help='All words must match (stemmed); use "quotes" for phrases and * for prefixes.'
+    )
+    if fulltext.strip():
+        job_index = search_index.get_index()
+        search_started = time.perf_counter()
+        matches = job_index.search(fulltext, limit=HISTORY_MAX_ROWS)
+        search_ms = (time.perf_counter() - search_started) * 1000
+        st.caption(f"{len(matches)} matches in {search_ms:.0f} ms across "
+                   f"{job_index.stats()['postings']} indexed postings")
+        if not matches.empty:
+            st.dataframe(
+                matches,
+                column_config={
+                    "job_url": st.column_config.LinkColumn("Apply Link", display_text="View Posting"),
+                    "score": st.column_config.NumberColumn("Score", format="%.1f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+    st.subheader("Archived Results")
+    show_history(site_options)
@@ -0,0 +1,83 @@
+"""
+Benchmark: the Parquet results archive at scale (default 2M rows over 60 days).
+Fills a temporary archive with one run per (day, site), then times a
+pushdown query ("Company 7 in the last 30 days, title + date only") against a
+full read and against pandas filtering a CSV of the same rows.
+
+    python bench_archive.py --rows 2000000 --days 60 --csv
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import results_archive
+
+SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter"]
+TITLES = ["Research Scientist", "Research Associate", "Lab Technician", "Data Scientist", "Chemist"]
+COMPANIES = np.array([f"Company {i}" for i in range(2000)])
+
+
+def make_run(rows, site, day, rng):
+    return pd.DataFrame({
+        'site': site,
+        'job_url': [f"https://{site}.example/{day:%Y%m%d}/{i}" for i in range(rows)],
+        'title': rng.choice(TITLES, rows),
+        'company': rng.choice(COMPANIES, rows),
+        'location': "Atlanta, GA",
+        'date_posted': day,
+        'min_amount': rng.integers(50_000, 150_000, rows).astype(float),
+        'description': "Lorem ipsum " * 40,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--csv", action="store_true", help="Also time filtering the same rows from a CSV")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    per_run = max(1, args.rows // (args.days * len(SITES)))
+    today = datetime.date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = results_archive.ResultsArchive(path=os.path.join(tmp, "archive"))
+        frames = []
+        start = time.perf_counter()
+        for offset in range(args.days):
+            day = today - datetime.timedelta(days=offset)
+            for site in SITES:
+                run = make_run(per_run, site, day, rng)
+                archive.append(run, query={'kind': 'bench'}, now=datetime.datetime.combine(day, datetime.time()))
+                if args.csv:
+                    frames.append(run.assign(scrape_date=day.isoformat()))
+        append_time = time.perf_counter() - start
+        stats = archive.stats()
+        print(f"append: {append_time:6.2f}s for {stats['rows']} rows in {stats['files']} files "
+              f"({stats['bytes'] / 1e6:.1f} MB)")
+
+        start = time.perf_counter()
+        hits = archive.query(columns=['title', 'date_posted'], company="Company 7", days=30)
+        print(f"query(company, last 30 days, 2 columns): {time.perf_counter() - start:6.3f}s -> {len(hits)} rows")
+
+        start = time.perf_counter()
+        everything = archive.query()
+        print(f"query() full read:                       {time.perf_counter() - start:6.3f}s -> {len(everything)} rows")
+
+        if args.csv:
+            csv_path = os.path.join(tmp, "jobs.csv")
+            pd.concat(frames, ignore_index=True).to_csv(csv_path, index=False)
+            start = time.perf_counter()
+            jobs = pd.read_csv(csv_path)
+            since = (today - datetime.timedelta(days=30)).isoformat()
+            jobs = jobs[jobs['company'].str.contains("Company 7", case=False) & (jobs['scrape_date'] >= since)]
+            print(f"read_csv + filter:                       {time.perf_counter() - start:6.3f}s -> {len(jobs)} rows")
+
+
+if __name__ == "__main__":
+    main()
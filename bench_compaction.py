@@ -0,0 +1,92 @@
+"""
+Benchmark: memory of a session's result frames before and after compaction.
+Simulates a Global Search over 4 sites x --terms search terms with --results
+postings per query, where overlapping terms return some of the same postings,
+and compares the memory held by the per-query frames plus their concat as
+scraped against the compacted frames (descriptions in the side store,
+categorical columns), measured with tracemalloc.
+
+    python bench_compaction.py --terms 10 --results 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import compaction
+
+SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter"]
+TITLES = ["Research Scientist", "Research Associate", "Lab Technician", "Data Scientist", "Chemist"]
+COMPANIES = [f"Company {i}" for i in range(300)]
+CITIES = ["Atlanta, GA", "Athens, GA", "Savannah, GA", "Augusta, GA", "Remote"]
+WORDS = [f"word{i}" for i in range(3000)]
+
+
+def make_query_frames(terms, results, seed=0):
+    rng = random.Random(seed)
+    frames = []
+    for term in range(terms):
+        for site in SITES:
+            # Neighbouring terms share about half their postings
+            postings = [term * results // 2 + i for i in range(results)]
+            frames.append(pd.DataFrame({
+                'id': [f"{site}-{p}" for p in postings],
+                'site': site,
+                'job_url': [f"https://{site}.example/{p}" for p in postings],
+                'title': [f"{TITLES[p % len(TITLES)]} {p % 7}" for p in postings],
+                'company': [COMPANIES[p % len(COMPANIES)] for p in postings],
+                'location': [CITIES[p % len(CITIES)] for p in postings],
+                'job_type': "fulltime",
+                'interval': "yearly",
+                'min_amount': 90000.0,
+                'description': [" ".join(rng.choice(WORDS) for _ in range(400)) for _ in postings],
+            }))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=10)
+    parser.add_argument("--results", type=int, default=500)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    frames = make_query_frames(args.terms, args.results)
+    merged = pd.concat(frames, ignore_index=True)
+    before = tracemalloc.get_traced_memory()[0]
+    rows = len(merged)
+    del frames, merged
+    print(f"{args.terms * len(SITES)} queries, {rows} rows")
+    print(f"as scraped: {before / 1e6:8.1f} MB (query frames + concat)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compaction.set_store(compaction.DescriptionStore(path=os.path.join(tmp, "descriptions.sqlite")))
+        tracemalloc.stop()
+        tracemalloc.start()
+        compacted = []
+        compact_time = 0.0
+        # Each query frame is compacted as it arrives, as in the pipelines
+        for frame in make_query_frames(args.terms, args.results):
+            start = time.perf_counter()
+            compacted.append(compaction.compact_jobs(frame))
+            compact_time += time.perf_counter() - start
+            del frame
+        merged = compaction.concat_jobs(compacted)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"compacted:  {after / 1e6:8.1f} MB ({before / after:.1f}x smaller, "
+              f"compaction took {compact_time:.2f}s)")
+
+        store = compaction.get_store().stats()
+        print(f"description store: {store['entries']} descriptions, {store['bytes'] / 1e6:.1f} MB on disk")
+        start = time.perf_counter()
+        exported = compaction.with_descriptions(merged)
+        print(f"with_descriptions (export) for {len(exported)} rows: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: collapse_duplicates on synthetic cross-site results (default 100k rows).
+Each posting is listed on 1-3 sites with small formatting differences.
+
+    python bench_dedup.py --rows 100000 --minhash
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import dedup
+
+SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter"]
+TITLES = ["Research Scientist", "Research Associate", "Lab Technician", "Data Scientist", "Chemist"]
+COMPANIES = [f"Company {i}" for i in range(2000)]
+CITIES = ["Atlanta, GA", "Athens, GA", "Boston, MA", "Rahway, NJ", "Remote"]
+WORDS = [f"w{i}" for i in range(5000)]
+
+
+def make_jobs(rows, seed=0):
+    rng = random.Random(seed)
+    records = []
+    posting = 0
+    while len(records) < rows:
+        title = f"{rng.choice(TITLES)} {rng.choice(['I', 'II', 'III', 'Senior'])} {posting % 97}"
+        company = rng.choice(COMPANIES)
+        city = rng.choice(CITIES)
+        description = " ".join(rng.choice(WORDS) for _ in range(120))
+        for site in rng.sample(SITES, rng.randint(1, 3)):
+            records.append({
+                'site': site,
+                'title': title.upper() if site == "glassdoor" else title,
+                'company': company + (", Inc." if site == "linkedin" else ""),
+                'location': city + (", US" if site == "indeed" else ""),
+                'job_url': f"https://{site}.example/{posting}",
+                'job_url_direct': f"https://ats.example/{posting}" if site == "indeed" else None,
+                'min_amount': 90000 if site == "glassdoor" else np.nan,
+                'description': description,
+            })
+        posting += 1
+    return pd.DataFrame(records[:rows]), posting
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--minhash", action="store_true", help="Also link near-identical descriptions")
+    args = parser.parse_args()
+
+    jobs, postings = make_jobs(args.rows)
+    start = time.perf_counter()
+    exact = jobs.drop_duplicates(subset=['job_url'], keep='first')
+    url_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    collapsed = dedup.collapse_duplicates(jobs, use_minhash=args.minhash)
+    dedup_time = time.perf_counter() - start
+
+    print(f"{len(jobs)} rows, {postings} distinct postings")
+    print(f"drop_duplicates(job_url): {url_time:6.2f}s -> {len(exact)} rows")
+    print(f"collapse_duplicates{' +minhash' if args.minhash else ''}: {dedup_time:6.2f}s -> {len(collapsed)} rows")
+
+
+if __name__ == "__main__":
+    main()
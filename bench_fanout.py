@@ -0,0 +1,73 @@
+"""
+Benchmark: serial term x job-type loop vs fanout.run_queries against a stubbed
+scrape_jobs with configurable latency. No network access needed.
+
+    python bench_fanout.py --latency 0.5 --terms 4 --job-types 3 --sites 4
+"""
+import argparse
+import time
+
+import pandas as pd
+
+import fanout
+
+
+def make_stub(latency, rows):
+    """Return a fake scrape_jobs that sleeps `latency` seconds per site and returns `rows` rows per site."""
+    def fake_scrape_jobs(site_name=None, search_term=None, job_type=None, **kwargs):
+        sites = site_name if isinstance(site_name, list) else [site_name]
+        frames = []
+        for site in sites:
+            # JobSpy scrapes the sites of one call in parallel, so latency is per call
+            frames.append(pd.DataFrame({
+                'site': site,
+                'title': [f"{search_term} {i}" for i in range(rows)],
+                'job_type': job_type,
+                'job_url': [f"https://example.com/{site}/{search_term}/{job_type}/{i}" for i in range(rows)],
+            }))
+        time.sleep(latency)
+        return pd.concat(frames, ignore_index=True)
+    return fake_scrape_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per scrape_jobs call")
+    parser.add_argument("--rows", type=int, default=20, help="Rows returned per site")
+    parser.add_argument("--terms", type=int, default=4)
+    parser.add_argument("--job-types", type=int, default=3)
+    parser.add_argument("--sites", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=fanout.DEFAULT_MAX_WORKERS)
+    parser.add_argument("--per-site", type=int, default=fanout.DEFAULT_PER_SITE_LIMIT)
+    args = parser.parse_args()
+
+    stub = make_stub(args.latency, args.rows)
+    sites = ["indeed", "linkedin", "glassdoor", "ziprecruiter", "google"][:args.sites]
+    terms = [f"term{i}" for i in range(args.terms)]
+    job_types = ["fulltime", "parttime", "contract", "internship", "temporary"][:args.job_types]
+
+    # Serial baseline: the original nested loop, all sites in one call
+    start = time.perf_counter()
+    serial = []
+    for term in terms:
+        for j_type in job_types:
+            serial.append(stub(site_name=sites, search_term=term, job_type=j_type))
+    serial_time = time.perf_counter() - start
+    serial_rows = len(pd.concat(serial, ignore_index=True))
+
+    start = time.perf_counter()
+    queries = fanout.build_queries(sites, terms, job_types)
+    frames, errors = fanout.run_queries(queries, scrape_fn=stub, max_workers=args.workers,
+                                        per_site_limit=args.per_site)
+    fanout_time = time.perf_counter() - start
+    fanout_rows = len(pd.concat(frames, ignore_index=True)) if frames else 0
+
+    print(f"{len(terms)} terms x {len(job_types)} job types x {len(sites)} sites, latency {args.latency}s")
+    print(f"serial : {serial_time:7.2f}s  {serial_rows} rows")
+    print(f"fanout : {fanout_time:7.2f}s  {fanout_rows} rows  ({len(queries)} queries, "
+          f"{args.workers} workers, {args.per_site}/site, {len(errors)} errors)")
+    print(f"speedup: {serial_time / fanout_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: the old per-row requests.get check (10 threads, no shared session)
+vs link_checker against local fake_ats servers. No network access needed.
+
+    python bench_link_checker.py --urls 2000 --slow-share 0.05
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import fake_ats
+import link_checker
+
+
+def legacy_check(url):
+    """The check_url logic app.py used before link_checker."""
+    try:
+        resp = requests.get(url, timeout=10, stream=True)
+        return link_checker.classify(resp.status_code, resp.url)
+    except Exception:
+        return 'Error'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=2000)
+    parser.add_argument("--gone-share", type=float, default=0.15, help="Share of soft-404 redirects")
+    parser.add_argument("--slow-share", type=float, default=0.05, help="Share of slow responses")
+    parser.add_argument("--slow-delay", type=float, default=0.5)
+    parser.add_argument("--hosts", type=int, default=8, help="Number of stand-in servers (distinct hosts)")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    servers = [fake_ats.start_server(slow_delay=args.slow_delay) for _ in range(args.hosts)]
+    rng = random.Random(0)
+    urls = []
+    for i in range(args.urls):
+        roll = rng.random()
+        kind = "gone" if roll < args.gone_share else "slow" if roll < args.gone_share + args.slow_share else "ok"
+        base = servers[i % len(servers)][1]
+        urls.append(f"{base}/{kind}/{i}")
+
+    if not args.skip_legacy:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            legacy = list(executor.map(legacy_check, urls))
+        legacy_time = time.perf_counter() - start
+        print(f"legacy      : {legacy_time:7.2f}s  {len(urls) / legacy_time:8.0f} URLs/s  "
+              f"({legacy.count('Error')} errors)")
+
+    for server, _ in servers:
+        server.requests.clear()
+    start = time.perf_counter()
+    results = link_checker.verify_urls(urls, use_cache=False)
+    engine_time = time.perf_counter() - start
+    statuses = [r['status'] for r in results.values()]
+    requests_by_method = {}
+    for server, _ in servers:
+        for method, count in server.requests.items():
+            requests_by_method[method] = requests_by_method.get(method, 0) + count
+        server.shutdown()
+    print(f"link_checker: {engine_time:7.2f}s  {len(urls) / engine_time:8.0f} URLs/s  "
+          f"({statuses.count('Error')} errors, requests by method: {requests_by_method})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: row-wise vs vectorized add_linkedin_columns at 1k/10k/100k rows.
+
+    python bench_linkedin.py --sizes 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from linkedin import add_linkedin_columns
+from test_linkedin import _reference as rowwise_add_linkedin_columns
+
+COMPANIES = ["Pfizer", "Johnson & Johnson", "Boehringer Ingelheim", "Emory University", "Merck", None]
+LOCATIONS = ["Atlanta, GA", "Athens, GA", "Remote", "New York, NY", None]
+TITLES = ["Research Scientist", "Research Associate", "Sr. Scientist, R&D", "Lab Technician", "Data Scientist"]
+
+
+def make_jobs(n, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        'title': [f"{rng.choice(TITLES)} {rng.randint(1, 50)}" for _ in range(n)],
+        'company': [rng.choice(COMPANIES) for _ in range(n)],
+        'location': [rng.choice(LOCATIONS) for _ in range(n)],
+    })
+
+
+def _time(fn, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'row-wise':>10}  {'vectorized':>10}  speedup")
+    for n in args.sizes:
+        df = make_jobs(n)
+        assert add_linkedin_columns(df.copy()).equals(rowwise_add_linkedin_columns(df.copy()))
+        old = _time(rowwise_add_linkedin_columns, df, args.repeat)
+        new = _time(add_linkedin_columns, df, args.repeat)
+        print(f"{n:>8}  {old * 1000:>8.1f}ms  {new * 1000:>8.1f}ms  {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
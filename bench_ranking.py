@@ -0,0 +1,66 @@
+"""
+Benchmark: relevance ranking of a large merged result set.
+Builds --rows postings with --words-per-description random words (plus a few
+query words sprinkled in) and times ranking.rank_jobs for a multi-term search,
+once with the descriptions in the frame and once for a compacted frame whose
+descriptions are loaded from the description store, as in Global Search.
+
+    python bench_ranking.py --rows 50000 --top-k 100
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+import compaction
+import ranking
+
+TITLES = ["Research Scientist", "Research Associate", "Lab Technician", "Data Scientist", "Chemist",
+          "Sales Representative", "Clinical Research Coordinator"]
+QUERY_WORDS = ["research", "scientist", "laboratory", "assay", "cell", "biology", "lab", "collaborate"]
+WORDS = [f"word{i}" for i in range(3000)]
+
+
+def make_jobs(rows, words_per_description, seed=0):
+    rng = random.Random(seed)
+    vocabulary = WORDS + QUERY_WORDS
+    return pd.DataFrame({
+        'job_url': [f"https://board.example/{i}" for i in range(rows)],
+        'title': [f"{rng.choice(TITLES)} {i % 3 or ''}".strip() for i in range(rows)],
+        'company': [f"Company {i % 300}" for i in range(rows)],
+        'description': [" ".join(rng.choices(vocabulary, k=words_per_description)) for _ in range(rows)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--words-per-description", type=int, default=400)
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--terms", default="research scientist, lab technician, cell biology")
+    args = parser.parse_args()
+
+    search_terms = [t.strip() for t in args.terms.split(',') if t.strip()]
+    jobs = make_jobs(args.rows, args.words_per_description)
+    text_mb = jobs['description'].str.len().sum() / 1e6
+    print(f"{len(jobs)} rows, {text_mb:.0f} MB of descriptions, terms {search_terms}")
+
+    start = time.perf_counter()
+    ranked = ranking.rank_jobs(jobs, search_terms, top_k=args.top_k)
+    print(f"rank_jobs, descriptions in frame:   {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compaction.set_store(compaction.DescriptionStore(path=os.path.join(tmp, "descriptions.sqlite")))
+        compacted = compaction.compact_jobs(jobs)
+        start = time.perf_counter()
+        ranking.rank_jobs(compacted, search_terms, top_k=args.top_k)
+        print(f"rank_jobs, descriptions from store: {time.perf_counter() - start:.2f}s")
+
+    print(ranked[['score', 'title']].head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Offline benchmark suite: end-to-end Global Search, watchlist scan, link
+verification and post-processing (merge + dedup, ranking, LinkedIn columns)
+at several scales, compared against stored baselines.
+
+scrape_jobs is replaced by fake_board (configurable latency and size) and job
+links point at local fake_ats servers (200s, soft-404 redirects, slow hosts,
+HEAD-refusing pages, 429s), so nothing touches the network. Every measurement
+runs against fresh caches and stores in a temporary directory, so it never
+reads or pollutes the app's .cache.
+
+    python bench_suite.py                           # small + medium vs baselines
+    python bench_suite.py --scales large --repeat 1
+    python bench_suite.py --update-baseline         # record this machine's numbers
+
+Each scenario is run --repeat times and its fastest time is compared with
+bench_baselines.json: a scenario more than --tolerance slower than its
+baseline (and by more than --min-delta seconds) is a regression, and the run
+exits with status 1. Timings depend on the machine, so record baselines on the
+machine that checks against them.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+
+import pandas as pd
+
+import company_monitor
+import compaction
+import fake_ats
+import fake_board
+import global_search
+import isolation
+import link_checker
+import ranking
+import scrape_cache
+from linkedin import add_linkedin_columns
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baselines.json")
+DEFAULT_TOLERANCE = 0.5  # 50% slower than the baseline fails the run
+DEFAULT_MIN_DELTA = 0.05  # seconds; differences below this are noise
+SITES = ["indeed", "linkedin", "glassdoor", "zip_recruiter"]
+SEARCH_TERMS = ["research scientist", "research associate", "lab technician", "data scientist",
+                "chemist", "process engineer", "clinical research", "sales representative"]
+
+SCALES = {
+    'small': {
+        'search': dict(sites=2, terms=2, rows=50, latency=0.02),
+        'watchlist': dict(companies=10, sites=3, rows=20, latency=0.02),
+        'verify': dict(urls=200, hosts=4),
+        'postprocess': dict(rows=2000),
+    },
+    'medium': {
+        'search': dict(sites=4, terms=4, rows=200, latency=0.05),
+        'watchlist': dict(companies=40, sites=3, rows=50, latency=0.05),
+        'verify': dict(urls=1000, hosts=8),
+        'postprocess': dict(rows=20000),
+    },
+    'large': {
+        'search': dict(sites=4, terms=8, rows=500, latency=0.1),
+        'watchlist': dict(companies=100, sites=3, rows=100, latency=0.1),
+        'verify': dict(urls=3000, hosts=8),
+        'postprocess': dict(rows=50000),
+    },
+}
+
+
+def isolate(tmp):
+    """Point every cache and store at a fresh directory and turn off pacing (see isolation)."""
+    for holder, instance in isolation.fresh_stores(tmp):
+        holder.set(instance)
+
+
+def bench_search(sites, terms, rows, latency):
+    """End-to-end Global Search: fan-out, index, compact, merge + dedup, archive, rank, LinkedIn columns."""
+    scrape_cache.scrape_jobs = fake_board.make_scrape_jobs(latency=latency, available=rows)
+    start = time.perf_counter()
+    jobs = global_search.run_search(SITES[:sites], SEARCH_TERMS[:terms], location="Georgia", max_results=rows)
+    return time.perf_counter() - start, len(jobs)
+
+
+def bench_watchlist(companies, sites, rows, latency):
+    """End-to-end watchlist scan with OR batching, routing, keyword filtering and archiving."""
+    fake = fake_board.make_scrape_jobs(latency=latency, available=rows, company_search=True)
+    scrape_cache.scrape_jobs = fake
+    company_monitor.scrape_jobs = fake
+    watchlist = [{'name': f"Company {i}", 'keywords': ["research", "scientist"] if i % 2 else []}
+                 for i in range(companies)]
+    sites = ["indeed", "linkedin", "glassdoor"][:sites]
+    start = time.perf_counter()
+    jobs = company_monitor.scrape_aggregator_companies(watchlist, sites=sites, location="Georgia",
+                                                       results_wanted=rows)
+    return time.perf_counter() - start, len(jobs)
+
+
+def bench_verify(urls, hosts):
+    """Link verification against local ATS stand-ins with a mix of live, expired, slow and limited pages."""
+    servers = [fake_ats.start_server(slow_delay=0.2, rate_limit=200) for _ in range(hosts)]
+    try:
+        fake = fake_board.make_scrape_jobs(available=urls, base_urls=[base for _, base in servers])
+        links = fake(site_name=["indeed"], search_term="bench", results_wanted=urls)['job_url'].tolist()
+        start = time.perf_counter()
+        results = link_checker.verify_urls(links)
+        return time.perf_counter() - start, len(results)
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def bench_postprocess(rows):
+    """Merge + cross-site dedup (with description MinHash), BM25 ranking and LinkedIn columns."""
+    per_site = rows // len(SITES)
+    fake = fake_board.make_scrape_jobs(available=per_site, universe=max(per_site * 2, 1000))
+    frames = [compaction.compact_jobs(fake(site_name=[site], search_term="research scientist",
+                                           results_wanted=per_site)) for site in SITES]
+    start = time.perf_counter()
+    jobs = global_search.merge_results(frames, use_minhash=True)
+    jobs = ranking.rank_jobs(jobs, ["research scientist", "lab technician"])
+    jobs = add_linkedin_columns(jobs)
+    return time.perf_counter() - start, len(jobs)
+
+
+SCENARIOS = {
+    'search': bench_search,
+    'watchlist': bench_watchlist,
+    'verify': bench_verify,
+    'postprocess': bench_postprocess,
+}
+
+
+def run_suite(scales, scenarios=None, repeat=3):
+    """{'<scale>/<scenario>': {'seconds', 'rows', 'rows_per_s'}}, the fastest of `repeat` runs each."""
+    results = {}
+    for scale in scales:
+        for name, params in SCALES[scale].items():
+            if scenarios and name not in scenarios:
+                continue
+            timings = []
+            for _ in range(max(1, repeat)):
+                with tempfile.TemporaryDirectory() as tmp:
+                    isolate(tmp)
+                    timings.append(SCENARIOS[name](**params))
+            seconds, rows = min(timings)
+            results[f"{scale}/{name}"] = {'seconds': round(seconds, 4), 'rows': rows,
+                                          'rows_per_s': round(rows / seconds, 1) if seconds else None}
+            print(f"{scale + '/' + name:<22} {seconds:8.3f}s {rows:8d} rows", flush=True)
+    return results
+
+
+def compare(results, baselines, tolerance=DEFAULT_TOLERANCE, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Compare results with baselines. Returns a DataFrame with one row per
+    scenario and a 'status' of ok, regression, faster, new or rows changed.
+    """
+    rows = []
+    for key, result in results.items():
+        base = baselines.get(key)
+        row = {'scenario': key, 'seconds': result['seconds'], 'rows': result['rows'],
+               'baseline': base['seconds'] if base else None, 'ratio': None}
+        if base is None:
+            row['status'] = 'new'
+        else:
+            row['ratio'] = round(result['seconds'] / base['seconds'], 2) if base['seconds'] else None
+            slower = result['seconds'] - base['seconds']
+            if slower > min_delta and result['seconds'] > base['seconds'] * (1 + tolerance):
+                row['status'] = 'regression'
+            elif -slower > min_delta and base['seconds'] > result['seconds'] * (1 + tolerance):
+                row['status'] = 'faster'
+            elif result['rows'] != base['rows']:
+                row['status'] = 'rows changed'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['scenario', 'seconds', 'baseline', 'ratio', 'rows', 'status'])
+
+
+def load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get('results', {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path, results):
+    """Merge results into the baseline file, keeping scenarios this run did not measure."""
+    merged = dict(load_baselines(path), **results)
+    with open(path, "w") as f:
+        json.dump({'machine': f"{platform.machine()} {platform.system()} Python {platform.python_version()}",
+                   'recorded': time.strftime("%Y-%m-%d"), 'results': dict(sorted(merged.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=None)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest counts")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown as a fraction of the baseline, e.g. 0.5 for 50%%")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Slowdowns below this many seconds are never regressions")
+    parser.add_argument("--update-baseline", action="store_true", help="Record these results as the baseline")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    # Stage logs (see instrumentation) would drown the report
+    logging.disable(logging.INFO)
+    results = run_suite(args.scales, args.scenarios, repeat=args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        save_baselines(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    report = compare(results, load_baselines(args.baseline), tolerance=args.tolerance, min_delta=args.min_delta)
+    print()
+    print(report.to_string(index=False))
+    regressions = report[report['status'] == 'regression']
+    if not regressions.empty:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} of the baseline")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Record/replay of scrape_jobs results and link checks, for offline debugging and profiling.
+
+A cassette is a directory holding one Parquet file per recorded scrape_jobs
+result (frames/<key>.parquet, keyed like the scrape cache) and an SQLite index
+of those files plus every link check's outcome. In record mode every query that
+reaches scrape_cache.cached_scrape_jobs and every URL link_checker checks is
+written to the cassette along with how long it took. In replay mode the same
+calls are answered from the cassette, after the recorded latency or none at
+all, without touching the network; a query or URL that was never recorded is
+an error.
+
+While a cassette is active the scrape and link caches are not read, so a
+recording captures every call and its real latency, and a replay serves
+exactly what was recorded. Rate limiting is skipped during replay.
+
+The cassette is process-wide, shared by every session of the app, so it is
+chosen once per process from the environment (the app only shows it):
+
+    JOBHUNT_CASSETTE_MODE=record  streamlit run app.py
+    JOBHUNT_CASSETTE_MODE=replay JOBHUNT_REPLAY_LATENCY=recorded python search_research_jobs.py
+
+JOBHUNT_CASSETTE picks the directory. monitor_daemon also takes --cassette-mode,
+--cassette and --replay-latency.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+import shared
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'record', 'replay')
+LATENCIES = ('zero', 'recorded')
+DEFAULT_CASSETTE_PATH = os.environ.get("JOBHUNT_CASSETTE", os.path.join(".cache", "cassettes", "default"))
+DEFAULT_MODE = os.environ.get("JOBHUNT_CASSETTE_MODE", "off").lower()
+DEFAULT_LATENCY = os.environ.get("JOBHUNT_REPLAY_LATENCY", "zero").lower()
+
+
+class CassetteMiss(LookupError):
+    """A replayed call that the cassette has no recording of."""
+
+
+def _parquet_safe(frame):
+    """Frame with mixed-type object columns (which Parquet cannot store) turned into strings."""
+    frame = frame.copy()
+    for name in frame.columns[frame.dtypes == object]:
+        col = frame[name]
+        frame[name] = col.astype(str).where(col.notna(), None)
+    return frame
+
+
+class Cassette:
+    """A directory of recorded scrape_jobs frames (Parquet) and link checks, indexed in SQLite."""
+
+    def __init__(self, path=DEFAULT_CASSETTE_PATH, mode='replay', latency='zero'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        if latency not in LATENCIES:
+            raise ValueError(f"Unknown replay latency {latency!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+        self._pending_checks = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, "frames"), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scrapes ("
+                " key TEXT PRIMARY KEY, params TEXT, file TEXT, rows INTEGER, bytes INTEGER,"
+                " seconds REAL, recorded_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checks ("
+                " url TEXT PRIMARY KEY, status TEXT, final_url TEXT, seconds REAL, recorded_at REAL)"
+            )
+
+    def _connect(self):
+        return shared.connect(os.path.join(self.path, "index.sqlite"))
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def delay(self, seconds):
+        """How long a replayed call should take."""
+        return seconds if self.latency == 'recorded' and seconds else 0
+
+    def record_scrape(self, key, params, frame, seconds):
+        """Store one scrape_jobs result (None included) under its cache key."""
+        file = None
+        size = 0
+        if frame is not None:
+            file = os.path.join("frames", f"{key}.parquet")
+            frame = frame.copy()
+            frame.attrs = {}
+            fd, tmp = tempfile.mkstemp(dir=os.path.join(self.path, "frames"), suffix=".tmp")
+            os.close(fd)
+            try:
+                try:
+                    frame.to_parquet(tmp, index=False, compression='zstd')
+                except (TypeError, ValueError) as e:
+                    logger.debug(f"Recording {key} with string columns: {e}")
+                    _parquet_safe(frame).to_parquet(tmp, index=False, compression='zstd')
+                os.replace(tmp, os.path.join(self.path, file))
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            size = os.path.getsize(os.path.join(self.path, file))
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, json.dumps(params, sort_keys=True, default=str), file,
+                          None if frame is None else len(frame), size, seconds, time.time()))
+
+    def replay_scrape(self, key):
+        """The recorded frame for a cache key, after the replay latency. Raises CassetteMiss."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT file, seconds FROM scrapes WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded scrape for this query in {self.path}")
+        self.hits += 1
+        file, seconds = row
+        frame = None if file is None else pd.read_parquet(os.path.join(self.path, file))
+        time.sleep(self.delay(seconds))
+        return frame
+
+    def record_check(self, url, result, seconds):
+        """Buffer one link check; flush() writes the buffer."""
+        with self._lock:
+            self._pending_checks.append((url, result['status'], result.get('url_to_use'), seconds, time.time()))
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending_checks = self._pending_checks, []
+            if rows:
+                with self._connect() as conn:
+                    conn.executemany("INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?)", rows)
+
+    def replay_check(self, url):
+        """(result, seconds) recorded for a URL. Raises CassetteMiss."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, final_url, seconds FROM checks WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded link check for {url} in {self.path}")
+        self.hits += 1
+        return {'status': row[0], 'url_to_use': row[1]}, row[2]
+
+    def stats(self):
+        with self._connect() as conn:
+            scrapes, rows, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rows), 0), COALESCE(SUM(bytes), 0) FROM scrapes").fetchone()
+            checks = conn.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+        return {'scrapes': scrapes, 'rows': rows, 'bytes': size, 'checks': checks,
+                'hits': self.hits, 'misses': self.misses}
+
+
+def _from_environment():
+    """The cassette JOBHUNT_CASSETTE_MODE asks for, or None when off."""
+    if DEFAULT_MODE == 'off':
+        return None
+    return Cassette(path=DEFAULT_CASSETTE_PATH, mode=DEFAULT_MODE, latency=DEFAULT_LATENCY)
+
+
+_cassette = shared.ProcessWide(_from_environment)
+get_cassette = _cassette.get
+set_cassette = _cassette.set
+
+
+def configure(mode, path=DEFAULT_CASSETTE_PATH, latency='zero'):
+    """
+    Switch the process-wide cassette to mode ('off', 'record' or 'replay'),
+    keeping the current one when nothing changed. Returns it (None when off).
+    Meant for startup (command-line flags) and tests: it changes the cassette
+    for every caller in the process.
+    """
+    current = get_cassette()
+    if mode == 'off':
+        cassette = None
+    elif current is not None and (current.mode, current.path) == (mode, path):
+        current.latency = latency
+        cassette = current
+    else:
+        cassette = Cassette(path=path, mode=mode, latency=latency)
+    if cassette is not current:
+        if current is not None:
+            current.flush()
+        set_cassette(cassette)
+    return cassette
@@ -0,0 +1,149 @@
+"""
+Memory-compact result frames.
+
+scrape_jobs frames carry the full description text of every posting and store
+site, company, location, job type, ... as Python strings, one object per row.
+Every concat of per-query frames then holds yet another copy. compact_jobs()
+moves descriptions out of the frame into a side store keyed by job_url (SQLite,
+zlib-compressed) and turns the low-cardinality text columns into categoricals.
+with_descriptions() puts the descriptions back for the few places that read them:
+near-duplicate matching, the archive, CSV export and an expanded row.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+import shared
+
+DEFAULT_STORE_PATH = os.environ.get("JOBHUNT_DESCRIPTIONS_PATH", os.path.join(".cache", "descriptions.sqlite"))
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  # seconds since a description was last stored
+
+# Text columns with few distinct values per result set
+CATEGORY_COLUMNS = ['site', 'company', 'location', 'job_type', 'interval', 'currency', 'job_level',
+                    'listing_type', 'source', 'sources', 'monitored_company', 'matched_keyword',
+                    'change', 'url_status']
+MAX_CATEGORY_RATIO = 0.5  # distinct values per row above which a categorical would not save memory
+
+
+class DescriptionStore:
+    """SQLite-backed {job_url: description} side store."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS descriptions ("
+                " job_url TEXT PRIMARY KEY, description BLOB, stored_at REAL)"
+            )
+            conn.execute("DELETE FROM descriptions WHERE stored_at < ?", (time.time() - max_age,))
+
+    def _connect(self):
+        return shared.connect(self.path)
+
+    def put_many(self, descriptions):
+        """Store {job_url: description} in one transaction."""
+        if not descriptions:
+            return
+        now = time.time()
+        rows = [(url, zlib.compress(str(text).encode('utf-8'), 1), now) for url, text in descriptions.items()]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?)", rows)
+
+    def get_many(self, urls):
+        """Return {job_url: description} for the stored URLs."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_url, description FROM descriptions WHERE job_url IN (SELECT value FROM json_each(?))",
+                (json.dumps(urls),),
+            ).fetchall()
+        return {url: zlib.decompress(blob).decode('utf-8') for url, blob in rows}
+
+    def get(self, url):
+        return self.get_many([url]).get(url)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM descriptions")
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(description)), 0) FROM descriptions").fetchone()
+        return {'entries': entries, 'bytes': size}
+
+
+_store = shared.ProcessWide(DescriptionStore)
+get_store = _store.get
+set_store = _store.set
+
+
+def compact_jobs(jobs):
+    """
+    Return `jobs` with its descriptions moved to the description store and its
+    low-cardinality text columns (CATEGORY_COLUMNS) as categoricals. Rows without
+    a job_url keep their description in the frame.
+    """
+    if jobs is None or jobs.empty:
+        return jobs
+    attrs = dict(jobs.attrs)
+    if 'description' in jobs.columns and 'job_url' in jobs.columns:
+        keyed = jobs['job_url'].notna() & jobs['description'].notna()
+        if keyed.any():
+            get_store().put_many(dict(zip(jobs.loc[keyed, 'job_url'].astype(str), jobs.loc[keyed, 'description'])))
+        if keyed.all():
+            jobs = jobs.drop(columns=['description'])
+        else:
+            jobs = jobs.assign(description=jobs['description'].where(~keyed, None))
+    categories = {}
+    for col in CATEGORY_COLUMNS:
+        if col in jobs.columns and jobs[col].dtype == object:
+            if jobs[col].nunique() <= MAX_CATEGORY_RATIO * len(jobs):
+                categories[col] = jobs[col].astype('category')
+    if categories:
+        jobs = jobs.assign(**categories)
+    jobs.attrs = attrs
+    return jobs
+
+
+def concat_jobs(frames):
+    """pd.concat for compacted frames, keeping shared columns categorical."""
+    frames = [f for f in frames if f is not None]
+    for col in CATEGORY_COLUMNS:
+        per_frame = [f[col] for f in frames if col in f.columns]
+        if per_frame and all(isinstance(s.dtype, pd.CategoricalDtype) for s in per_frame):
+            categories = pd.api.types.union_categoricals(per_frame, ignore_order=True).categories
+            frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) if col in f.columns else f
+                      for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def with_descriptions(jobs):
+    """Return `jobs` with the 'description' column loaded back from the description store."""
+    if jobs is None or jobs.empty or 'job_url' not in jobs.columns:
+        return jobs
+    missing = jobs['job_url'].notna()
+    if 'description' in jobs.columns:
+        missing &= jobs['description'].isna()
+    if not missing.any():
+        return jobs
+    stored = get_store().get_many(jobs.loc[missing, 'job_url'].astype(str))
+    loaded = jobs['job_url'].astype(str).map(stored)
+    if 'description' in jobs.columns:
+        loaded = jobs['description'].where(~missing, loaded)
+    return jobs.assign(description=loaded)
+
+
+def memory_bytes(jobs):
+    """Deep memory footprint of a frame, strings included."""
+    return int(jobs.memory_usage(deep=True).sum())
@@ -1,7 +1,22 @@
+import copy
+import os
+import tempfile
+import threading
 import yaml
 import pandas as pd
 import logging
-from jobspy import scrape_jobs
+import compaction
+import fanout
+import instrumentation
+import location_shards
+import pagination
+import results_archive
+import search_index
+import scrape_cache
+import seen_store
+from scrape_cache import scrape_jobs
+from task_runner import report_progress
+from watchlist_matcher import WatchlistMatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,68 +28,361 @@ DEFAULT_HEADERS = {
     'Accept-Language': 'en-US,en;q=0.5',
 }
 
+DEFAULT_SCAN_WORKERS = 4
+DEFAULT_COMPANY_TIMEOUT = 180  # seconds per scrape call
+DEFAULT_BATCH_SIZE = 5
+# Boards whose search understands '"A" OR "B"', so several companies can share a query
+BATCHABLE_SITES = {"indeed", "linkedin"}
+
+# Parsed configs and watchlist editor frames keyed on (path, mtime, size): every
+# Streamlit rerun asks for them, but the file only changes on "Save Changes"
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def _file_key(config_path):
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        return None
+    return (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _cached(kind, config_path, build):
+    key = _file_key(config_path)
+    if key is None:
+        return None
+    with _config_lock:
+        entry = _config_cache.get((kind, key[0]))
+        if entry is not None and entry[0] == key:
+            return entry[1]
+    value = build()
+    with _config_lock:
+        _config_cache[(kind, key[0])] = (key, value)
+    return value
+
+
+def _parse_config(config_path):
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
 def load_config(config_path="companies.yaml"):
+    """
+    Parsed companies.yaml, re-read only when the file's mtime or size changes.
+    Returns a copy the caller may modify.
+    """
     try:
-        with open(config_path, "r") as f:
-            return yaml.safe_load(f)
+        config = _cached('config', config_path, lambda: _parse_config(config_path))
     except FileNotFoundError:
-        return {}
+        config = None
+    return copy.deepcopy(config) if config is not None else {}
+
+
+def save_config(config, config_path="companies.yaml"):
+    """
+    Write the config atomically: dump to a temporary file next to it, then
+    rename it over the old one, so a crash or a concurrent reader never sees a
+    half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".companies-", suffix=".yaml", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump(config, f, sort_keys=False)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(config_path):
+            os.chmod(tmp_path, os.stat(config_path).st_mode & 0o777)
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _build_watchlist_frame(companies):
+    df = pd.DataFrame(companies) if companies else pd.DataFrame(columns=["name", "keywords"])
+    # Drop legacy columns if present
+    df = df.drop(columns=[c for c in ['search_term', 'location'] if c in df.columns])
+    if 'keywords' in df.columns and not df.empty:
+        df['keywords'] = df['keywords'].apply(lambda x: ', '.join(x) if isinstance(x, list) else str(x))
+    else:
+        df['keywords'] = ""
+    # Add scan checkbox column (default checked)
+    if 'scan' not in df.columns:
+        df.insert(0, 'scan', True)
+    return df
+
+
+def watchlist_frame(config_path="companies.yaml"):
+    """
+    The aggregator companies as the watchlist editor shows them (scan, name,
+    comma-separated keywords), rebuilt only when the config file changes.
+    """
+    frame = _cached('watchlist', config_path,
+                    lambda: _build_watchlist_frame(load_config(config_path).get('aggregator_companies', [])))
+    if frame is None:
+        frame = _build_watchlist_frame([])
+    return frame.copy()
+
+
+def plan_queries(companies, sites, job_types, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Plan the scrape calls for a watchlist scan.
+
+    Every company shares the sidebar filters, so on sites that understand boolean
+    OR queries (BATCHABLE_SITES) companies are grouped, per job type, into batches
+    of up to `batch_size` names searched as '"A" OR "B" OR ...'. Other sites get
+    one query per company. Returns a list of {'site', 'job_type', 'companies',
+    'search_term'} dicts.
+    """
+    names = [c.get('name') for c in companies if c.get('name')]
+    plan = []
+    for j_type in job_types:
+        for site in sites:
+            size = batch_size if site in BATCHABLE_SITES else 1
+            for i in range(0, len(names), max(1, size)):
+                batch = names[i:i + max(1, size)]
+                if len(batch) == 1:
+                    term = batch[0]
+                else:
+                    term = " OR ".join(f'"{name.replace(chr(34), "")}"' for name in batch)
+                plan.append({'site': site, 'job_type': j_type, 'companies': batch, 'search_term': term})
+    return plan
 
+
+def describe_query_plan(query_plan):
+    """
+    One line on a scan's scrape calls. Full batches re-run per company can make
+    a scan cost more calls than one per company; that is reported as such.
+    """
+    calls, per_company = query_plan['calls'], query_plan['per_company_calls']
+    fallbacks = f"{query_plan['fallbacks']} per-company fallback calls"
+    if calls <= per_company:
+        return (f"Query planner: {calls} scrape calls instead of {per_company} "
+                f"(saved {per_company - calls}, {fallbacks}).")
+    return (f"Query planner: {calls} scrape calls, {calls - per_company} more than one per company "
+            f"({fallbacks} after batches came back full).")
+
+
+def _scan_query(search_term, site_name, location, hours_old, results_wanted,
+                job_type, is_remote, adaptive=False, use_cache=True, cache_ttl=None, use_limiter=True):
+    """
+    Run one planned query (one site, one or more companies) through the result
+    cache, or page through it adaptively with results_wanted as the cap.
+    """
+    fetch = pagination.adaptive_scrape if adaptive else scrape_cache.cached_scrape_jobs
+    return fetch(
+        scrape_fn=scrape_jobs,
+        use_cache=use_cache,
+        cache_ttl=cache_ttl,
+        use_limiter=use_limiter,
+        site_name=site_name,
+        search_term=search_term,
+        location=location,
+        results_wanted=results_wanted,
+        hours_old=hours_old,
+        job_type=job_type,
+        is_remote=is_remote,
+        country_indeed='USA',
+    )
+
+
+@instrumentation.traced('watchlist')
 def scrape_aggregator_companies(companies, sites=None,
                                 location="USA", hours_old=24,
                                 results_wanted=20, job_type=None,
-                                is_remote=False):
+                                is_remote=False, job_types=None,
+                                max_workers=DEFAULT_SCAN_WORKERS,
+                                company_timeout=DEFAULT_COMPANY_TIMEOUT,
+                                batch_size=DEFAULT_BATCH_SIZE, new_only=False,
+                                adaptive=False, shard=False, keyword_index=False,
+                                use_cache=True, cache_ttl=None, use_limiter=True, archive=True):
     """
     Scrapes job aggregators for specific companies.
     companies: list of dicts with 'name' and optional 'keywords' keys.
     Search parameters (sites, location, etc.) come from the shared sidebar.
+
+    Queries are planned by plan_queries (batch_size=1 searches each company on
+    its own) and run concurrently on up to `max_workers` threads. Rows from a
+    batched query are routed back to their company by the `company` column; a
+    batch that comes back with `results_wanted` rows may have been truncated, so
+    it is re-run as one query per company. job_types is a list of job types to
+    fan out over; when omitted the single `job_type` is used. A query that fails
+    or runs longer than `company_timeout` seconds is logged and skipped without
+    holding up the others. Results keep the watchlist order.
+
+    The number of scrape calls made and saved is logged and stored in
+    the result's attrs['query_plan'] (see describe_query_plan).
+
+    With adaptive, each query pages through results (see pagination) up to
+    results_wanted, and a batch is only re-run per company when its coverage is
+    incomplete.
+
+    With shard, a broad location (see location_shards) is also searched metro by
+    metro, every planned query running once per shard as well as unsharded, and
+    attrs['shards'] reports how many postings each shard added.
+
+    Every scan's results are appended to the results archive (see results_archive),
+    unless archive is False, and to the full-text index (see search_index). With
+    keyword_index, title keywords are matched through that index instead of
+    scanning the titles.
+    The result frame is compacted (see compaction): descriptions are loaded on
+    demand with compaction.with_descriptions.
+
+    With new_only, only postings that are new or changed since the last scan are
+    returned (see seen_store), and those that stopped showing up for a company
+    are listed in attrs['disappeared'].
+
+    Progress is reported through task_runner.report_progress, so a scan run as a
+    background task shows progress and can be cancelled between queries.
+    attrs['timings'] holds the scan's per-stage wall times, rows and errors per
+    site and company (see instrumentation).
+
+    use_cache, cache_ttl and use_limiter go to scrape_cache.cached_scrape_jobs
+    for every query.
     """
     if sites is None:
         sites = ["indeed", "linkedin", "glassdoor"]
+    if not job_types:
+        job_types = [job_type]
+    matcher = WatchlistMatcher(companies)
+
+    def _run(plan):
+        queries = [{
+            'search_term': q['search_term'],
+            'site_name': [q['site']],
+            'location': q['location'],
+            'hours_old': hours_old,
+            'results_wanted': results_wanted,
+            'job_type': q['job_type'],
+            'is_remote': is_remote,
+            'adaptive': adaptive,
+            'use_cache': use_cache,
+            'cache_ttl': cache_ttl,
+            'use_limiter': use_limiter,
+        } for q in plan]
+        # Results are kept at their plan position, not in completion order, so the
+        # concatenated rows (and which duplicate survives) do not depend on timing
+        position = {id(query): i for i, query in enumerate(queries)}
+        finished = [None] * len(plan)
+
+        def _on_query_done(query, frame, error, done, total):
+            if error is None:
+                logger.info(f"Scanned {query['site_name'][0]} for {query['search_term']} ({done}/{total})")
+                # Index the full postings, then keep their descriptions in the side store
+                site, target = query['site_name'][0], query['search_term']
+                with instrumentation.stage('index', site=site, target=target, rows=len(frame)):
+                    search_index.index_jobs(frame)
+                with instrumentation.stage('compact', site=site, target=target) as span:
+                    frame = compaction.compact_jobs(frame)
+                    instrumentation.frame_stats(span, frame)
+                finished[position[id(query)]] = (plan[position[id(query)]], frame)
+            report_progress(done, total, f"Scanning aggregators... {done}/{total} queries done")
+
+        _, errors = fanout.run_queries(
+            queries,
+            scrape_fn=_scan_query,
+            max_workers=max(1, max_workers),
+            timeout=company_timeout,
+            on_result=_on_query_done,
+        )
+        for err in errors:
+            logger.error(f"Error scraping aggregators for {err['query']['search_term']}: {err['error']}")
+        return [item for item in finished if item is not None]
+
+    def _locate(plan, where, shard_name=None):
+        return [dict(q, location=where, shard=shard_name) for q in plan]
+
+    plan = plan_queries(companies, sites, job_types, batch_size=batch_size)
+    shards = location_shards.shards_for(location) if shard else []
+    plan = _locate(plan, location) + [q for s in shards for q in _locate(plan, s, shard_name=s)]
+    finished = _run(plan)
+
+    # A batch that came back with results_wanted rows may have been truncated:
+    # re-run its companies one query each, in the batch's place
+    saturated = {id(q) for q, frame in finished
+                 if len(q['companies']) > 1 and pagination.is_saturated(frame, results_wanted)}
+    retry = []
+    for query, _ in finished:
+        if id(query) in saturated:
+            for single in _locate(plan_queries([{'name': n} for n in query['companies']],
+                                               [query['site']], [query['job_type']], batch_size=1),
+                                  query['location'], shard_name=query['shard']):
+                single['batch'] = id(query)
+                retry.append(single)
+    if retry:
+        retried = {}
+        for q, frame in _run(retry):
+            retried.setdefault(q['batch'], []).append((q, frame))
+        finished = [item for q, frame in finished
+                    for item in (retried.get(id(q), []) if id(q) in saturated else [(q, frame)])]
+
     all_jobs = []
+    for query, frame in finished:
+        if frame is None or frame.empty:
+            continue
+        frame = frame.copy()
+        if len(query['companies']) == 1:
+            frame['monitored_company'] = query['companies'][0]
+        else:
+            frame['monitored_company'] = matcher.route(frame, query['companies'])
+        frame['source'] = 'Aggregator Monitor'
+        all_jobs.append(frame)
+
+    per_company_calls = len([c for c in companies if c.get('name')]) * len(job_types) * len(sites) * (1 + len(shards))
+    query_plan = {
+        'calls': len(plan) + len(retry),
+        'per_company_calls': per_company_calls,
+        'saved': max(0, per_company_calls - len(plan) - len(retry)),
+        'fallbacks': len(retry),
+    }
+    logger.info(describe_query_plan(query_plan))
 
-    for company in companies:
-        name = company.get('name')
-        keywords = company.get('keywords', [])
-
-        logger.info(f"Scanning aggregators for {name}...")
-        try:
-            # Scrape using JobSpy, use company name as the search query
-            jobs = scrape_jobs(
-                site_name=sites,
-                search_term=name,
-                location=location,
-                results_wanted=results_wanted,
-                hours_old=hours_old,
-                job_type=job_type,
-                is_remote=is_remote,
-                country_indeed='USA',
+    with instrumentation.stage('filter') as span:
+        jobs = _merge_company_frames(all_jobs, companies, matcher, keyword_index)
+        instrumentation.frame_stats(span, jobs)
+    if archive:
+        with instrumentation.stage('archive', rows=len(jobs)):
+            results_archive.archive_results(
+                jobs, kind='watchlist', companies=[c.get('name') for c in companies if c.get('name')],
+                sites=sites, job_types=job_types, location=location, hours_old=hours_old, is_remote=is_remote,
+                results_wanted=results_wanted, adaptive=adaptive, shard=shard,
             )
 
-            if not jobs.empty:
-                # Filter: Ensure the company column loosely matches our target
-                # This removes "Sales Rep selling TO Boehringer"
-                name_lower = name.lower()
-                company_matches = jobs[jobs['company'].apply(
-                    lambda c: not pd.isna(c) and name_lower in c.lower()
-                )].copy()
-
-                # Filter by keywords if provided
-                if keywords:
-                    kw_lower = [k.lower() for k in keywords]
-                    company_matches = company_matches[company_matches['title'].apply(
-                        lambda t: not pd.isna(t) and any(k in t.lower() for k in kw_lower)
-                    )]
-
-                # Add source metadata
-                company_matches['source'] = 'Aggregator Monitor'
-                company_matches['monitored_company'] = name
-
-                all_jobs.append(company_matches)
-                
-        except Exception as e:
-            logger.error(f"Error scraping aggregators for {name}: {e}")
-            
+    disappeared = None
+    if new_only:
+        scanned = [f"watchlist:{c.get('name')}" for c in companies if c.get('name')]
+        scopes = "watchlist:" + jobs['monitored_company'].astype(str) if not jobs.empty else pd.Series(dtype=object)
+        with instrumentation.stage('delta') as span:
+            jobs, disappeared = seen_store.get_store().delta(jobs, scope=scopes, scanned_scopes=scanned)
+            span['rows'] = len(jobs)
+        jobs = jobs.reset_index(drop=True)
+
+    jobs.attrs['query_plan'] = query_plan
+    if shard:
+        jobs.attrs['shards'] = location_shards.shard_report(
+            [(location, q['shard'], frame) for q, frame in finished])
+    if disappeared is not None:
+        jobs.attrs['disappeared'] = disappeared.to_dict('records')
+    return jobs
+
+
+def _merge_company_frames(all_jobs, companies, matcher, keyword_index):
+    """Concat the per-query frames, keep each company's matching postings, in watchlist order."""
     if all_jobs:
-        return pd.concat(all_jobs, ignore_index=True)
-    return pd.DataFrame()
\ No newline at end of file
+        jobs = compaction.concat_jobs(all_jobs)
+        jobs = jobs[jobs['monitored_company'].notna()]
+        # Filter: Ensure the company column loosely matches the company we searched
+        # for (this removes "Sales Rep selling TO Boehringer") and the title one of
+        # its keywords, in one pass over every company's results
+        jobs = matcher.filter(jobs, index=search_index.get_index() if keyword_index else None)
+        # Keep the watchlist order, then drop postings seen by several queries
+        order = {c.get('name'): i for i, c in enumerate(companies)}
+        jobs = jobs.sort_values('monitored_company', key=lambda col: col.map(order), kind='stable')
+        jobs = jobs.drop_duplicates(subset=['monitored_company', 'job_url'], keep='first')
+        jobs = compaction.compact_jobs(jobs.reset_index(drop=True))
+    else:
+        jobs = pd.DataFrame()
+    return jobs
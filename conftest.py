@@ -0,0 +1,10 @@
+import pytest
+
+import isolation
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    """Fresh caches and stores under tmp_path with rate limiting off, restored after the test."""
+    for holder, instance in isolation.fresh_stores(str(tmp_path)):
+        monkeypatch.setattr(holder, "instance", instance)
@@ -0,0 +1,195 @@
+"""
+Cross-site near-duplicate detection for job results.
+
+The same posting shows up on Indeed, LinkedIn and Glassdoor under different
+job_urls. Rows are bucketed by a normalized (title, company, location) key, and
+optionally also linked when their descriptions are near-identical according to
+MinHash signatures with LSH banding, so the work stays near-linear in the number
+of rows instead of comparing every pair. Each cluster keeps its best row
+(direct application link first, then salary data) and records which sites it
+was merged from.
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+_PUNCT = r"[^\w\s]"
+_COMPANY_SUFFIXES = r"\b(?:inc|llc|ltd|corp|corporation|co|company|plc|lp|llp|gmbh)\b"
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 8          # 8 bands x 8 rows: pairs above ~0.77 similarity become candidates
+MINHASH_THRESHOLD = 0.8    # estimated Jaccard similarity needed to merge
+SHINGLE_SIZE = 3           # words per shingle
+_SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15  # odd 64-bit constant to mix word hashes
+
+
+def _text(jobs, col):
+    if col not in jobs.columns:
+        return pd.Series('', index=jobs.index, dtype=object)
+    return jobs[col].astype(object).where(jobs[col].notna(), '').astype(str)
+
+
+def _normalize(values):
+    """Lowercase, drop punctuation and collapse whitespace, once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    normalized = pd.Series(uniques, dtype=object).str.lower().str.replace(_PUNCT, ' ', regex=True)
+    normalized = normalized.str.split().str.join(' ').to_numpy()
+    return pd.Series(normalized[codes], index=values.index, dtype=object)
+
+
+def normalized_keys(jobs):
+    """Return the normalized title, company and location columns used for bucketing."""
+    title = _normalize(_text(jobs, 'title'))
+    company = _normalize(_normalize(_text(jobs, 'company')).str.replace(_COMPANY_SUFFIXES, '', regex=True))
+    # "Atlanta, GA, US" and "Atlanta, GA" are the same place
+    location = _normalize(_text(jobs, 'location').str.split(',').str[:2].str.join(','))
+    return title, company, location
+
+
+def _connected_components(labels, src, dst):
+    """
+    Merge the clusters in `labels` (each row points at a row of its cluster)
+    along the edges src[i] -- dst[i]. Vectorized min-label propagation with
+    pointer jumping; every row ends up labelled with the lowest row of its component.
+    """
+    labels = np.asarray(labels, dtype=np.int64).copy()
+    while True:
+        previous = labels
+        labels = labels.copy()
+        if len(src):
+            lowest = np.minimum(labels[src], labels[dst])
+            np.minimum.at(labels, src, lowest)
+            np.minimum.at(labels, dst, lowest)
+        labels = np.minimum(labels, labels[labels])
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def minhash_signatures(texts, num_perm=MINHASH_PERMUTATIONS, shingle_size=SHINGLE_SIZE, seed=0):
+    """
+    MinHash signature matrix (len(texts) x num_perm) over word shingles. Texts
+    shorter than one shingle get all-max rows and never match anything.
+
+    Words are hashed once, shingle hashes are combined from shifted word-hash
+    arrays over all texts at once, and each permutation is an XOR mask followed
+    by a segmented minimum, so there is no per-shingle Python work.
+    """
+    rng = np.random.default_rng(seed)
+    masks = rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=num_perm,
+                         dtype=np.int64).view(np.uint64)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+
+    split = [text.split() for text in texts]
+    lengths = np.fromiter((len(words) for words in split), dtype=np.int64, count=len(split))
+    total = int(lengths.sum())
+    if total < shingle_size:
+        return signatures
+    words = np.fromiter(map(hash, chain.from_iterable(split)), dtype=np.int64, count=total).view(np.uint64)
+    row_of = np.repeat(np.arange(len(texts)), lengths)
+
+    # Shingle starting at word i covers words i .. i+shingle_size-1 (uint64 arithmetic wraps)
+    count = total - shingle_size + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(shingle_size):
+        shingles = shingles * np.uint64(_SHINGLE_MULTIPLIER) + words[offset:offset + count]
+    valid = row_of[:count] == row_of[shingle_size - 1:]
+    shingles = shingles[valid]
+    rows = row_of[:count][valid]
+    if not len(rows):
+        return signatures
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    for k in range(num_perm):
+        signatures[rows[starts], k] = np.minimum.reduceat(shingles ^ masks[k], starts)
+    return signatures
+
+
+def _similar_description_edges(jobs, company, bands=MINHASH_BANDS, threshold=MINHASH_THRESHOLD):
+    """Return (src, dst) row pairs of the same company whose descriptions are near-duplicates."""
+    empty = np.array([], dtype=np.int64)
+    descriptions = _normalize(_text(jobs, 'description'))
+    positions = np.flatnonzero((descriptions != '').to_numpy())
+    if len(positions) < 2:
+        return empty, empty
+
+    # Rows with the same company and identical description are linked directly,
+    # and only one of them goes through MinHash
+    combo = pd.DataFrame({'company': company.to_numpy()[positions],
+                          'description': descriptions.to_numpy()[positions]})
+    combo_codes = combo.groupby(['company', 'description'], sort=False).ngroup().to_numpy()
+    first = pd.Series(positions).groupby(combo_codes).transform('first').to_numpy()
+    src, dst = [positions[first != positions]], [first[first != positions]]
+
+    reps = np.unique(first)
+    codes, uniques = pd.factorize(descriptions.to_numpy()[reps])
+    signatures = minhash_signatures(list(uniques))[codes]
+    company_codes = pd.factorize(company.to_numpy()[reps])[0]
+    rows_per_band = signatures.shape[1] // bands
+    members, leaders = [], []
+    for band in range(bands):
+        chunk = pd.DataFrame(signatures[:, band * rows_per_band:(band + 1) * rows_per_band].view(np.int64))
+        chunk['company'] = company_codes
+        bucket = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        # Link every row in a bucket to the bucket's first row (a star, not all pairs)
+        order = np.argsort(bucket, kind='stable')
+        first_of_bucket = np.r_[True, bucket[order][1:] != bucket[order][:-1]]
+        bucket_leader = order[np.maximum.accumulate(np.where(first_of_bucket, np.arange(len(order)), 0))]
+        members.append(order[~first_of_bucket])
+        leaders.append(bucket_leader[~first_of_bucket])
+    if members:
+        pairs = np.unique(np.column_stack([np.concatenate(members), np.concatenate(leaders)]), axis=0)
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[similarity >= threshold]
+        src.append(reps[pairs[:, 0]])
+        dst.append(reps[pairs[:, 1]])
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def collapse_duplicates(jobs, use_minhash=False):
+    """
+    Merge cross-site duplicates. Returns one row per cluster, in original order,
+    with 'sources' (the merged sites) and 'duplicates' (rows merged into it).
+    Rows without a title or company are never merged on the key alone.
+    """
+    if jobs.empty:
+        return jobs
+    jobs = jobs.reset_index(drop=True)
+    title, company, location = normalized_keys(jobs)
+
+    keyed = ((title != '') & (company != '')).to_numpy()
+    keys = pd.DataFrame({'title': title, 'company': company, 'location': location})[keyed]
+    labels = np.arange(len(jobs))
+    # Label each keyed row with the position of the first row sharing its key
+    labels[keyed] = keys.index.to_series().groupby([keys['title'], keys['company'], keys['location']],
+                                                   sort=False).transform('first').to_numpy()
+    cluster = labels
+    if use_minhash:
+        cluster = _connected_components(labels, *_similar_description_edges(jobs, company))
+
+    # Best row per cluster: has a direct link, then has salary data, then earliest
+    direct = _text(jobs, 'job_url_direct').str.strip() != ''
+    salary = pd.Series(False, index=jobs.index)
+    for col in ['min_amount', 'max_amount']:
+        if col in jobs.columns:
+            salary |= jobs[col].notna()
+    ranking = pd.DataFrame({'cluster': cluster, 'direct': direct.to_numpy(), 'salary': salary.to_numpy(),
+                            'pos': np.arange(len(jobs))})
+    best = ranking.sort_values(['cluster', 'direct', 'salary', 'pos'],
+                               ascending=[True, False, False, True]).drop_duplicates('cluster')['pos']
+
+    sizes = ranking.groupby('cluster')['pos'].transform('size').to_numpy()
+
+    # Merged sources: OR together one bit per site within each cluster
+    site_codes, site_names = pd.factorize(_text(jobs, 'site').replace('', None))
+    bits = np.where(site_codes >= 0, np.left_shift(1, np.maximum(site_codes, 0)), 0).astype(np.int64)
+    order = np.argsort(cluster, kind='stable')
+    starts = np.flatnonzero(np.r_[True, cluster[order][1:] != cluster[order][:-1]])
+    cluster_bits = pd.Series(np.bitwise_or.reduceat(bits[order], starts), index=cluster[order][starts])
+    labels = {mask: ', '.join(sorted(name for i, name in enumerate(site_names) if mask >> i & 1))
+              for mask in cluster_bits.unique()}
+    sources = cluster_bits.map(labels).reindex(cluster).to_numpy()
+
+    result = jobs.loc[np.sort(best.to_numpy())].copy()
+    result['sources'] = sources[result.index.to_numpy()]
+    result['duplicates'] = sizes[result.index.to_numpy()] - 1
+    return result.reset_index(drop=True)
@@ -0,0 +1,92 @@
+"""
+Local HTTP stand-in for job board / ATS pages, for tests and benchmarks.
+
+Paths:
+    /ok/<anything>        200 with a small HTML body
+    /gone/<anything>      302 to /job-expired (a soft 404, as many ATS do)
+    /job-expired          200 "this job has expired" page
+    /slow/<anything>      200 after `slow_delay` seconds
+    /nohead/<anything>    405 on HEAD, 200 on GET
+    /missing/<anything>   404
+    /limited/<anything>   200, or 429 once clients exceed `rate_limit` requests/second.
+                          Rejected requests still count against the quota, as on
+                          the real boards, so a client that keeps hammering stays blocked.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BODY = b"<html><body>" + b"Job description. " * 2000 + b"</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling is measurable
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _route(self):
+        server = self.server
+        with server.stats_lock:
+            server.requests[self.command] = server.requests.get(self.command, 0) + 1
+        path = self.path
+        if path.startswith("/gone/"):
+            self._send(302, headers={"Location": "/job-expired"})
+        elif path.startswith("/job-expired"):
+            self._send(200, b"<html>This job has expired</html>")
+        elif path.startswith("/slow/"):
+            time.sleep(server.slow_delay)
+            self._send(200, BODY)
+        elif path.startswith("/nohead/") and self.command == "HEAD":
+            self._send(405)
+        elif path.startswith("/limited/"):
+            if server.take_token():
+                self._send(200, BODY)
+            else:
+                self._send(429, b"too many requests", headers={"Retry-After": "1"})
+        elif path.startswith("/missing/"):
+            self._send(404, b"not found")
+        else:
+            self._send(200, BODY)
+
+    do_GET = _route
+    do_HEAD = _route
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients that drop connections mid-response are expected here
+
+    def take_token(self):
+        """Token bucket for /limited/: refills at rate_limit/s, and goes into debt on rejections."""
+        with self.stats_lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate_limit, self.tokens + (now - self.refilled) * self.rate_limit)
+            self.refilled = now
+            self.tokens = max(self.tokens - 1, -self.rate_limit)
+            return self.tokens >= 0
+
+
+def start_server(slow_delay=0.5, host="127.0.0.1", rate_limit=20):
+    """Start the stand-in on a free port in a daemon thread. Returns (server, base_url)."""
+    server = _Server((host, 0), _Handler)
+    server.slow_delay = slow_delay
+    server.rate_limit = rate_limit
+    server.tokens = rate_limit
+    server.refilled = time.monotonic()
+    server.requests = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
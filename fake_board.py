@@ -0,0 +1,108 @@
+"""
+Offline stand-in for jobspy.scrape_jobs, for tests and benchmarks.
+
+make_scrape_jobs() returns a scrape_jobs look-alike with configurable latency
+and result size. Results are deterministic: every search term has its own set of
+postings drawn from a shared pool, so overlapping terms return some of the same
+postings and every board lists the same posting under its own job_url (the
+cross-site duplicates dedup collapses). A search term made of quoted company
+names ('"A" OR "B"', as the watchlist planner sends) returns postings at those
+companies plus some noise from other employers.
+
+Job links point at fake_ats paths when base_urls are given, mixing live pages,
+soft-404 redirects, slow hosts, HEAD-refusing pages and rate-limited ones in
+the proportions of `link_mix`, so link verification has something to chew on.
+"""
+import hashlib
+import random
+import re
+import time
+
+import pandas as pd
+
+TITLES = ["Research Scientist", "Research Associate", "Lab Technician", "Data Scientist", "Chemist",
+          "Sales Representative", "Clinical Research Coordinator", "Process Engineer"]
+LEVELS = ["", "I", "II", "Senior", "Principal"]
+COMPANIES = [f"Company {i}" for i in range(400)]
+CITIES = ["Atlanta, GA", "Athens, GA", "Savannah, GA", "Augusta, GA", "Macon, GA", "Remote"]
+WORDS = ["research", "assay", "cell", "culture", "biology", "laboratory", "data", "analysis", "python",
+         "protocol", "sample", "team", "clinical", "process", "quality", "develop", "support", "manage",
+         "scientist", "experience", "degree", "chemistry", "instrument", "report", "collaborate"] + \
+        [f"word{i}" for i in range(2000)]
+DEFAULT_LINK_MIX = {'ok': 0.7, 'gone': 0.15, 'slow': 0.05, 'nohead': 0.05, 'limited': 0.05}
+
+
+def _seed(*parts):
+    return int(hashlib.md5("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _description_pool(size, words, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=words)) for _ in range(size)]
+
+
+def make_scrape_jobs(latency=0.0, available=200, description_words=300, base_urls=None,
+                     link_mix=None, universe=5000, noise_share=0.3, company_search=False, seed=0, calls=None):
+    """
+    Return a fake scrape_jobs(**params).
+
+    latency: seconds each call sleeps. available: postings a query can return in
+    total; results_wanted and offset page through them. base_urls: fake_ats base
+    URLs the job links are spread over (default: unreachable example.com hosts).
+    company_search: treat a plain search term as a company name, as watchlist
+    scans send on boards without OR batching. calls, when a list, records every
+    call's params.
+    """
+    link_mix = link_mix or DEFAULT_LINK_MIX
+    kinds = list(link_mix)
+    weights = [link_mix[k] for k in kinds]
+    descriptions = _description_pool(256, description_words, seed=seed)
+
+    def _posting(key, site, company=None):
+        rng = random.Random(_seed(seed, key))
+        kind = rng.choices(kinds, weights)[0]
+        title = f"{TITLES[key % len(TITLES)]} {LEVELS[key // len(TITLES) % len(LEVELS)]}".strip()
+        company = company or COMPANIES[key % len(COMPANIES)]
+        host = base_urls[key % len(base_urls)] if base_urls else f"https://{site}.example.com"
+        ats = base_urls[(key + 1) % len(base_urls)] if base_urls else "https://careers.example.com"
+        return {
+            'id': f"{site}-{key}",
+            'site': site,
+            'job_url': f"{host}/{kind}/{site}/{key}",
+            'job_url_direct': f"{ats}/{kind}/{key}",
+            'title': title,
+            'company': company,
+            'location': CITIES[key % len(CITIES)],
+            'date_posted': f"2026-10-{1 + key % 28:02d}",
+            'job_type': "fulltime",
+            'interval': "yearly",
+            'min_amount': 60000.0 + (key % 50) * 1000,
+            'max_amount': 90000.0 + (key % 50) * 1000,
+            'currency': "USD",
+            'is_remote': key % 6 == 5,
+            'emails': None,
+            'description': f"{title} at {company}. " + descriptions[key % len(descriptions)],
+        }
+
+    def scrape_jobs(site_name=None, search_term=None, location=None, results_wanted=15, offset=0, **params):
+        if calls is not None:
+            calls.append(dict(params, site_name=site_name, search_term=search_term, location=location,
+                              results_wanted=results_wanted, offset=offset))
+        if latency:
+            time.sleep(latency)
+        sites = site_name if isinstance(site_name, (list, tuple)) else [site_name or "indeed"]
+        term = str(search_term or "")
+        names = re.findall(r'"([^"]+)"', term) or ([term] if company_search and term else [])
+        rng = random.Random(_seed(seed, term.lower(), location, params.get('job_type')))
+        keys = rng.sample(range(universe), min(available, universe))
+        keys = keys[offset:offset + results_wanted]
+        rows = []
+        for site in sites:
+            for n, key in enumerate(keys):
+                company = None
+                if names and n >= noise_share * len(keys):
+                    company = names[n % len(names)]
+                rows.append(_posting(key, site, company))
+        return pd.DataFrame(rows, columns=list(_posting(0, "indeed")))
+
+    return scrape_jobs
@@ -0,0 +1,164 @@
+"""
+Concurrent fan-out for JobSpy searches.
+
+A search over several sites, terms and job types is split into one query per
+(site, search_term, job_type) and run on a bounded thread pool. Each site has its
+own cap on in-flight queries so one board is never hit by the whole pool at once,
+and every query has a timeout so a hung board does not hold up the others.
+"""
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import instrumentation
+import scrape_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 12
+DEFAULT_PER_SITE_LIMIT = 3
+DEFAULT_QUERY_TIMEOUT = 120  # seconds, measured from when the query starts running
+
+
+def build_queries(sites, search_terms, job_types=None, **params):
+    """
+    Expand sites x search_terms x job_types into a list of scrape_jobs kwargs.
+    Extra keyword arguments (location, hours_old, ...) are shared by every query.
+    """
+    job_types = job_types or [None]
+    queries = []
+    for term in search_terms:
+        for j_type in job_types:
+            for site in sites:
+                query = dict(params)
+                query.update(site_name=[site], search_term=term, job_type=j_type)
+                queries.append(query)
+    return queries
+
+
+def query_site(query):
+    """Return the single site a query targets (queries are built one site each)."""
+    site = query.get('site_name')
+    if isinstance(site, (list, tuple)):
+        return site[0] if len(site) == 1 else ",".join(site)
+    return site
+
+
+def query_label(query):
+    """Human readable label for status lines and warnings."""
+    label = f"'{query.get('search_term') or ''}'"
+    if query.get('job_type'):
+        label += f" ({query['job_type']})"
+    site = query_site(query)
+    return f"{label} on {site}" if site else label
+
+
+def iter_queries(queries, scrape_fn=None, max_workers=DEFAULT_MAX_WORKERS,
+                 per_site_limit=DEFAULT_PER_SITE_LIMIT, timeout=DEFAULT_QUERY_TIMEOUT):
+    """
+    Run scrape_fn(**query) for every query concurrently and yield (idx, frame, error)
+    in completion order, as soon as each query finishes, so callers can show the
+    fastest board's results without waiting for the slowest. idx is the query's
+    position in `queries`; error is None on success and frame is None on failure.
+
+    A timed-out query is abandoned rather than killed: its thread is left to
+    finish in the background and its result is discarded. Closing the generator
+    early abandons the queries still in flight the same way.
+    """
+    if scrape_fn is None:
+        scrape_fn = scrape_cache.cached_scrape_jobs
+    if not queries:
+        return
+
+    started = {}
+
+    def _run(idx):
+        started[idx] = time.monotonic()
+        query = queries[idx]
+        with instrumentation.stage('scrape', site=query_site(query), target=query.get('search_term')) as span:
+            frame = scrape_fn(**query)
+            instrumentation.frame_stats(span, frame)
+        return frame
+
+    # Pending query indexes per site, dispatched in order as the site frees up
+    pending = {}
+    for idx, query in enumerate(queries):
+        pending.setdefault(query_site(query), []).append(idx)
+    in_flight_per_site = {site: 0 for site in pending}
+    in_flight = {}  # future -> idx
+    remaining = len(queries)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while remaining:
+            # Fill free slots, respecting both the pool size and the per-site caps
+            for site, idxs in pending.items():
+                while idxs and len(in_flight) < max_workers and in_flight_per_site[site] < per_site_limit:
+                    idx = idxs.pop(0)
+                    # Each query runs in a copy of this context, so it reports to the caller's trace
+                    in_flight[executor.submit(contextvars.copy_context().run, _run, idx)] = idx
+                    in_flight_per_site[site] += 1
+
+            # Wake up periodically to enforce timeouts even if nothing finishes
+            poll = None if timeout is None else min(timeout, 0.5)
+            finished, _ = wait(list(in_flight), timeout=poll, return_when=FIRST_COMPLETED)
+            completed = []
+            for future in finished:
+                idx = in_flight.pop(future)
+                try:
+                    completed.append((idx, future.result(), None))
+                except Exception as e:
+                    completed.append((idx, None, e))
+
+            if timeout is not None:
+                now = time.monotonic()
+                for future, idx in list(in_flight.items()):
+                    if idx in started and now - started[idx] > timeout:
+                        del in_flight[future]
+                        future.cancel()
+                        instrumentation.record('scrape', now - started[idx], site=query_site(queries[idx]),
+                                               target=queries[idx].get('search_term'), errors=1)
+                        completed.append((idx, None, TimeoutError(f"timed out after {timeout}s")))
+
+            for idx, frame, error in completed:
+                remaining -= 1
+                in_flight_per_site[query_site(queries[idx])] -= 1
+                yield idx, frame, error
+    finally:
+        # Don't block on abandoned (timed-out) queries
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_queries(queries, scrape_fn=None, max_workers=DEFAULT_MAX_WORKERS,
+                per_site_limit=DEFAULT_PER_SITE_LIMIT, timeout=DEFAULT_QUERY_TIMEOUT,
+                on_result=None):
+    """
+    Run scrape_fn(**query) for every query concurrently (see iter_queries).
+
+    Returns (frames, errors). frames holds the DataFrames of the queries that
+    succeeded, in the same order as `queries`, so downstream drop_duplicates is
+    deterministic. errors is a list of {'query', 'label', 'error'} dicts for
+    queries that raised or timed out; they never abort the rest of the run.
+
+    on_result(query, frame, error, done, total) is called from the calling thread
+    as each query finishes, which makes it safe to update Streamlit widgets from it.
+    """
+    total = len(queries)
+    results = [None] * total
+    errors = []
+    done = 0
+    for idx, frame, error in iter_queries(queries, scrape_fn=scrape_fn, max_workers=max_workers,
+                                          per_site_limit=per_site_limit, timeout=timeout):
+        done += 1
+        query = queries[idx]
+        if error is not None:
+            logger.warning(f"Query {query_label(query)} failed: {error}")
+            errors.append({'query': query, 'label': query_label(query), 'error': error})
+        else:
+            results[idx] = frame
+        if on_result is not None:
+            on_result(query, frame, error, done, total)
+
+    frames = [frame for frame in results if frame is not None]
+    return frames, errors
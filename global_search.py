@@ -0,0 +1,201 @@
+"""
+The Global Search pipeline, independent of the page that shows it.
+
+run_search scrapes every (site, term, job type) query concurrently, merges and
+dedupes the results, optionally keeps only postings that are new since the last
+scan, and verifies links. It is meant to run as a background task (see
+task_runner): partial results are published with report_progress as each board
+answers and as link statuses come in.
+"""
+import functools
+import time
+
+import pandas as pd
+
+import compaction
+import dedup
+import fanout
+import instrumentation
+import link_checker
+import location_shards
+import pagination
+import ranking
+import results_archive
+import search_index
+import scrape_cache
+import seen_store
+from linkedin import add_linkedin_columns
+from task_runner import report_progress
+
+PARTIAL_REFRESH_SECONDS = 0.5  # at most this often while link statuses stream in
+
+
+def merge_results(frames, use_minhash=False):
+    """
+    Concatenate compacted query results (see compaction) and drop repeated
+    job_urls and cross-site duplicates. The result is compacted as well.
+    """
+    jobs = compaction.concat_jobs(frames)
+    jobs = jobs.drop_duplicates(subset=['job_url'], keep='first')
+    if use_minhash:
+        # Near-duplicate matching is the one step that reads every description
+        jobs = compaction.with_descriptions(jobs)
+    # The same posting on several boards collapses to one row
+    return compaction.compact_jobs(dedup.collapse_duplicates(jobs, use_minhash=use_minhash))
+
+
+def search_scope(sites, search_terms, location, hours_old, job_types, is_remote, max_results):
+    """seen_store scope for a search: the same filters give the same scope."""
+    return "search:" + scrape_cache.cache_key({
+        'site_name': sites,
+        'search_term': "|".join(sorted(t.lower() for t in search_terms)),
+        'location': location,
+        'hours_old': hours_old,
+        'job_type': ",".join(sorted(job_types)) or None,
+        'is_remote': is_remote,
+        'results_wanted': max_results,
+    })
+
+
+@instrumentation.traced('search')
+def run_search(sites, search_terms, job_types=None, location="Georgia", hours_old=24,
+               is_remote=False, max_results=20, fuzzy_dedup=False, new_only=False,
+               verify_links=False, adaptive=False, shard=False, rank=True, top_k=None,
+               use_cache=True, cache_ttl=None, use_limiter=True, archive=True):
+    """
+    Run a Global Search and return the result frame.
+
+    attrs['errors'] lists the queries that failed, and with new_only,
+    attrs['disappeared'] lists postings the same search no longer returns.
+    All merged results, new or not, are appended to the results archive unless
+    archive is False, and every scraped posting is added to the full-text index (see search_index).
+    Result frames are compacted: descriptions are loaded on demand with
+    compaction.with_descriptions.
+    With adaptive, each query pages through results with max_results as the cap
+    (see pagination) and attrs['coverage'] reports per query whether it is complete.
+    With shard, a broad location is also searched metro by metro (see
+    location_shards) and attrs['shards'] reports what each shard added.
+    attrs['timings'] holds the run's per-stage wall times, rows and errors (see
+    instrumentation).
+    With rank, results are sorted by relevance to the search terms with a
+    'score' column (see ranking), and top_k keeps only the best top_k postings.
+    use_cache and cache_ttl go to scrape_cache.cached_scrape_jobs for every query,
+    and use_limiter turns adaptive rate limiting (see rate_limiter) of the run's
+    scrapes and link checks on or off.
+    """
+    job_types = job_types or []
+    # 1. JobSpy Search, one query per (site, term, job type), run concurrently.
+    # Partial results are published as each board answers; merging in query
+    # order keeps the final dedup identical to a non-streamed run
+    queries = fanout.build_queries(
+        sites, search_terms, job_types,
+        location=location,
+        results_wanted=max_results,
+        hours_old=hours_old,
+        is_remote=is_remote,
+        country_indeed='USA',
+    )
+    shard_of = [None] * len(queries)
+    if shard:
+        queries, shard_of = location_shards.shard_queries(queries)
+    frames = {}
+    shard_results = []
+
+    def _label(idx):
+        label = fanout.query_label(queries[idx])
+        return f"{label} in {shard_of[idx]}" if shard_of[idx] else label
+
+    errors = []
+    coverage = []
+    fetch = pagination.adaptive_scrape if adaptive else scrape_cache.cached_scrape_jobs
+    scrape_fn = functools.partial(fetch, use_cache=use_cache, cache_ttl=cache_ttl, use_limiter=use_limiter)
+    report_progress(0, len(queries), "Scraping Job Boards...")
+    for done, (idx, frame, error) in enumerate(fanout.iter_queries(queries, scrape_fn=scrape_fn), start=1):
+        partial = None
+        if error is not None:
+            errors.append(f"JobSpy error for {_label(idx)}: {error}")
+        elif frame is not None:
+            if 'coverage' in frame.attrs:
+                coverage.append(dict(query=_label(idx), **frame.attrs['coverage']))
+            # Index the full postings, then keep their descriptions in the side store
+            site = fanout.query_site(queries[idx])
+            with instrumentation.stage('index', site=site, rows=len(frame)):
+                search_index.index_jobs(frame)
+            with instrumentation.stage('compact', site=site) as span:
+                frame = compaction.compact_jobs(frame)
+                instrumentation.frame_stats(span, frame)
+            shard_results.append((location, shard_of[idx], frame))
+            if not frame.empty:
+                frames[idx] = frame
+                partial = merge_results([frames[i] for i in sorted(frames)])
+        report_progress(done, len(queries), f"Scraping Job Boards... {done}/{len(queries)} queries done",
+                        partial=partial)
+
+    with instrumentation.stage('merge') as span:
+        if frames:
+            jobs = merge_results([frames[i] for i in sorted(frames)], use_minhash=fuzzy_dedup)
+        else:
+            jobs = pd.DataFrame()
+        instrumentation.frame_stats(span, jobs)
+    # Everything the boards returned goes to the history archive, new or not
+    if archive:
+        with instrumentation.stage('archive', rows=len(jobs)):
+            results_archive.archive_results(
+                jobs, kind='search', sites=sites, search_terms=search_terms, job_types=job_types,
+                location=location, hours_old=hours_old, is_remote=is_remote, max_results=max_results,
+                adaptive=adaptive, shard=shard,
+            )
+
+    # 2. Delta mode: everything downstream only sees new or changed postings
+    disappeared = None
+    if new_only:
+        scope = search_scope(sites, search_terms, location, hours_old, job_types, is_remote, max_results)
+        with instrumentation.stage('delta') as span:
+            jobs, disappeared = seen_store.get_store().delta(jobs, scope=scope)
+            span['rows'] = len(jobs)
+
+    # 3. Relevance ranking, before the per-row work so a top_k cutoff saves it
+    if rank and not jobs.empty:
+        attrs = dict(jobs.attrs)
+        with instrumentation.stage('rank', rows=len(jobs)):
+            jobs = ranking.rank_jobs(jobs, search_terms, top_k=top_k)
+        jobs.attrs = attrs
+
+    if not jobs.empty:
+        # Add 'source' col if not present
+        if 'source' not in jobs.columns:
+            jobs['source'] = 'Job Board'
+        # 4. LinkedIn people search links
+        with instrumentation.stage('linkedin', rows=len(jobs)):
+            jobs = add_linkedin_columns(jobs).reset_index(drop=True)
+
+    # 5. Optional Link Verification, statuses published as they arrive
+    if verify_links and not jobs.empty:
+        checked = {}
+        last_refresh = [0.0]
+
+        def _on_link_checked(url, result):
+            checked[url] = result['status']
+            if time.monotonic() - last_refresh[0] >= PARTIAL_REFRESH_SECONDS:
+                last_refresh[0] = time.monotonic()
+                statuses = jobs['job_url'].map(checked).fillna("Checking...")
+                report_progress(partial=jobs.assign(url_status=statuses))
+
+        with instrumentation.stage('verify_links', rows=len(jobs)):
+            url_df = link_checker.verify_jobs(
+                jobs,
+                on_progress=lambda done, total: report_progress(done, total, "Verifying links..."),
+                on_result=_on_link_checked,
+                use_limiter=use_limiter,
+            )
+        jobs['url_status'] = url_df['url_status']
+        jobs['best_url'] = url_df['best_url']  # Store the real URL
+
+    jobs.attrs['errors'] = errors
+    if adaptive:
+        jobs.attrs['coverage'] = coverage
+    if shard:
+        jobs.attrs['shards'] = location_shards.shard_report(shard_results)
+    if disappeared is not None:
+        jobs.attrs['disappeared'] = disappeared.to_dict('records')
+    return jobs
@@ -0,0 +1,190 @@
+"""
+Lightweight per-stage timing and throughput instrumentation.
+
+Pipeline stages run under stage(), which measures wall time, counts an error
+when the stage raises, and takes the rows/bytes the stage reports on its span:
+
+    with instrumentation.stage('linkedin', rows=len(jobs)) as span:
+        jobs = add_linkedin_columns(jobs)
+
+Each finished stage is
+- logged as one JSON line through the company_monitor logger,
+- added to the current run's Trace, aggregated per (stage, site, target) where
+  target is the company or search term, which traced() pipelines return in
+  attrs['timings'],
+- added to the process-wide Recorder's latency samples per (stage, site), so
+  percentiles accumulate across runs and sessions.
+
+Traces follow the run into fanout's worker threads (they live in a contextvar
+that fanout copies into every query), so per-board scrape timings land in the
+search that started them even while other sessions search at the same time.
+"""
+import collections
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import shared
+
+# Stage events go to the app's existing log stream
+logger = logging.getLogger("company_monitor")
+
+DEFAULT_MAX_SAMPLES = 1000  # latency samples kept per (stage, site)
+PERCENTILES = (50, 90, 99)
+
+_current_trace = contextvars.ContextVar("instrumentation_trace", default=None)
+
+
+class Trace:
+    """Stage statistics of one run, aggregated per (stage, site, target)."""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, site=None, target=None, rows=None, bytes=None, errors=0):
+        with self._lock:
+            stats = self._stats.setdefault((stage, site, target), {
+                'stage': stage, 'site': site, 'target': target, 'calls': 0, 'seconds': 0.0,
+                'max_seconds': 0.0, 'rows': 0, 'bytes': 0, 'errors': 0})
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['rows'] += rows or 0
+            stats['bytes'] += bytes or 0
+            stats['errors'] += errors
+
+    def records(self):
+        """Per-stage stats in the order the stages first finished."""
+        with self._lock:
+            return [dict(s, seconds=round(s['seconds'], 4), max_seconds=round(s['max_seconds'], 4))
+                    for s in self._stats.values()]
+
+
+class Recorder:
+    """Process-wide latency samples per (stage, site), for percentiles across runs."""
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._samples = {}
+        self._errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, site=None, errors=0):
+        with self._lock:
+            key = (stage, site)
+            if key not in self._samples:
+                self._samples[key] = collections.deque(maxlen=self.max_samples)
+            self._samples[key].append(seconds)
+            self._errors[key] += errors
+
+    def percentiles(self, stage=None):
+        """
+        DataFrame of stage, site, calls, errors and p50/p90/p99/max latency in
+        seconds over the retained samples, optionally for one stage.
+        """
+        with self._lock:
+            items = [(key, np.array(samples), self._errors[key]) for key, samples in self._samples.items()
+                     if stage is None or key[0] == stage]
+        rows = []
+        for (name, site), samples, errors in items:
+            row = {'stage': name, 'site': site, 'calls': len(samples), 'errors': errors}
+            row.update({f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(samples, PERCENTILES))})
+            row['max'] = float(samples.max())
+            rows.append(row)
+        columns = ['stage', 'site', 'calls', 'errors'] + [f"p{q}" for q in PERCENTILES] + ['max']
+        return pd.DataFrame(rows, columns=columns)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._errors.clear()
+
+
+_recorder = shared.ProcessWide(Recorder)
+get_recorder = _recorder.get
+set_recorder = _recorder.set
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def record(stage, seconds, site=None, target=None, rows=None, bytes=None, errors=0, log=True):
+    """
+    Record one finished stage: the current trace, the latency samples and, with
+    log, a JSON log line (per-URL link checks are too many to log one by one).
+    """
+    trace = current_trace()
+    if trace is not None:
+        trace.add(stage, seconds, site=site, target=target, rows=rows, bytes=bytes, errors=errors)
+    get_recorder().observe(stage, seconds, site=site, errors=errors)
+    if log:
+        event = {'event': 'stage', 'stage': stage, 'seconds': round(seconds, 4)}
+        event.update({k: v for k, v in [('site', site), ('target', target), ('rows', rows), ('bytes', bytes)]
+                      if v is not None})
+        event['errors'] = errors
+        if trace is not None:
+            event.update(trace=trace.id, run=trace.name)
+        logger.info(json.dumps(event, default=str))
+
+
+@contextmanager
+def stage(name, site=None, target=None, rows=None, bytes=None):
+    """
+    Time the block as pipeline stage `name`. The yielded span is a dict whose
+    'rows', 'bytes' and 'errors' the block may set; an exception counts as an
+    error and propagates.
+    """
+    span = {'rows': rows, 'bytes': bytes, 'errors': 0}
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span['errors'] += 1
+        raise
+    finally:
+        record(name, time.perf_counter() - start, site=site, target=target,
+               rows=span['rows'], bytes=span['bytes'], errors=span['errors'])
+
+
+def frame_stats(span, jobs):
+    """Put a result frame's row count and memory footprint on a stage span."""
+    if jobs is not None:
+        span['rows'] = len(jobs)
+        span['bytes'] = int(jobs.memory_usage(deep=True).sum())
+
+
+def traced(name):
+    """
+    Decorator for pipeline functions returning a DataFrame: the call runs under
+    its own Trace, is timed as stage 'total', and its result gets the trace's
+    records in attrs['timings'].
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = Trace(name)
+            token = _current_trace.set(trace)
+            try:
+                with stage('total', target=name) as span:
+                    result = fn(*args, **kwargs)
+                    if isinstance(result, pd.DataFrame):
+                        span['rows'] = len(result)
+            finally:
+                _current_trace.reset(token)
+            if isinstance(result, pd.DataFrame):
+                result.attrs['timings'] = trace.records()
+            return result
+        return wrapper
+    return decorate
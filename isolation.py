@@ -0,0 +1,34 @@
+"""
+Fresh process-wide caches and stores in a scratch directory, for tests and benchmarks.
+
+The scrape and link caches, seen store, results archive, description store and
+full-text index are process-wide (see shared.ProcessWide). fresh_stores()
+builds a throwaway instance of each under one directory, plus a rate limiter
+registry with pacing turned off since fake boards answer instantly. The
+`isolated` fixture in conftest.py swaps them in for a test; bench_suite.isolate
+swaps them in for a benchmark run.
+"""
+import os
+
+import compaction
+import link_cache
+import rate_limiter
+import results_archive
+import scrape_cache
+import search_index
+import seen_store
+
+
+def fresh_stores(path):
+    """(process-wide holder, new instance under path) for every store; see shared.ProcessWide."""
+    registry = rate_limiter.RateLimiterRegistry()
+    registry.enabled = False
+    return [
+        (scrape_cache._cache, scrape_cache.ScrapeCache(path=os.path.join(path, "scrape.sqlite"))),
+        (link_cache._cache, link_cache.LinkCache(path=os.path.join(path, "links.sqlite"))),
+        (seen_store._store, seen_store.SeenStore(path=os.path.join(path, "seen.sqlite"))),
+        (results_archive._archive, results_archive.ResultsArchive(path=os.path.join(path, "archive"))),
+        (compaction._store, compaction.DescriptionStore(path=os.path.join(path, "descriptions.sqlite"))),
+        (search_index._index, search_index.JobIndex(path=os.path.join(path, "index.sqlite"))),
+        (rate_limiter._registry, registry),
+    ]
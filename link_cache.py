@@ -0,0 +1,100 @@
+"""
+Persistent cache of link verification results.
+
+Stores the final URL, status and check time per job URL in SQLite. How long an
+entry stays valid depends on the outcome: a posting that already redirected to an
+"expired" page will not come back, while an 'Error' is worth retrying soon.
+Lookups are done in bulk, so a whole result set costs one query.
+"""
+import json
+import os
+import threading
+import time
+
+import shared
+
+DEFAULT_CACHE_PATH = os.environ.get("JOBHUNT_LINK_CACHE_PATH", os.path.join(".cache", "link_cache.sqlite"))
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Seconds a verification result stays valid, by url_status
+STATUS_TTLS = {
+    'Unavailable (Redirected)': 14 * DAY,
+    '200 OK': DAY,
+    'Status 404': 7 * DAY,
+    'Status 410': 14 * DAY,
+    'Error': 10 * 60,
+    'Status 429': 10 * 60,  # throttled, says nothing about the posting
+}
+DEFAULT_STATUS_TTL = HOUR  # any other "Status NNN"
+
+
+def ttl_for(status):
+    return STATUS_TTLS.get(status, DEFAULT_STATUS_TTL)
+
+
+class LinkCache:
+    """SQLite-backed cache of {url: {'status', 'url_to_use'}} with per-status TTLs."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                " url TEXT PRIMARY KEY, status TEXT, final_url TEXT,"
+                " checked_at REAL, expires_at REAL)"
+            )
+
+    def _connect(self):
+        return shared.connect(self.path)
+
+    def get_many(self, urls):
+        """Return {url: {'status', 'url_to_use', 'checked_at'}} for the still-valid cached URLs."""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, status, final_url, checked_at FROM links"
+                " WHERE url IN (SELECT value FROM json_each(?)) AND expires_at > ?",
+                (json.dumps(urls), time.time()),
+            ).fetchall()
+        found = {url: {'status': status, 'url_to_use': final_url, 'checked_at': checked_at}
+                 for url, status, final_url, checked_at in rows}
+        self.hits += len(found)
+        self.misses += len(urls) - len(found)
+        return found
+
+    def put_many(self, results):
+        """Store {url: {'status', 'url_to_use'}} in one transaction."""
+        if not results:
+            return
+        now = time.time()
+        rows = [(url, r['status'], r.get('url_to_use'), now, now + ttl_for(r['status']))
+                for url, r in results.items()]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("DELETE FROM links WHERE expires_at <= ?", (now,))
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM links")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+
+_cache = shared.ProcessWide(LinkCache)
+get_cache = _cache.get
+set_cache = _cache.set
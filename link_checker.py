@@ -0,0 +1,248 @@
+"""
+Pooled, asyncio-based job link verification.
+
+All checks in a run share one aiohttp session, so connections are kept alive and
+reused, and the connector caps how many requests are in flight per host. Each URL
+is probed with HEAD first; only when that is inconclusive do we fall back to a GET
+that reads at most a small byte budget before the connection is released.
+"""
+import asyncio
+import collections
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+import cassette
+import company_monitor
+import instrumentation
+import link_cache
+import rate_limiter
+import single_flight
+
+logger = logging.getLogger(__name__)
+
+ERROR_KEYWORDS = ['error', 'expired', 'notfound', 'job-closed', 'job_closed']
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_TIMEOUT = 10  # seconds per URL
+DEFAULT_BYTE_BUDGET = 4096
+
+
+def classify(status_code, final_url):
+    """Turn a response into the url_status label shown in the app."""
+    final_url_lower = str(final_url).lower()
+    # Check for soft 404s (redirects to error pages)
+    if any(keyword in final_url_lower for keyword in ERROR_KEYWORDS):
+        return 'Unavailable (Redirected)'
+    if status_code == 200:
+        return '200 OK'
+    return f"Status {status_code}"
+
+
+async def _check_one(session, url, timeout, byte_budget):
+    """
+    _request, timed per host for the 'check_url' latency percentiles (see
+    instrumentation), and recorded or replayed when a cassette is active.
+    """
+    tape = cassette.get_cassette()
+    start = time.perf_counter()
+    if tape is not None and tape.replaying:
+        try:
+            result, seconds = tape.replay_check(url)
+            await asyncio.sleep(tape.delay(seconds))
+        except cassette.CassetteMiss as e:
+            logger.warning(str(e))
+            result = {'status': 'Error', 'url_to_use': None}
+    else:
+        result = await _request(session, url, timeout, byte_budget)
+    seconds = time.perf_counter() - start
+    if tape is not None and tape.recording:
+        tape.record_check(url, result, seconds)
+    instrumentation.record('check_url', seconds, site=urlsplit(url).netloc,
+                           errors=int(result['status'] == 'Error'), log=False)
+    return result
+
+
+async def _request(session, url, timeout, byte_budget):
+    """Check one URL: HEAD first, then a byte-limited GET if HEAD is inconclusive."""
+    import aiohttp
+    try:
+        try:
+            async with session.head(url, allow_redirects=True, timeout=timeout) as resp:
+                status = classify(resp.status, resp.url)
+                final_url = str(resp.url)
+            # Many ATS pages reject or mis-answer HEAD, so only trust a clear answer
+            # (a 429 is one: a GET right away would only dig the hole deeper)
+            if status in ('200 OK', 'Unavailable (Redirected)', 'Status 429'):
+                return {'status': status, 'url_to_use': final_url}
+        except aiohttp.ClientError:
+            pass  # some servers drop HEAD requests outright; retry with GET
+
+        async with session.get(url, allow_redirects=True, timeout=timeout) as resp:
+            await resp.content.read(byte_budget)
+            final_url = str(resp.url)
+            # Leaving the block releases the connection without draining the body
+            return {'status': classify(resp.status, final_url), 'url_to_use': final_url}
+    except Exception as e:
+        logger.debug(f"Link check failed for {url}: {e}")
+        return {'status': 'Error', 'url_to_use': None}
+
+
+async def _check_limited(session, url, timeout, byte_budget, limiters, host_slots):
+    """_check_one under the host's adaptive rate limit, retrying after a 429."""
+    if limiters is None:
+        return await _check_one(session, url, timeout, byte_budget)
+    host = urlsplit(url).netloc
+    limiter = limiters.get('link', host)
+    # Only as many checks per host wait on the limiter as may be in flight, so
+    # queued checks pick up rate changes instead of booking slots at the old rate
+    async with host_slots[host]:
+        for _ in range(rate_limiter.MAX_THROTTLE_RETRIES + 1):
+            await limiter.acquire_async()
+            result = await _check_one(session, url, timeout, byte_budget)
+            if result['status'] != 'Status 429':
+                if result['status'] != 'Error':
+                    limiter.success()
+                return result
+            limiter.throttled()
+    return result
+
+
+async def verify_urls_async(urls, max_connections=DEFAULT_MAX_CONNECTIONS,
+                            max_per_host=DEFAULT_MAX_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                            byte_budget=DEFAULT_BYTE_BUDGET, headers=None, on_progress=None,
+                            use_cache=True, on_result=None, use_limiter=True):
+    """
+    Check unique URLs concurrently over one pooled session.
+    Returns {url: {'status', 'url_to_use'}}; on_progress(done, total) fires per URL,
+    and on_result(url, result) hands over each result as soon as it is known.
+    With use_cache, URLs checked recently (see link_cache.STATUS_TTLS) are answered
+    from the verification cache and only the rest go over the network. URLs that
+    another run is checking right now share that check (see single_flight).
+    With use_limiter, requests to each host are paced by rate_limiter and 429s
+    are retried after a backoff.
+    """
+    unique = list(dict.fromkeys(urls))
+    total = len(unique)
+    results = {}
+    if not unique:
+        return results
+
+    tape = cassette.get_cassette()
+    # With a cassette active every URL is recorded or replayed, not answered from the cache
+    cache = link_cache.get_cache() if use_cache and tape is None else None
+    if cache is not None and cache.enabled:
+        for url, cached in cache.get_many(unique).items():
+            results[url] = {'status': cached['status'], 'url_to_use': cached['url_to_use']}
+            if on_result is not None:
+                on_result(url, results[url])
+        unique = [url for url in unique if url not in results]
+    done = len(results)
+    if on_progress is not None and done:
+        on_progress(done, total)
+    if not unique:
+        return results
+
+    checked = {}
+    flights = single_flight.group("check_url")
+    limiters = rate_limiter.get_registry() if use_limiter else None
+    if limiters is not None and (not limiters.enabled or (tape is not None and tape.replaying)):
+        limiters = None
+    host_slots = collections.defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    # aiohttp is imported on first use, it takes a noticeable part of app startup
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_per_host,
+                                     ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector,
+                                     headers=headers or company_monitor.DEFAULT_HEADERS) as session:
+        async def _run(url):
+            # A URL already being checked by another run (e.g. another session) is
+            # awaited rather than requested again
+            future, leader = flights.claim(url)
+            if not leader:
+                try:
+                    # shield: cancelling this run must not cancel the shared check
+                    return url, await asyncio.shield(asyncio.wrap_future(future))
+                except Exception:
+                    # The other run gave up on it (e.g. was cancelled); check it here
+                    return url, await _check_limited(session, url, client_timeout, byte_budget, limiters, host_slots)
+            try:
+                result = await _check_limited(session, url, client_timeout, byte_budget, limiters, host_slots)
+            except BaseException as e:
+                # Waiters must not see our CancelledError as their own
+                flights.resolve(url, future, error=e if isinstance(e, Exception)
+                                else RuntimeError(f"Check of {url} was abandoned"))
+                raise
+            flights.resolve(url, future, result)
+            return url, result
+
+        for next_done in asyncio.as_completed([_run(url) for url in unique]):
+            url, result = await next_done
+            checked[url] = result
+            done += 1
+            if on_result is not None:
+                on_result(url, result)
+            if on_progress is not None:
+                on_progress(done, total)
+
+    if cache is not None and cache.enabled:
+        cache.put_many(checked)
+    if tape is not None and tape.recording:
+        tape.flush()
+    results.update(checked)
+    return results
+
+
+def _run_coroutine(coro):
+    """Run a coroutine from sync code, even if this thread already has a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # e.g. inside Jupyter: run on a private loop in a helper thread
+    box = {}
+
+    def _target():
+        try:
+            box['result'] = asyncio.run(coro)
+        except BaseException as e:
+            box['error'] = e
+
+    thread = threading.Thread(target=_target)
+    thread.start()
+    thread.join()
+    if 'error' in box:
+        raise box['error']
+    return box['result']
+
+
+def verify_urls(urls, **kwargs):
+    """Synchronous wrapper around verify_urls_async."""
+    return _run_coroutine(verify_urls_async(urls, **kwargs))
+
+
+def verify_jobs(jobs, url_column='job_url', missing_status='Missing Link', on_progress=None, **kwargs):
+    """
+    Verify the links in `jobs[url_column]`.
+    Returns a DataFrame aligned to jobs.index with 'url_status' and 'best_url' columns.
+    Extra keyword arguments (e.g. on_result for streaming statuses) go to verify_urls_async.
+    """
+    out = pd.DataFrame({'url_status': missing_status, 'best_url': None}, index=jobs.index, dtype=object)
+    if jobs.empty or url_column not in jobs.columns:
+        return out
+
+    urls = jobs[url_column]
+    has_url = urls.notna() & (urls.astype(str).str.strip() != '')
+    url_strings = urls[has_url].astype(str)
+
+    results = verify_urls(url_strings.tolist(), on_progress=on_progress, **kwargs)
+
+    out.loc[has_url, 'url_status'] = url_strings.map(lambda u: results[u]['status'])
+    out.loc[has_url, 'best_url'] = url_strings.map(lambda u: results[u]['url_to_use'])
+    return out
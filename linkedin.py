@@ -0,0 +1,58 @@
+"""
+LinkedIn people search links for job results.
+"""
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+PEOPLE_SEARCH_URL = "https://www.linkedin.com/search/results/people/?keywords="
+
+
+def build_linkedin_url(keywords):
+    """Build a LinkedIn people search URL from keywords."""
+    return f"{PEOPLE_SEARCH_URL}{quote(keywords)}"
+
+
+def _as_text(df, col):
+    """Column-wise str(value or ''), as the old row-wise helpers did per cell."""
+    if col not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[col]
+    # Convert each distinct value once; factorize folds None and NaN into -1
+    codes, uniques = pd.factorize(values)
+    text = np.array([str(v or '') for v in uniques] + [''], dtype=object)[codes]
+    # NaN is truthy, so str(NaN or '') is 'nan' while None gives ''
+    na = values.isna().to_numpy()
+    if na.any():
+        text[na] = [str(v or '') for v in values[na]]
+    return pd.Series(text, index=df.index, dtype=object)
+
+
+def add_linkedin_columns(df):
+    """Add LinkedIn people search columns to a DataFrame with job results."""
+    if df.empty:
+        return df
+
+    company = _as_text(df, 'company')
+    loc = _as_text(df, 'location')
+    title = _as_text(df, 'title')
+    no_company = (company == '').to_numpy()
+
+    keywords = pd.concat([
+        ("recruiter " + company + " " + loc).str.strip(),
+        ("hiring manager " + company + " " + loc).str.strip(),
+        (title + " " + company).str.strip(),
+    ], ignore_index=True)
+
+    # One quoting pass over the distinct keyword strings shared by all three columns;
+    # repeated (company, location) pairs are only quoted once
+    codes, uniques = pd.factorize(keywords)
+    urls = np.array([build_linkedin_url(k) for k in uniques], dtype=object)[codes]
+
+    n = len(df)
+    for i, col in enumerate(['find_recruiter', 'find_manager', 'find_team']):
+        col_urls = urls[i * n:(i + 1) * n]
+        col_urls[no_company] = None
+        df[col] = col_urls
+    return df
@@ -0,0 +1,93 @@
+"""
+Location-sharded fan-out for broad regions.
+
+Boards cap how many results one query can return, so a search for "Georgia" or
+"USA" misses postings however high results_wanted is. With sharding, a query on
+a broad location (a US state, or the whole country, per location_shards.yaml) is
+run once as-is and once per metro area in that region, concurrently; the
+results are merged and deduped downstream as usual. shard_report() says how many
+postings each shard added over the unsharded query, which shows whether the
+shards pull their weight.
+"""
+import os
+import threading
+
+import yaml
+
+DEFAULT_SHARDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "location_shards.yaml")
+_COUNTRY_SUFFIXES = (", usa", ", us", ", united states")
+
+_aliases = None
+_aliases_lock = threading.Lock()
+
+
+def _norm(location):
+    text = " ".join(str(location or "").lower().split())
+    for suffix in _COUNTRY_SUFFIXES:
+        if text.endswith(suffix) and text != suffix.lstrip(", "):
+            text = text[:-len(suffix)]
+    return text
+
+
+def _load_aliases(path=DEFAULT_SHARDS_PATH):
+    """{normalized alias: (region, shards)} from the bundled region list (read once)."""
+    global _aliases
+    with _aliases_lock:
+        if _aliases is None:
+            with open(path, "r") as f:
+                regions = yaml.safe_load(f).get('regions', {})
+            _aliases = {}
+            for region, entry in regions.items():
+                for alias in [region] + list(entry.get('aliases') or []):
+                    _aliases[_norm(alias)] = (region, list(entry.get('shards') or []))
+        return _aliases
+
+
+def shards_for(location):
+    """Metro-area locations that cover `location`, or [] if it is not a broad region."""
+    match = _load_aliases().get(_norm(location))
+    return list(match[1]) if match else []
+
+
+def shard_queries(queries):
+    """
+    Expand scrape_jobs query dicts whose location is a broad region into the
+    unsharded query plus one query per shard. Returns (queries, shards) where
+    shards[i] is the shard location of queries[i], or None for an unsharded query.
+    """
+    expanded, shards = [], []
+    for query in queries:
+        expanded.append(query)
+        shards.append(None)
+        for shard in shards_for(query.get('location')):
+            expanded.append(dict(query, location=shard))
+            shards.append(shard)
+    return expanded, shards
+
+
+def shard_report(results):
+    """
+    results: (region, shard, frame) per finished query, where region is the
+    location that was sharded and shard is None for the unsharded queries.
+    Returns one {'region', 'shard', 'rows', 'added'} dict per shard, plus an
+    'unsharded' row per region; added counts job_urls that none of the region's
+    unsharded queries returned. Sorted by region, then most useful shard first.
+    """
+    base_urls = {}
+    for region, shard, frame in results:
+        urls = base_urls.setdefault(region, set())
+        if shard is None and frame is not None and 'job_url' in frame.columns:
+            urls.update(frame['job_url'].dropna())
+
+    rows = {}
+    for region, shard, frame in results:
+        key = (region, shard or 'unsharded')
+        entry = rows.setdefault(key, {'region': region, 'shard': key[1], 'rows': 0, 'added': set()})
+        if frame is None or 'job_url' not in frame.columns:
+            continue
+        entry['rows'] += len(frame)
+        if shard is not None:
+            entry['added'].update(set(frame['job_url'].dropna()) - base_urls[region])
+
+    report = [dict(entry, added=len(entry['added'])) for entry in rows.values()]
+    return sorted(report, key=lambda r: (r['region'], r['shard'] != 'unsharded', -r['added']))
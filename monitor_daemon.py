@@ -0,0 +1,334 @@
+"""
+Headless scheduled monitor: runs the watchlist scan and the saved searches from
+companies.yaml without the Streamlit app, once or on an interval.
+
+    python monitor_daemon.py --once                      # one run, then exit
+    python monitor_daemon.py --interval 60 --jitter 0.1  # every 60 +/- 6 minutes
+
+Each run is split into units: the watchlist companies in chunks of
+company_monitor.DEFAULT_BATCH_SIZE (so they still share boolean OR queries) and
+one unit per saved search. Units run concurrently, and so do the queries inside
+each unit, as in the app. Every finished unit is written to
+<output-dir>/<run id>/<unit>.parquet and recorded in <state-dir>/checkpoint.json,
+so a run that is interrupted (killed, crashed, stopped with Ctrl-C) resumes with
+the companies and searches it had not finished the next time it starts. A lock
+file keeps two runs, e.g. a cron job and a daemon, from overlapping. A finished
+run writes manifest.json next to its Parquet files and prints it as one JSON
+line.
+
+Besides aggregator_companies, companies.yaml may hold the scan filters (the
+app's sidebar Search Filters) and Global Searches to run:
+
+    monitor:
+      sites: [indeed, linkedin]
+      location: Georgia
+      hours_old: 24
+      results_wanted: 20
+      new_only: true
+    saved_searches:
+      - name: research-georgia
+        search_terms: [research associate, research scientist]
+        hours_old: 168
+"""
+import argparse
+import datetime
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import random
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cassette
+import company_monitor
+import compaction
+import global_search
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = os.environ.get("JOBHUNT_MONITOR_OUTPUT", "monitor_results")
+DEFAULT_STATE_DIR = os.environ.get("JOBHUNT_MONITOR_STATE", os.path.join(".cache", "monitor"))
+DEFAULT_INTERVAL = 60  # minutes
+DEFAULT_JITTER = 0.1  # fraction of the interval
+DEFAULT_PARALLEL_UNITS = 2
+RESUME_MAX_AGE = 12 * 60 * 60  # seconds after which an unfinished run is abandoned
+
+# Scan filters used when companies.yaml has no monitor: section (or omits a key)
+DEFAULT_SETTINGS = {
+    'sites': ["indeed", "linkedin"],
+    'location': "Georgia",
+    'hours_old': 24,
+    'results_wanted': 20,
+    'job_types': [],
+    'is_remote': False,
+    'new_only': True,
+    'adaptive': False,
+    'shard': False,
+    'keyword_index': False,
+}
+SEARCH_OPTIONS = ['fuzzy_dedup', 'verify_links', 'rank', 'top_k']
+
+
+class RunLocked(Exception):
+    """Another monitor run holds the lock."""
+
+
+class RunLock:
+    """Exclusive, non-blocking lock on a file, released when the holder exits or dies."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._file.seek(0)
+            holder = self._file.read().strip()
+            self._file.close()
+            raise RunLocked(f"Another monitor run holds {self.path} (pid {holder or 'unknown'})")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def _write_json(path, data):
+    """Write JSON atomically (temp file + rename), so readers never see half a file."""
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def next_delay(interval, jitter=DEFAULT_JITTER, rng=random):
+    """Seconds until the next run: interval (seconds) +/- a random `jitter` fraction of it."""
+    return max(0.0, interval * (1 + rng.uniform(-jitter, jitter)))
+
+
+def plan_units(config, done=(), chunk_size=company_monitor.DEFAULT_BATCH_SIZE):
+    """
+    Split a run into units, skipping the companies and searches in `done`:
+    {'id', 'kind', 'keys', 'companies' | 'search'} dicts, where keys are the
+    checkpoint entries a finished unit adds ('watchlist:<name>', 'search:<name>').
+    """
+    done = set(done)
+    companies = [c for c in config.get('aggregator_companies') or []
+                 if c.get('name') and f"watchlist:{c['name']}" not in done]
+    units = []
+    for i in range(0, len(companies), max(1, chunk_size)):
+        chunk = companies[i:i + max(1, chunk_size)]
+        units.append({'id': f"watchlist-{_slug(chunk[0]['name'])}", 'kind': 'watchlist',
+                      'keys': [f"watchlist:{c['name']}" for c in chunk], 'companies': chunk})
+    for n, search in enumerate(config.get('saved_searches') or []):
+        name = str(search.get('name') or f"search-{n + 1}")
+        if f"search:{name}" not in done:
+            units.append({'id': f"search-{_slug(name)}", 'kind': 'search', 'keys': [f"search:{name}"],
+                          'search': search})
+    return units
+
+
+def _slug(text):
+    slug = "".join(ch if ch.isalnum() else "-" for ch in str(text).lower()).strip("-")
+    return slug[:40] + "-" + hashlib.sha1(str(text).encode("utf-8")).hexdigest()[:6]
+
+
+def _fingerprint(config):
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _run_unit(unit, settings, workers):
+    """Run one unit and return its result frame."""
+    if unit['kind'] == 'watchlist':
+        return company_monitor.scrape_aggregator_companies(
+            unit['companies'], sites=settings['sites'], location=settings['location'],
+            hours_old=settings['hours_old'], results_wanted=settings['results_wanted'],
+            job_types=settings['job_types'], is_remote=settings['is_remote'], max_workers=workers,
+            new_only=settings['new_only'], adaptive=settings['adaptive'], shard=settings['shard'],
+            keyword_index=settings['keyword_index'],
+        )
+    search = dict(settings, **unit['search'])
+    terms = search.get('search_terms') or [""]
+    return global_search.run_search(
+        search['sites'], [terms] if isinstance(terms, str) else terms, job_types=search['job_types'],
+        location=search['location'], hours_old=search['hours_old'], is_remote=search['is_remote'],
+        max_results=search.get('max_results', search['results_wanted']), new_only=search['new_only'],
+        adaptive=search['adaptive'], shard=search['shard'],
+        **{k: search[k] for k in SEARCH_OPTIONS if k in search},
+    )
+
+
+def _write_frame(jobs, path):
+    """Write a result frame, descriptions included, as Parquet."""
+    jobs = compaction.with_descriptions(jobs).copy()
+    jobs.attrs = {}
+    jobs.to_parquet(path, index=False)
+
+
+def _load_checkpoint(path, fingerprint, now):
+    """The unfinished run to resume, or None to start a new one."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if checkpoint.get('fingerprint') != fingerprint:
+        logger.info(f"Config changed since run {checkpoint.get('run_id')}; starting a new run")
+        return None
+    if now - checkpoint.get('started_at', 0) > RESUME_MAX_AGE:
+        logger.info(f"Run {checkpoint.get('run_id')} is too old to resume; starting a new run")
+        return None
+    return checkpoint
+
+
+def run_once(config_path="companies.yaml", output_dir=DEFAULT_OUTPUT_DIR, state_dir=DEFAULT_STATE_DIR,
+             workers=company_monitor.DEFAULT_SCAN_WORKERS, parallel_units=DEFAULT_PARALLEL_UNITS,
+             chunk_size=company_monitor.DEFAULT_BATCH_SIZE, stop=None):
+    """
+    One monitor run (resuming an interrupted one if there is one). Returns the
+    run's manifest, with status 'done' or, when `stop` was set before every unit
+    started, 'stopped' (the checkpoint is kept for the next run). Raises
+    RunLocked when another run is in progress.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    with RunLock(os.path.join(state_dir, "monitor.lock")):
+        config = company_monitor.load_config(config_path)
+        settings = dict(DEFAULT_SETTINGS, **(config.get('monitor') or {}))
+        checkpoint_path = os.path.join(state_dir, "checkpoint.json")
+        fingerprint = _fingerprint(config)
+        checkpoint = _load_checkpoint(checkpoint_path, fingerprint, time.time())
+        if checkpoint is None:
+            run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+            checkpoint = {'run_id': run_id, 'fingerprint': fingerprint, 'started_at': time.time(),
+                          'done': [], 'units': [], 'errors': []}
+        else:
+            logger.info(f"Resuming run {checkpoint['run_id']} after {len(checkpoint['done'])} finished entries")
+        run_dir = os.path.join(output_dir, checkpoint['run_id'])
+        os.makedirs(run_dir, exist_ok=True)
+        _write_json(checkpoint_path, checkpoint)
+
+        units = plan_units(config, done=checkpoint['done'], chunk_size=chunk_size)
+        checkpoint_lock = threading.Lock()
+        skipped = []
+
+        def _unit(unit):
+            if stop is not None and stop.is_set():
+                skipped.append(unit['id'])
+                return
+            started = time.monotonic()
+            try:
+                jobs = _run_unit(unit, settings, workers)
+                path = os.path.join(run_dir, f"{unit['id']}.parquet")
+                _write_frame(jobs, path)
+            except Exception as e:
+                logger.error(f"Monitor unit {unit['id']} failed: {e}")
+                with checkpoint_lock:
+                    checkpoint['errors'].append({'unit': unit['id'], 'error': str(e)})
+                    _write_json(checkpoint_path, checkpoint)
+                return
+            record = {'unit': unit['id'], 'kind': unit['kind'], 'path': path, 'rows': len(jobs),
+                      'seconds': round(time.monotonic() - started, 2),
+                      'errors': list(jobs.attrs.get('errors', [])),
+                      'disappeared': len(jobs.attrs.get('disappeared', [])),
+                      'timings': jobs.attrs.get('timings', [])}
+            with checkpoint_lock:
+                checkpoint['done'] += unit['keys']
+                checkpoint['units'].append(record)
+                _write_json(checkpoint_path, checkpoint)
+            logger.info(f"Monitor unit {unit['id']}: {record['rows']} rows in {record['seconds']}s")
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel_units), thread_name_prefix="monitor") as pool:
+            for future in as_completed([pool.submit(_unit, unit) for unit in units]):
+                future.result()
+
+        manifest = {
+            'run_id': checkpoint['run_id'],
+            'status': 'stopped' if skipped else 'done',
+            'started_at': datetime.datetime.fromtimestamp(checkpoint['started_at']).isoformat(timespec='seconds'),
+            'finished_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'output_dir': run_dir,
+            'rows': sum(u['rows'] for u in checkpoint['units']),
+            'units': checkpoint['units'],
+            'errors': checkpoint['errors'],
+        }
+        if skipped:
+            manifest['skipped'] = skipped
+        else:
+            _write_json(os.path.join(run_dir, "manifest.json"), manifest)
+            os.remove(checkpoint_path)
+        return manifest
+
+
+def serve(interval, jitter=DEFAULT_JITTER, stop=None, **run_kwargs):
+    """Run the monitor every `interval` seconds (+/- jitter) until `stop` is set."""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            print(json.dumps(run_once(stop=stop, **run_kwargs), default=str), flush=True)
+        except RunLocked as e:
+            logger.warning(f"Skipping this run: {e}")
+        except Exception as e:
+            logger.exception(f"Monitor run failed: {e}")
+        delay = next_delay(interval, jitter)
+        logger.info(f"Next monitor run in {delay / 60:.1f} minutes")
+        stop.wait(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="companies.yaml")
+    parser.add_argument("--once", action="store_true", help="Run once and exit instead of on an interval")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Minutes between runs")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                        help="Randomize each interval by up to this fraction, e.g. 0.1 for +/- 10%%")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR)
+    parser.add_argument("--workers", type=int, default=company_monitor.DEFAULT_SCAN_WORKERS,
+                        help="Concurrent queries per unit")
+    parser.add_argument("--parallel-units", type=int, default=DEFAULT_PARALLEL_UNITS,
+                        help="Watchlist chunks and saved searches run at the same time")
+    parser.add_argument("--cassette-mode", choices=cassette.MODES, default=cassette.DEFAULT_MODE,
+                        help="Record every scrape and link check, or replay them offline (see cassette)")
+    parser.add_argument("--cassette", default=cassette.DEFAULT_CASSETTE_PATH, help="Cassette directory")
+    parser.add_argument("--replay-latency", choices=cassette.LATENCIES, default=cassette.DEFAULT_LATENCY)
+    args = parser.parse_args()
+    cassette.configure(args.cassette_mode, path=args.cassette, latency=args.replay_latency)
+
+    # The first SIGTERM / Ctrl-C lets running units finish and keeps the checkpoint
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    run_kwargs = dict(config_path=args.config, output_dir=args.output_dir, state_dir=args.state_dir,
+                      workers=args.workers, parallel_units=args.parallel_units)
+    if not args.once:
+        serve(args.interval * 60, jitter=args.jitter, stop=stop, **run_kwargs)
+        return
+    try:
+        print(json.dumps(run_once(stop=stop, **run_kwargs), default=str), flush=True)
+    except RunLocked as e:
+        logger.warning(str(e))
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
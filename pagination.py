@@ -0,0 +1,160 @@
+"""
+Saturation-aware adaptive pagination for scrape_jobs.
+
+A fixed results_wanted either truncates a query (the board had more) or pays for
+a large fetch on a query with a dozen hits. adaptive_scrape starts with a small
+page and only asks for more - a geometrically larger page past the postings it
+has - while the previous page came back full. It stops when a page comes back
+short (the board ran out), when a page is mostly postings we already have (the
+board is repeating itself), or at the results_wanted cap, and records in
+frame.attrs['coverage'] whether the query's results are complete.
+
+JobSpy's boards do not all page the same way (see PAGING): some ignore offset,
+others round it down to whole pages, so each board's pages are asked for the way
+that board reads offset and results_wanted.
+"""
+import logging
+import math
+
+import pandas as pd
+
+import scrape_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_START_RESULTS = 25
+DEFAULT_GROWTH = 2
+DEFAULT_REPEAT_THRESHOLD = 0.8  # share of already-seen job_urls that ends the fetch
+
+# How JobSpy's scrapers read offset and results_wanted, per board. Boards not
+# listed are taken to return results_wanted postings starting at offset.
+PAGING = {
+    # Scraped from the first posting whatever the offset: ZipRecruiter, Bayt and
+    # BDJobs ignore it, Indeed and Google fetch offset + results_wanted postings
+    # and drop the first offset, so a later page pays for the whole prefix anyway
+    'indeed': {'from_start': True},
+    'google': {'from_start': True},
+    'ziprecruiter': {'from_start': True},
+    'bayt': {'from_start': True},
+    'bdjobs': {'from_start': True},
+    # offset is rounded down to a whole page
+    'linkedin': {'page': 10},
+    'naukri': {'page': 20},
+    # ... and results_wanted is where the last page ends, counted from the first
+    # posting (JobSpy stops at page results_wanted // 30 + 1 whatever the offset)
+    'glassdoor': {'page': 30, 'until': True},
+}
+
+
+def site_paging(site_name):
+    """
+    PAGING for a scrape_jobs site_name. A call to several boards is paged from
+    the first posting if any of them ignores offset, else in pages every one of
+    them can start at.
+    """
+    sites = [site_name] if isinstance(site_name, str) else list(site_name or [])
+    rules = [PAGING.get(str(site).lower(), {}) for site in sites]
+    if any(rule.get('from_start') for rule in rules):
+        return {'from_start': True}
+    return {'page': math.lcm(1, *(rule.get('page', 1) for rule in rules)),
+            'until': any(rule.get('until') for rule in rules)}
+
+
+def _page_request(paging, position, budget):
+    """
+    (offset, results_wanted, span) that ask a board paged per `paging` for at
+    least `budget` postings past the first `position`; a full answer has span rows.
+    """
+    if paging.get('from_start'):
+        return 0, position + budget, position + budget
+    page = paging.get('page', 1)
+    offset = position // page * page
+    span = math.ceil((position - offset + budget) / page) * page
+    return offset, offset + span if paging.get('until') else span, span
+
+
+def adaptive_scrape(scrape_fn=None, results_wanted=1000, start=DEFAULT_START_RESULTS,
+                    growth=DEFAULT_GROWTH, repeat_threshold=DEFAULT_REPEAT_THRESHOLD, **params):
+    """
+    Drop-in for scrape_jobs where results_wanted is a cap rather than a page size.
+    Pages go through scrape_cache.cached_scrape_jobs, so they are cached, coalesced
+    and rate limited like any other query.
+
+    frame.attrs['coverage'] is {'complete', 'stop', 'fetches', 'rows', 'requested'}:
+    stop is 'exhausted' (a short page), 'repeats' (mostly seen postings),
+    'max_results' (hit the cap, so possibly truncated), 'throttled' (the board
+    cut a page short with a 429, see scrape_cache) or 'error' (a later page
+    failed; the rows so far are returned). 'repeats' only counts as complete on
+    boards that honour offset: on the others a page of seen postings may just
+    be the board reordering its results.
+    """
+    paging = site_paging(params.get('site_name'))
+    frames = []
+    seen = set()
+    position = 0  # how far into the board's results we have fetched
+    budget = max(1, min(start, results_wanted))
+    fetches = 0
+    requested = 0
+    while True:
+        offset, wanted, span = _page_request(paging, position, budget)
+        try:
+            frame = scrape_cache.cached_scrape_jobs(scrape_fn=scrape_fn, offset=offset,
+                                                    results_wanted=wanted, **params)
+        except Exception as e:
+            if not fetches:
+                raise
+            logger.warning(f"Stopping adaptive fetch for {params.get('search_term')!r} at offset {offset}: {e}")
+            stop = 'error'
+            break
+        fetches += 1
+        requested += span
+        rows = 0 if frame is None else len(frame)
+        # Rows past what earlier pages covered; the rest overlap them
+        new_rows = max(0, offset + rows - position)
+        if rows:
+            urls = frame['job_url'] if 'job_url' in frame.columns else pd.Series(range(offset, offset + rows))
+            fresh = ~urls.isin(seen).to_numpy()
+            frames.append(frame[fresh])
+            seen.update(urls[fresh])
+            repeats = new_rows - int(fresh.sum())
+        else:
+            repeats = 0
+        position = max(position, offset + rows)
+
+        if frame is not None and frame.attrs.get('throttled'):
+            # A short page here means we were blocked, not that the board ran out
+            stop = 'throttled'
+            break
+        if rows < span:
+            stop = 'exhausted'
+            break
+        if repeats >= repeat_threshold * new_rows:
+            stop = 'repeats'
+            break
+        if position >= results_wanted:
+            stop = 'max_results'
+            break
+        budget = min(budget * growth, results_wanted - position)
+
+    jobs = pd.concat(frames, ignore_index=True).head(results_wanted) if frames else pd.DataFrame()
+    jobs.attrs['coverage'] = {
+        'complete': stop == 'exhausted' or (stop == 'repeats' and not paging.get('from_start')),
+        'stop': stop,
+        'fetches': fetches,
+        'rows': len(jobs),
+        'requested': requested,
+    }
+    return jobs
+
+
+def is_saturated(frame, results_wanted):
+    """
+    Whether a query's results may be truncated: its adaptive coverage is
+    incomplete or, for a fixed-size fetch, it came back with results_wanted rows.
+    """
+    if frame is None:
+        return False
+    coverage = frame.attrs.get('coverage')
+    if coverage is not None:
+        return not coverage['complete']
+    return len(frame) >= results_wanted
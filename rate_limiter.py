@@ -0,0 +1,244 @@
+"""
+Adaptive per-site rate limiting for scrapes and link checks.
+
+Every job board (for scrape_jobs) and every ATS host (for link checks) gets a
+token bucket whose refill rate adapts AIMD-style, like TCP congestion control:
+the rate grows quickly until the site first pushes back, then by `increase`
+requests/second per second of successful traffic, and every 429 / "blocked"
+answer halves it and pauses the site for a backoff period. Throughput settles just under what each site tolerates,
+instead of a fixed concurrency that either under-uses a site or keeps it
+blocking us.
+
+JobSpy does not raise on 429s; its scrapers log "429 Response - Blocked by ..."
+and return what they have. watch_jobspy_logs() counts those log lines against
+the scrape call that logged them (see watch_call), so one query's 429 is not
+mistaken for another's, and the scrape slows the board's limiter if it runs
+under one.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import shared
+
+logger = logging.getLogger(__name__)
+
+# Starting point and bounds per kind of traffic (rates are requests/second)
+DEFAULT_SETTINGS = {
+    'scrape': {'rate': 1.0, 'min_rate': 0.05, 'max_rate': 5.0, 'increase': 0.2, 'backoff': 30.0},
+    'link': {'rate': 20.0, 'min_rate': 0.5, 'max_rate': 100.0, 'increase': 5.0, 'backoff': 1.0},
+}
+MAX_THROTTLE_RETRIES = 2
+THROTTLE_MARKERS = ('429', 'too many requests', 'blocked by')
+
+# JobSpy logger names ("JobSpy:<Name>") for the boards we scrape
+JOBSPY_LOGGERS = {'indeed': 'Indeed', 'linkedin': 'LinkedIn', 'glassdoor': 'Glassdoor',
+                  'ziprecruiter': 'ZipRecruiter', 'google': 'Google'}
+
+
+def is_throttle_message(text):
+    """True for errors and log lines that mean the site is rate limiting us."""
+    text = str(text).lower()
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with an AIMD-adjusted refill rate."""
+
+    def __init__(self, name, rate, min_rate, max_rate, increase, backoff, decrease=0.5, burst=None):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff = backoff
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttles = 0
+        self.slow_start = True
+        self._refilled = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token (possibly going into debt) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def success(self):
+        """
+        Until the first throttle, each success adds 1 request/second (the rate
+        doubles every second, like TCP slow start); after that, additive increase
+        of about `increase` requests/second per second of successes.
+        """
+        with self._lock:
+            self.successes += 1
+            step = 1.0 if self.slow_start else self.increase / self.rate
+            self.rate = min(self.max_rate, self.rate + step)
+            self.burst = max(1.0, self.rate)
+
+    def throttled(self, retry_after=None):
+        """Multiplicative decrease, plus a pause before the next request."""
+        with self._lock:
+            self.throttles += 1
+            self.slow_start = False
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + (retry_after or self.backoff))
+            # A burst of 429s from requests sent before the first one came back is
+            # one congestion signal, not many
+            if now - self._last_decrease >= max(1.0 / self.rate, 1.0):
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.burst = max(1.0, self.rate)
+                self.tokens = min(self.tokens, self.burst)
+                logger.info(f"Rate limited by {self.name}, slowing to {self.rate:.2f} requests/s")
+
+    def stats(self):
+        with self._lock:
+            return {'name': self.name, 'rate': self.rate, 'successes': self.successes,
+                    'throttles': self.throttles, 'paused_for': max(0.0, self.paused_until - time.monotonic())}
+
+
+class RateLimiterRegistry:
+    """One limiter per (kind, site), created on first use from DEFAULT_SETTINGS."""
+
+    def __init__(self, settings=None):
+        self.settings = settings or DEFAULT_SETTINGS
+        self.enabled = True
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, name):
+        with self._lock:
+            key = (kind, name)
+            if key not in self._limiters:
+                self._limiters[key] = AdaptiveRateLimiter(f"{kind}:{name}", **self.settings[kind])
+            return self._limiters[key]
+
+    def stats(self):
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.stats() for limiter in limiters]
+
+    def reset(self):
+        with self._lock:
+            self._limiters.clear()
+
+
+# Shared by every session so the limiters see each other's traffic
+_registry = shared.ProcessWide(RateLimiterRegistry)
+get_registry = _registry.get
+set_registry = _registry.set
+
+
+_watches = {}
+_watches_lock = threading.Lock()
+
+
+def _query_key(search_term=None, location=None, offset=None, hours_old=None):
+    """What identifies a JobSpy query among those running at once on one board."""
+    return (str(search_term or ''), str(location or ''), int(offset or 0), int(hours_old or 0))
+
+
+@contextmanager
+def watch_call(params=None):
+    """
+    Count the throttle log lines of the scrape call run inside the block, whose
+    scrape_jobs keyword arguments are params. Yields a dict whose 'throttles'
+    the JobSpy log handler increments. A line logged on the calling thread
+    belongs to this call; one logged on a JobSpy worker thread belongs to the
+    call whose query matches the ScraperInput being scraped there. Lines logged
+    by concurrent calls to the same board are not counted.
+    """
+    params = params or {}
+    sites = params.get('site_name') or []
+    watch = {
+        'throttles': 0,
+        'thread': threading.get_ident(),
+        'sites': {str(s).lower() for s in ([sites] if isinstance(sites, str) else sites)},
+        'query': _query_key(params.get('search_term'), params.get('location'),
+                            params.get('offset'), params.get('hours_old')),
+    }
+    with _watches_lock:
+        _watches[id(watch)] = watch
+    try:
+        yield watch
+    finally:
+        with _watches_lock:
+            del _watches[id(watch)]
+
+
+def _scraper_input():
+    """The JobSpy ScraperInput being scraped on this thread's stack, or None."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        value = frame.f_locals.get('scraper_input')
+        if value is not None and hasattr(value, 'search_term'):
+            return value
+        frame = frame.f_back
+    return None
+
+
+class _ThrottleLogHandler(logging.Handler):
+    """Counts JobSpy's "429 ... Blocked by <board>" log lines against the watch_call() that logged them."""
+
+    def __init__(self, site):
+        super().__init__(level=logging.WARNING)
+        self.site = site
+
+    def emit(self, record):
+        try:
+            if not is_throttle_message(record.getMessage()):
+                return
+            with _watches_lock:
+                watches = [w for w in _watches.values() if w['thread'] == record.thread]
+                if not watches:
+                    scraper_input = _scraper_input()
+                    if scraper_input is not None:
+                        query = _query_key(scraper_input.search_term, scraper_input.location,
+                                           scraper_input.offset, scraper_input.hours_old)
+                        watches = [w for w in _watches.values()
+                                   if self.site in w['sites'] and w['query'] == query]
+                for watch in watches:
+                    watch['throttles'] += 1
+        except Exception:
+            self.handleError(record)
+
+
+_watching = False
+_watching_lock = threading.Lock()
+
+
+def watch_jobspy_logs():
+    """
+    Hook the JobSpy scraper loggers (idempotent). JobSpy only configures a
+    logger that has no handlers yet, so call this once jobspy is imported.
+    """
+    global _watching
+    with _watching_lock:
+        if _watching:
+            return
+        for site, name in JOBSPY_LOGGERS.items():
+            logging.getLogger(f"JobSpy:{name}").addHandler(_ThrottleLogHandler(site))
+        _watching = True
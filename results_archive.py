@@ -0,0 +1,220 @@
+"""
+Columnar history of every search and watchlist scan.
+
+Each run's results are appended to a Parquet dataset under .cache/archive,
+hive-partitioned by scrape date and site (scrape_date=2026-10-17/site=indeed/).
+Every row also records when it was scraped, a run id, and the query that produced
+it (as JSON in the 'query' column). The columns follow one fixed schema, so
+appends from different boards and pages read back as a single table.
+
+query() only reads what it needs. Date and site filters prune whole partition
+directories, other filters are pushed down into the Parquet scan, and only the
+requested columns are decoded. That keeps "all Pfizer postings in the last 30
+days, title and date only" fast at millions of archived rows. Each append writes
+a new file per partition; compact() merges a partition's files into one once it
+has more than MAX_FILES_PER_PARTITION of them.
+"""
+import datetime
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import compaction
+import shared
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = os.environ.get("JOBHUNT_ARCHIVE_PATH", os.path.join(".cache", "archive"))
+MAX_FILES_PER_PARTITION = 32
+
+# The archived columns; anything else in a result frame is not kept
+ARCHIVE_SCHEMA = pa.schema([
+    ('job_url', pa.string()),
+    ('job_url_direct', pa.string()),
+    ('title', pa.string()),
+    ('company', pa.string()),
+    ('location', pa.string()),
+    ('date_posted', pa.date32()),
+    ('job_type', pa.string()),
+    ('interval', pa.string()),
+    ('min_amount', pa.float64()),
+    ('max_amount', pa.float64()),
+    ('currency', pa.string()),
+    ('is_remote', pa.bool_()),
+    ('job_level', pa.string()),
+    ('description', pa.string()),
+    ('source', pa.string()),
+    ('monitored_company', pa.string()),
+    ('scraped_at', pa.timestamp('ms')),
+    ('run_id', pa.string()),
+    ('query', pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('scrape_date', pa.string()), ('site', pa.string())]),
+                               flavor='hive')
+
+
+def _to_table(jobs, query, scraped_at, run_id):
+    """Conform a result frame to ARCHIVE_SCHEMA plus the partition columns."""
+    columns = {}
+    for field in ARCHIVE_SCHEMA:
+        if field.name in jobs.columns:
+            col = jobs[field.name]
+        else:
+            col = pd.Series(None, index=jobs.index, dtype=object)
+        if pa.types.is_string(field.type):
+            col = col.astype('string')
+        elif pa.types.is_date(field.type):
+            col = pd.to_datetime(col, errors='coerce').dt.date
+            col = col.astype(object).where(col.notna(), None)
+        elif pa.types.is_floating(field.type):
+            col = pd.to_numeric(col, errors='coerce')
+        elif pa.types.is_boolean(field.type):
+            col = col.astype(object).where(col.notna(), None).map(lambda v: v if v is None else bool(v))
+        columns[field.name] = col
+    frame = pd.DataFrame(columns, index=jobs.index)
+    frame['scraped_at'] = pd.Timestamp(scraped_at).floor('ms')
+    frame['run_id'] = run_id
+    frame['query'] = json.dumps(query or {}, sort_keys=True, default=str)
+    table = pa.Table.from_pandas(frame, schema=ARCHIVE_SCHEMA, preserve_index=False)
+
+    sites = jobs['site'] if 'site' in jobs.columns else pd.Series(None, index=jobs.index, dtype=object)
+    sites = sites.astype(object).where(sites.notna(), 'unknown').astype(str).str.lower()
+    table = table.append_column('scrape_date', pa.array([scraped_at.date().isoformat()] * len(frame)))
+    return table.append_column('site', pa.array(sites.to_numpy(), type=pa.string()))
+
+
+class ResultsArchive:
+    """Append-only Parquet archive of scrape results, partitioned by date and site."""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self.enabled = True
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, jobs, query=None, now=None):
+        """
+        Archive a result frame. query is a dict describing the search that produced
+        it (stored as JSON on every row). Returns the run id, or None for an empty frame.
+        """
+        if not self.enabled or jobs is None or jobs.empty:
+            return None
+        scraped_at = now or datetime.datetime.now()
+        # Compacted frames keep their descriptions in the side store
+        jobs = compaction.with_descriptions(jobs)
+        run_id = uuid.uuid4().hex
+        table = _to_table(jobs, query, scraped_at, run_id)
+        with self._lock:
+            ds.write_dataset(table, self.path, format='parquet', partitioning=PARTITIONING,
+                             basename_template=f"part-{run_id}-{{i}}.parquet",
+                             existing_data_behavior='overwrite_or_ignore')
+            for part in {(d, s) for d, s in zip(table['scrape_date'].to_pylist(), table['site'].to_pylist())}:
+                if len(self._files(*part)) > MAX_FILES_PER_PARTITION:
+                    self._compact_partition(*part)
+        return run_id
+
+    def _files(self, scrape_date, site):
+        return sorted(glob.glob(os.path.join(self.path, f"scrape_date={scrape_date}", f"site={site}", "*.parquet")))
+
+    def _compact_partition(self, scrape_date, site):
+        files = self._files(scrape_date, site)
+        if len(files) < 2:
+            return
+        table = pa.concat_tables(pq.read_table(f, schema=ARCHIVE_SCHEMA) for f in files)
+        target = os.path.join(os.path.dirname(files[0]), f"compacted-{uuid.uuid4().hex}.parquet")
+        pq.write_table(table, target + ".tmp")
+        os.replace(target + ".tmp", target)
+        for f in files:
+            os.remove(f)
+
+    def compact(self):
+        """Merge every partition's files into one."""
+        with self._lock:
+            for part_dir in glob.glob(os.path.join(self.path, "scrape_date=*", "site=*")):
+                scrape_date = os.path.basename(os.path.dirname(part_dir)).split("=", 1)[1]
+                site = os.path.basename(part_dir).split("=", 1)[1]
+                self._compact_partition(scrape_date, site)
+
+    def dataset(self):
+        return ds.dataset(self.path, format='parquet', partitioning=PARTITIONING,
+                          schema=ARCHIVE_SCHEMA.append(pa.field('scrape_date', pa.string()))
+                                               .append(pa.field('site', pa.string())))
+
+    def query(self, columns=None, company=None, title=None, sites=None, since=None, until=None,
+              days=None, run_id=None, limit=None):
+        """
+        Archived rows matching every given filter, newest first.
+
+        columns: the columns to load (default all). company and title match
+        case-insensitive substrings. sites is a list of boards. since / until are
+        dates (inclusive) on the scrape date; days=30 means since 30 days ago.
+        """
+        if days is not None:
+            since = datetime.date.today() - datetime.timedelta(days=days)
+        expr = None
+
+        def _and(condition):
+            return condition if expr is None else expr & condition
+
+        # Partition filters: whole directories are skipped
+        if since is not None:
+            expr = _and(pc.field('scrape_date') >= pd.Timestamp(since).date().isoformat())
+        if until is not None:
+            expr = _and(pc.field('scrape_date') <= pd.Timestamp(until).date().isoformat())
+        if sites:
+            expr = _and(pc.field('site').isin([str(s).lower() for s in sites]))
+        # Row filters, evaluated in the scan
+        if company:
+            expr = _and(pc.match_substring(pc.field('company'), company, ignore_case=True))
+        if title:
+            expr = _and(pc.match_substring(pc.field('title'), title, ignore_case=True))
+        if run_id:
+            expr = _and(pc.field('run_id') == run_id)
+
+        load = list(columns) if columns else None
+        if load is not None and 'scraped_at' not in load:
+            load.append('scraped_at')
+        try:
+            table = self.dataset().to_table(columns=load, filter=expr)
+        except FileNotFoundError:
+            # A partition was compacted while we listed it
+            table = self.dataset().to_table(columns=load, filter=expr)
+        if limit is not None and table.num_rows > limit:
+            indices = pc.select_k_unstable(table, k=limit, sort_keys=[('scraped_at', 'descending')])
+            table = table.take(indices)
+        jobs = table.to_pandas()
+        jobs = jobs.sort_values('scraped_at', ascending=False, kind='stable').reset_index(drop=True)
+        if columns and 'scraped_at' not in columns:
+            jobs = jobs.drop(columns=['scraped_at'])
+        return jobs
+
+    def stats(self):
+        files = glob.glob(os.path.join(self.path, "scrape_date=*", "site=*", "*.parquet"))
+        rows = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+        return {'files': len(files), 'rows': rows, 'bytes': sum(os.path.getsize(f) for f in files)}
+
+
+_archive = shared.ProcessWide(ResultsArchive)
+get_archive = _archive.get
+set_archive = _archive.set
+
+
+def archive_results(jobs, **query):
+    """
+    Append a search's results to the shared archive. Archiving is best effort:
+    a failure is logged and never fails the search.
+    """
+    try:
+        return get_archive().append(jobs, query=query)
+    except Exception as e:
+        logger.warning(f"Could not archive {len(jobs)} results: {e}")
+        return None
@@ -0,0 +1,270 @@
+"""
+Persistent on-disk cache for scrape_jobs results.
+
+Results are stored in a SQLite file keyed on the normalized query parameters
+(site, search_term, location, hours_old, job_type, is_remote, results_wanted, ...),
+expire after a configurable TTL, and are evicted least-recently-used first once the
+cache grows past its size budget.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+import cassette
+import rate_limiter
+import shared
+import single_flight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.environ.get("JOBHUNT_CACHE_PATH", os.path.join(".cache", "scrape_cache.sqlite"))
+DEFAULT_TTL = 6 * 60 * 60  # seconds; the oldest result a search accepts unless it asks otherwise
+MAX_TTL = 7 * 24 * 60 * 60  # entries are deleted after this long
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def scrape_jobs(**params):
+    """
+    jobspy.scrape_jobs, imported on first use: JobSpy and its HTTP stack take a
+    noticeable part of app startup, and most reruns never scrape.
+    """
+    from jobspy import scrape_jobs as jobspy_scrape_jobs
+    rate_limiter.watch_jobspy_logs()
+    return jobspy_scrape_jobs(**params)
+
+
+_jobspy_scrape_jobs = scrape_jobs
+
+
+def scraper_id(scrape_fn):
+    """
+    None for JobSpy, otherwise a name for this scraper function object, so stand-ins
+    (tests, benchmarks) never share cache entries or in-flight queries with the
+    real boards or with each other.
+    """
+    if scrape_fn is None or scrape_fn is _jobspy_scrape_jobs:
+        return None
+    name = getattr(scrape_fn, '__qualname__', type(scrape_fn).__name__)
+    return f"{getattr(scrape_fn, '__module__', '')}.{name}@{id(scrape_fn):x}"
+
+
+def _norm_text(value):
+    if value is None:
+        return None
+    return " ".join(str(value).lower().split()) or None
+
+
+def normalize_params(params):
+    """
+    Normalize scrape_jobs keyword arguments so equivalent queries share a key:
+    case and whitespace are folded, the site list is sorted, and numbers are ints.
+    """
+    sites = params.get('site_name')
+    if sites is None:
+        sites = []
+    elif isinstance(sites, str):
+        sites = [sites]
+    key = {
+        'site': sorted(str(s).lower() for s in sites),
+        'search_term': _norm_text(params.get('search_term')),
+        'location': _norm_text(params.get('location')),
+        'hours_old': int(params['hours_old']) if params.get('hours_old') else None,
+        'job_type': _norm_text(params.get('job_type')),
+        'is_remote': bool(params.get('is_remote', False)),
+        'results_wanted': int(params.get('results_wanted') or 15),
+    }
+    # Anything else (country_indeed, distance, ...) still changes the result
+    for name, value in params.items():
+        if name not in ('site_name', 'search_term', 'location', 'hours_old',
+                        'job_type', 'is_remote', 'results_wanted'):
+            key[name] = _norm_text(value) if isinstance(value, str) else value
+    return key
+
+
+def cache_key(params, scraper=None):
+    """Hash of the normalized params and, for anything but JobSpy, the scraper_id."""
+    key = normalize_params(params)
+    if scraper is not None:
+        key['scraper'] = scraper
+    return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ScrapeCache:
+    """
+    SQLite-backed TTL + LRU cache of result DataFrames. Entries are kept for up
+    to `ttl` seconds; each lookup says how old a result it accepts.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=MAX_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, params TEXT, frame BLOB, size INTEGER,"
+                " created_at REAL, last_access REAL)"
+            )
+
+    def _connect(self):
+        return shared.connect(self.path)
+
+    def get(self, params, scraper=None, max_age=None):
+        """
+        Return the cached DataFrame for these parameters, or None on a miss.
+        max_age is the oldest result in seconds the caller accepts (default
+        DEFAULT_TTL, at most the cache's ttl).
+        """
+        key = cache_key(params, scraper)
+        max_age = min(DEFAULT_TTL if max_age is None else max_age, self.ttl)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT frame, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+            elif row is not None and now - row[1] > max_age:
+                row = None  # too old for this caller, fresh enough for others
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, params, frame, scraper=None):
+        """Store a result frame, then evict least recently used entries over the size budget."""
+        blob = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        params_json = json.dumps(normalize_params(params), sort_keys=True, default=str)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(params, scraper), params_json, blob, len(blob), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM results")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+
+_cache = shared.ProcessWide(ScrapeCache)
+get_cache = _cache.get
+set_cache = _cache.set
+
+
+def _mark_throttled(frame, watch):
+    """Flag a frame the board cut short with a 429 in attrs['throttled']."""
+    if watch['throttles'] and frame is not None:
+        frame.attrs['throttled'] = True
+    return frame
+
+
+def _rate_limited_scrape(scrape_fn, params, use_limiter=True):
+    """
+    Run scrape_fn under the board's adaptive rate limit, retrying after a throttle.
+    A result the board cut short with a 429 that was not retried away is
+    returned with attrs['throttled'] set.
+    """
+    registry = rate_limiter.get_registry()
+    if not (use_limiter and registry.enabled):
+        with rate_limiter.watch_call(params) as watch:
+            return _mark_throttled(scrape_fn(**params), watch)
+    limiter = registry.get('scrape', ",".join(normalize_params(params)['site']))
+    for attempt in range(rate_limiter.MAX_THROTTLE_RETRIES + 1):
+        last_attempt = attempt == rate_limiter.MAX_THROTTLE_RETRIES
+        limiter.acquire()
+        try:
+            # Only this call's 429s count, not those of other queries to the same board
+            with rate_limiter.watch_call(params) as watch:
+                frame = scrape_fn(**params)
+        except Exception as e:
+            if not rate_limiter.is_throttle_message(e) or last_attempt:
+                raise
+            limiter.throttled()
+            continue
+        if not watch['throttles']:
+            limiter.success()
+            return frame
+        limiter.throttled()
+        if (frame is None or frame.empty) and not last_attempt:
+            continue  # JobSpy logged a 429 and gave up; try again after the pause
+        return _mark_throttled(frame, watch)
+
+
+def cached_scrape_jobs(scrape_fn=None, use_cache=True, cache_ttl=None, use_limiter=True, **params):
+    """
+    Drop-in replacement for scrape_jobs that serves repeated queries from the cache.
+    Empty results, and results cut short by a 429, are not cached since boards
+    return them when they block us.
+    Results are cached per scraper, so a stand-in scrape_fn never shares entries
+    with JobSpy (see scraper_id). An identical query already running (e.g. in another session) is joined
+    rather than sent again; see single_flight. Calls that do go out are paced by
+    the board's adaptive rate limiter unless use_limiter is False; see rate_limiter.
+    With a cassette active (see cassette) the cache is not read: queries are
+    recorded as they go out, or answered from the recording.
+    use_cache=False skips the cache lookup (the fresh result is still stored),
+    and cache_ttl is the oldest cached result in seconds to accept. Both are per
+    call, so one session's settings never change another's searches.
+    """
+    if scrape_fn is None:
+        scrape_fn = scrape_jobs
+    tape = cassette.get_cassette()
+    if tape is not None and tape.replaying:
+        return tape.replay_scrape(cache_key(params))
+    scraper = scraper_id(scrape_fn)
+    cache = get_cache()
+    if cache.enabled and use_cache and tape is None:
+        frame = cache.get(params, scraper, max_age=cache_ttl)
+        if frame is not None:
+            return frame
+
+    def _fetch():
+        start = time.perf_counter()
+        frame = _rate_limited_scrape(scrape_fn, params, use_limiter=use_limiter)
+        if tape is not None:
+            try:
+                tape.record_scrape(cache_key(params), normalize_params(params), frame, time.perf_counter() - start)
+            except Exception as e:
+                logger.warning(f"Could not record scrape results: {e}")
+        if cache.enabled and frame is not None and not frame.empty and not frame.attrs.get('throttled'):
+            try:
+                cache.put(params, frame, scraper)
+            except Exception as e:
+                logger.warning(f"Could not cache scrape results: {e}")
+        return frame
+
+    frame, shared = single_flight.group("scrape_jobs").do(cache_key(params, scraper), _fetch)
+    # Every caller gets its own copy of a shared frame
+    return frame.copy() if shared and frame is not None else frame
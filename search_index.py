@@ -0,0 +1,195 @@
+"""
+Persistent full-text index over every scraped posting.
+
+Each posting (keyed on job_url) is indexed once in SQLite FTS5 as it is scraped
+and re-indexed only when its title, company or description changes, so the
+index grows incrementally with the search history. Two FTS tables share the
+postings' rowids:
+
+- postings_fts (title, company, description, porter-stemmed words) answers
+  search(): BM25-ranked matches with a description snippet, in milliseconds over
+  the whole history.
+- titles_fts (title, trigrams) answers match_titles(): which postings' titles
+  contain a keyword as a case-insensitive substring, the semantics of watchlist
+  keywords. Trigrams need keywords of at least 3 characters.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import shared
+from dedup import _text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.environ.get("JOBHUNT_INDEX_PATH", os.path.join(".cache", "search_index.sqlite"))
+MIN_TRIGRAM_CHARS = 3
+# bm25 with column weights for title, company, description (lower is better)
+RANK = "bm25(postings_fts, 10.0, 5.0, 1.0)"
+
+
+def match_query(text):
+    """
+    FTS5 query for free text typed into a search box: every word must occur
+    (as a stemmed word), "quoted phrases" are kept together and a trailing *
+    matches a prefix. Returns None when there is nothing to search for.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', str(text or '')):
+        words = re.findall(r'\w+', phrase or word)
+        if not words:
+            continue
+        term = '"' + ' '.join(words) + '"'
+        if word.endswith('*'):
+            term += '*'
+        terms.append(term)
+    return ' '.join(terms) or None
+
+
+class JobIndex:
+    """SQLite FTS5 index of posting titles, companies and descriptions."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " id INTEGER PRIMARY KEY, job_url TEXT UNIQUE, title TEXT, company TEXT, location TEXT,"
+                " site TEXT, date_posted TEXT, content_hash INTEGER, first_seen REAL, last_seen REAL)"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts"
+                " USING fts5(title, company, description, tokenize='porter unicode61')"
+            )
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5(title, tokenize='trigram')")
+
+    def _connect(self):
+        return shared.connect(self.path)
+
+    def add(self, jobs):
+        """
+        Index the postings in `jobs` (those with a job_url). New postings are
+        added, changed ones re-indexed, and unchanged ones only marked as seen.
+        Returns the number of postings (re-)indexed.
+        """
+        if jobs is None or jobs.empty or 'job_url' not in jobs.columns:
+            return 0
+        jobs = jobs[jobs['job_url'].notna()].drop_duplicates(subset=['job_url'], keep='last')
+        if jobs.empty:
+            return 0
+        docs = pd.DataFrame({col: _text(jobs, col) for col in
+                             ['job_url', 'title', 'company', 'location', 'site', 'date_posted', 'description']})
+        docs['content_hash'] = pd.util.hash_pandas_object(
+            docs[['title', 'company', 'description']], index=False).astype('int64')
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            known = {url: (rowid, content_hash) for url, rowid, content_hash in conn.execute(
+                "SELECT job_url, id, content_hash FROM postings WHERE job_url IN (SELECT value FROM json_each(?))",
+                (json.dumps(docs['job_url'].tolist()),),
+            )}
+            previous = docs['job_url'].map(lambda url: known.get(url, (None, None))[1])
+            stale = docs[previous.to_numpy() != docs['content_hash'].to_numpy()]
+            conn.executemany(
+                "UPDATE postings SET last_seen = ? WHERE job_url = ?",
+                [(now, url) for url in docs['job_url'][previous.notna()]],
+            )
+            for doc in stale.itertuples(index=False):
+                if doc.job_url in known:
+                    rowid = known[doc.job_url][0]
+                    conn.execute("DELETE FROM postings_fts WHERE rowid = ?", (rowid,))
+                    conn.execute("DELETE FROM titles_fts WHERE rowid = ?", (rowid,))
+                    conn.execute(
+                        "UPDATE postings SET title = ?, company = ?, location = ?, site = ?, date_posted = ?,"
+                        " content_hash = ? WHERE id = ?",
+                        (doc.title, doc.company, doc.location, doc.site, doc.date_posted, doc.content_hash, rowid),
+                    )
+                else:
+                    rowid = conn.execute(
+                        "INSERT INTO postings (job_url, title, company, location, site, date_posted,"
+                        " content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (doc.job_url, doc.title, doc.company, doc.location, doc.site, doc.date_posted,
+                         doc.content_hash, now, now),
+                    ).lastrowid
+                conn.execute("INSERT INTO postings_fts (rowid, title, company, description) VALUES (?, ?, ?, ?)",
+                             (rowid, doc.title, doc.company, doc.description))
+                conn.execute("INSERT INTO titles_fts (rowid, title) VALUES (?, ?)", (rowid, doc.title))
+        return len(stale)
+
+    def search(self, text, limit=50):
+        """
+        Postings matching free text (see match_query), best first, with a 'score'
+        (higher is better) and a 'snippet' of the description around the match.
+        """
+        query = match_query(text)
+        if query is None:
+            return pd.DataFrame()
+        with self._connect() as conn:
+            try:
+                return pd.read_sql_query(
+                    f"SELECT p.title, p.company, p.location, p.site, p.date_posted, p.job_url, -{RANK} AS score,"
+                    " snippet(postings_fts, 2, '**', '**', '...', 16) AS snippet,"
+                    " datetime(p.last_seen, 'unixepoch', 'localtime') AS last_seen"
+                    " FROM postings_fts JOIN postings p ON p.id = postings_fts.rowid"
+                    f" WHERE postings_fts MATCH ? ORDER BY {RANK} LIMIT ?",
+                    conn, params=(query, int(limit)),
+                )
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Full-text query {query!r} failed: {e}")
+                return pd.DataFrame()
+
+    def match_titles(self, urls, keywords):
+        """
+        (job_url, keyword) pairs for the postings in `urls` whose indexed title
+        contains a keyword, case-insensitively. Keywords shorter than
+        MIN_TRIGRAM_CHARS cannot be looked up and are ignored.
+        """
+        urls = json.dumps(list(dict.fromkeys(str(u) for u in urls)))
+        pairs = []
+        with self._connect() as conn:
+            for keyword in dict.fromkeys(keywords):
+                if len(keyword) < MIN_TRIGRAM_CHARS:
+                    continue
+                rows = conn.execute(
+                    "SELECT p.job_url FROM titles_fts JOIN postings p ON p.id = titles_fts.rowid"
+                    " WHERE titles_fts MATCH ? AND p.job_url IN (SELECT value FROM json_each(?))",
+                    ('"' + keyword.replace('"', '""') + '"', urls),
+                ).fetchall()
+                pairs += [(url, keyword) for url, in rows]
+        return pd.DataFrame(pairs, columns=['job_url', 'word'])
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            for table in ['postings', 'postings_fts', 'titles_fts']:
+                conn.execute(f"DELETE FROM {table}")
+
+    def stats(self):
+        with self._connect() as conn:
+            postings = conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'postings': postings, 'bytes': size}
+
+
+_index = shared.ProcessWide(JobIndex)
+get_index = _index.get
+set_index = _index.set
+
+
+def index_jobs(jobs):
+    """
+    Add scraped postings to the shared index. Indexing is best effort: a failure
+    is logged and never fails the search.
+    """
+    try:
+        return get_index().add(jobs)
+    except Exception as e:
+        logger.warning(f"Could not index {len(jobs)} postings: {e}")
+        return 0
@@ -1,79 +1,48 @@
 """
 Search for Research Associate and Research Scientist jobs in Georgia
+
+Set JOBHUNT_CASSETTE_MODE=record to capture the scrapes and link checks, and
+JOBHUNT_CASSETTE_MODE=replay to rerun from them offline (see cassette).
 """
-from jobspy import scrape_jobs
+import dedup
+import fanout
 import pandas as pd
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-def check_url(row):
-    """Check if the direct application URL returns a valid response."""
-    direct_url = row.get('job_url_direct')
-    
-    result = {'index': row.name, 'status': None, 'url_to_use': None}
-    
-    if pd.isna(direct_url) or not direct_url:
-        result['status'] = 'Missing Direct Link'
-        return result
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }
-    
-    try:
-        # Use GET with stream=True to be more reliable than HEAD for some ATS
-        resp = requests.get(str(direct_url), headers=headers, timeout=10, stream=True)
-        result['status'] = resp.status_code
-        result['url_to_use'] = direct_url
-    except Exception:
-        result['status'] = 'Error'
-    
-    return result
-
-# Search for research associate jobs
-print("Searching for Research Associate jobs...")
-research_associate = scrape_jobs(
-    site_name=["indeed", "linkedin"],
-    search_term="research associate",
-    location="Georgia",
-    results_wanted=20,
-    hours_old=168,  # 7 days = 168 hours
-    country_indeed='USA',
-)
-
-# Search for research scientist jobs
-print("Searching for Research Scientist jobs...")
-research_scientist = scrape_jobs(
-    site_name=["indeed", "linkedin"],
-    search_term="research scientist",
+import link_checker
+import results_archive
+
+# Search for research associate and research scientist jobs concurrently
+print("Searching for Research Associate and Research Scientist jobs...")
+queries = fanout.build_queries(
+    ["indeed", "linkedin"],
+    ["research associate", "research scientist"],
     location="Georgia",
     results_wanted=20,
     hours_old=168,  # 7 days = 168 hours
     country_indeed='USA',
 )
+frames, errors = fanout.run_queries(queries)
+for err in errors:
+    print(f"JobSpy error for {err['label']}: {err['error']}")
 
 # Combine results and remove duplicates
-all_jobs = pd.concat([research_associate, research_scientist], ignore_index=True)
+all_jobs = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['job_url'])
 all_jobs = all_jobs.drop_duplicates(subset=['job_url'], keep='first')
+all_jobs = dedup.collapse_duplicates(all_jobs)
+
+# Keep every run in the queryable history instead of only the CSV below
+results_archive.archive_results(all_jobs, kind='research_jobs', search_terms=["research associate", "research scientist"],
+                                location="Georgia", hours_old=168)
 
 # Run URL checks in parallel
 print("Checking URLs (this may take a moment)...")
 
-results = []
-with ThreadPoolExecutor(max_workers=10) as executor:
-    futures = {executor.submit(check_url, row): idx for idx, row in all_jobs.iterrows()}
-    for future in as_completed(futures):
-        results.append(future.result())
-
-# Add results back to dataframe
-if results:
-    url_df = pd.DataFrame(results).set_index('index')
-    all_jobs['url_status'] = url_df['status']
-    all_jobs['best_url'] = url_df['url_to_use']
+url_df = link_checker.verify_jobs(all_jobs, url_column='job_url_direct', missing_status='Missing Direct Link')
+all_jobs['url_status'] = url_df['url_status']
+all_jobs['best_url'] = url_df['best_url']
 
-    # Filter for valid direct links only
-    all_jobs = all_jobs[all_jobs['url_status'] == 200]
-    print(f"✓ Found {len(all_jobs)} jobs with valid direct links")
+# Filter for valid direct links only
+all_jobs = all_jobs[all_jobs['url_status'] == '200 OK']
+print(f"✓ Found {len(all_jobs)} jobs with valid direct links")
 
 print(f"\n{'='*80}")
 print(f"Final Job List ({len(all_jobs)} items)")
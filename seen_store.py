@@ -0,0 +1,150 @@
+"""
+Persistent store of postings we have already seen, for "new since last scan" runs.
+
+Each posting is keyed on its job_url and carries a fingerprint of its normalized
+content (title, company, location, job type, pay), so an edited posting counts as
+changed. first_seen / last_seen are kept per posting. Every search or watchlist
+company is a "scope"; a posting that a scope returned before but not this time is
+marked as disappeared for that scope.
+"""
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+import shared
+
+DEFAULT_STORE_PATH = os.environ.get("JOBHUNT_SEEN_PATH", os.path.join(".cache", "seen_postings.sqlite"))
+
+FINGERPRINT_COLUMNS = ['title', 'company', 'location', 'job_type', 'interval', 'min_amount', 'max_amount']
+
+
+def fingerprint(jobs):
+    """Vectorized content fingerprint per row: hash of the normalized FINGERPRINT_COLUMNS."""
+    parts = pd.DataFrame(index=jobs.index)
+    for col in FINGERPRINT_COLUMNS:
+        if col in jobs.columns:
+            values = jobs[col].astype(object).where(jobs[col].notna(), '').astype(str)
+            parts[col] = values.str.lower().str.split().str.join(' ')
+        else:
+            parts[col] = ''
+    # int64 so the value fits in SQLite
+    return pd.util.hash_pandas_object(parts, index=False).astype('int64')
+
+
+class SeenStore:
+    """SQLite-backed record of seen postings and which scopes returned them."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " job_url TEXT PRIMARY KEY, fingerprint INTEGER, title TEXT, company TEXT,"
+                " first_seen REAL, last_seen REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scope_postings ("
+                " scope TEXT, job_url TEXT, last_seen REAL, gone_at REAL,"
+                " PRIMARY KEY (scope, job_url))"
+            )
+
+    def _connect(self):
+        return shared.connect(self.path)
+
+    def delta(self, jobs, scope, scanned_scopes=None):
+        """
+        Record `jobs` as seen and return (delta, disappeared).
+
+        scope is a string, or a Series aligned to jobs when rows belong to different
+        scopes (e.g. one per watchlist company). delta holds the rows whose job_url
+        is new or whose fingerprint changed, with a 'change' column ('new' or
+        'changed') and 'first_seen'. disappeared lists postings that a scope in
+        `scanned_scopes` (default: the scopes in this call) returned on an earlier
+        run but not this one; each is reported once.
+        """
+        now = time.time()
+        if isinstance(scope, str):
+            scopes = pd.Series(scope, index=jobs.index, dtype=object)
+            scanned = set(scanned_scopes or [scope])
+        else:
+            scopes = scope.astype(str)
+            scanned = set(scanned_scopes if scanned_scopes is not None else scopes.unique())
+
+        if jobs.empty or 'job_url' not in jobs.columns:
+            jobs = jobs.iloc[0:0]
+            urls = pd.Series(dtype=object)
+            fps = pd.Series(dtype='int64')
+        else:
+            jobs = jobs[jobs['job_url'].notna()]
+            scopes = scopes[jobs.index]
+            urls = jobs['job_url'].astype(str)
+            fps = fingerprint(jobs)
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_url, fingerprint, first_seen FROM postings"
+                " WHERE job_url IN (SELECT value FROM json_each(?))",
+                (json.dumps(urls.unique().tolist()),),
+            ).fetchall()
+            known = pd.DataFrame(rows, columns=['job_url', 'fingerprint', 'first_seen'])
+            known = known.astype({'fingerprint': 'int64', 'first_seen': 'float64'}).set_index('job_url')
+
+            # Nullable ints keep the 64-bit fingerprints exact next to missing values
+            previous = known['fingerprint'].astype('Int64').reindex(urls.to_numpy())
+            is_new = previous.isna().to_numpy()
+            is_changed = ~is_new & (previous.to_numpy(dtype='int64', na_value=0) != fps.to_numpy())
+            change = pd.Series(None, index=jobs.index, dtype=object)
+            change[is_new] = 'new'
+            change[is_changed] = 'changed'
+
+            titles = jobs['title'] if 'title' in jobs.columns else pd.Series(None, index=jobs.index)
+            companies = jobs['company'] if 'company' in jobs.columns else pd.Series(None, index=jobs.index)
+            conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(job_url) DO UPDATE SET"
+                " fingerprint = excluded.fingerprint, title = excluded.title,"
+                " company = excluded.company, last_seen = excluded.last_seen",
+                zip(urls, fps.tolist(), titles.astype(object).where(titles.notna(), None),
+                    companies.astype(object).where(companies.notna(), None), [now] * len(urls), [now] * len(urls)),
+            )
+            conn.executemany(
+                "INSERT INTO scope_postings VALUES (?, ?, ?, NULL) ON CONFLICT(scope, job_url) DO UPDATE SET"
+                " last_seen = excluded.last_seen, gone_at = NULL",
+                zip(scopes, urls, [now] * len(urls)),
+            )
+
+            # Anything a scanned scope had before but did not return now has disappeared
+            gone = conn.execute(
+                "SELECT s.scope, s.job_url, p.title, p.company, p.first_seen, s.last_seen"
+                " FROM scope_postings s JOIN postings p ON p.job_url = s.job_url"
+                " WHERE s.scope IN (SELECT value FROM json_each(?)) AND s.last_seen < ? AND s.gone_at IS NULL",
+                (json.dumps(sorted(scanned)), now),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE scope_postings SET gone_at = ? WHERE scope = ? AND job_url = ?",
+                [(now, g[0], g[1]) for g in gone],
+            )
+
+        delta = jobs[change.notna()].copy()
+        delta['change'] = change[change.notna()]
+        first_seen = known['first_seen'].reindex(urls[change.notna()].to_numpy()).fillna(now)
+        delta['first_seen'] = pd.to_datetime(first_seen.to_numpy(), unit='s')
+        disappeared = pd.DataFrame(gone, columns=['scope', 'job_url', 'title', 'company', 'first_seen', 'last_seen'])
+        disappeared['first_seen'] = pd.to_datetime(disappeared['first_seen'], unit='s')
+        disappeared['last_seen'] = pd.to_datetime(disappeared['last_seen'], unit='s')
+        return delta, disappeared
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM scope_postings")
+
+
+_store = shared.ProcessWide(SeenStore)
+get_store = _store.get
+set_store = _store.set
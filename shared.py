@@ -0,0 +1,44 @@
+"""
+Plumbing shared by the on-disk stores and the process-wide objects.
+
+connect() opens the stores' SQLite files. ProcessWide holds one object (cache,
+store, index, registry, ...) shared by every Streamlit session and every
+thread of the process, built on first use.
+"""
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+
+_UNSET = object()
+
+
+@contextmanager
+def connect(path, timeout=30):
+    """SQLite connection in WAL mode, committed (or rolled back) and closed on exit."""
+    with closing(sqlite3.connect(path, timeout=timeout)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+
+
+class ProcessWide:
+    """
+    The process-wide instance of something, built by factory() on first get().
+    set() replaces it, e.g. with one at a temporary path in tests; the factory
+    may return None for "none configured".
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.instance = _UNSET
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self.instance is _UNSET:
+                self.instance = self.factory()
+            return self.instance
+
+    def set(self, instance):
+        with self._lock:
+            self.instance = instance
@@ -0,0 +1,93 @@
+"""
+Single-flight request coalescing.
+
+When several sessions ask for the same thing at the same time (the same search,
+the same watchlist company, the same job link), only the first caller does the
+work; the others wait for its result instead of sending their own identical
+request upstream. Nothing is kept once the call finishes - reuse across time is
+the caches' job (scrape_cache, link_cache).
+
+Each kind of call gets a named, process-wide group (see group()), and every
+group counts how many calls it has coalesced.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one underlying call."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def claim(self, key):
+        """
+        Return (future, leader). The leader must do the work and resolve() the
+        future; everybody else just waits on it. Use this directly from asyncio
+        code (awaiting asyncio.wrap_future(future)); do() covers the blocking case.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def resolve(self, key, future, result=None, error=None):
+        """Publish the leader's result (or error) to every waiter and end the flight."""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Return (fn(*args, **kwargs), shared), running fn only if no identical call
+        is already in flight. shared is True when the result came from another
+        caller's call; errors are shared the same way.
+        """
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+        self.resolve(key, future, result)
+        return result, False
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._in_flight)}
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def group(name):
+    """Process-wide SingleFlight for one kind of call, e.g. 'scrape_jobs'."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def stats():
+    """{group name: stats} for every group created so far."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: g.stats() for g in groups}
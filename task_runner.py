@@ -0,0 +1,164 @@
+"""
+Process-wide background task runner.
+
+Streamlit re-runs app.py from the top on every widget interaction, which throws
+away any scan running inside the script. Scans are submitted here instead: they
+run on a shared thread pool that outlives script runs and sessions, and the page
+polls the task by id for progress, partial results and the final result.
+Finished tasks are kept for a while so their results survive reruns and reloads.
+
+Code running inside a task reports progress with report_progress(), which is a
+no-op outside a task, so pipeline functions stay usable from plain scripts.
+Cancellation is cooperative: once a task is cancelled, its next
+report_progress() call raises TaskCancelled.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import shared
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RETAIN_SECONDS = 60 * 60  # how long finished tasks are kept
+DEFAULT_MAX_RETAINED = 50
+
+_current = threading.local()
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task that has been cancelled."""
+
+
+class Task:
+    """State of one submitted task, updated from the worker and read by the page."""
+
+    def __init__(self, label, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.params = params
+        self.status = 'queued'  # queued, running, done, failed, cancelled
+        self.done = 0
+        self.total = 0
+        self.message = ''
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def report(self, done=None, total=None, message=None, partial=None):
+        """Record progress; raises TaskCancelled if the task was cancelled."""
+        if self._cancel.is_set():
+            raise TaskCancelled(f"Task {self.id} was cancelled")
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+
+def current_task():
+    """The Task running on this thread, or None."""
+    return getattr(_current, 'task', None)
+
+
+def report_progress(done=None, total=None, message=None, partial=None):
+    """Report progress for the task running on this thread (no-op outside a task)."""
+    task = current_task()
+    if task is not None:
+        task.report(done=done, total=total, message=message, partial=partial)
+
+
+class TaskRunner:
+    """Thread pool plus a registry of submitted tasks, keyed by task id."""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, retain_seconds=DEFAULT_RETAIN_SECONDS,
+                 max_retained=DEFAULT_MAX_RETAINED):
+        self.retain_seconds = retain_seconds
+        self.max_retained = max_retained
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label=None, **kwargs):
+        """Run fn(*args, **kwargs) in the background and return its Task."""
+        task = Task(label or getattr(fn, '__name__', 'task'), kwargs)
+        with self._lock:
+            self._prune()
+            self._tasks[task.id] = task
+        self._executor.submit(self._run, task, fn, args, kwargs)
+        return task
+
+    def _run(self, task, fn, args, kwargs):
+        if task.cancel_requested:
+            task.status = 'cancelled'
+            task.finished = time.time()
+            return
+        task.status = 'running'
+        _current.task = task
+        try:
+            task.result = fn(*args, **kwargs)
+            task.status = 'done'
+        except TaskCancelled:
+            task.status = 'cancelled'
+        except Exception as e:
+            logger.exception(f"Task {task.label} ({task.id}) failed")
+            task.error = e
+            task.status = 'failed'
+        finally:
+            _current.task = None
+            task.partial = None
+            task.finished = time.time()
+
+    def get(self, task_id):
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def cancel(self, task_id):
+        task = self.get(task_id)
+        if task is not None:
+            task.cancel()
+        return task
+
+    def tasks(self):
+        """All retained tasks, newest first."""
+        with self._lock:
+            self._prune()
+            return sorted(self._tasks.values(), key=lambda t: t.created, reverse=True)
+
+    def _prune(self):
+        # Caller holds self._lock. Active tasks are never dropped.
+        now = time.time()
+        finished = sorted((t for t in self._tasks.values() if not t.active), key=lambda t: t.finished)
+        for i, task in enumerate(finished):
+            if now - task.finished > self.retain_seconds or len(finished) - i > self.max_retained:
+                del self._tasks[task.id]
+
+    def shutdown(self, wait=True):
+        for task in self.tasks():
+            task.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+_runner = shared.ProcessWide(TaskRunner)
+get_runner = _runner.get
+set_runner = _runner.set
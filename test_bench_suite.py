@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import bench_suite
+import company_monitor
+import fake_board
+import scrape_cache
+
+
+@pytest.fixture(autouse=True)
+def restore_globals(isolated, monkeypatch):
+    # bench_suite swaps stores and scrape_jobs process-wide; `isolated` puts the
+    # stores back after each test, and scrape_jobs is restored here
+    for module in (scrape_cache, company_monitor):
+        monkeypatch.setattr(module, "scrape_jobs", module.scrape_jobs)
+
+
+def test_fake_board_is_deterministic_and_pages():
+    scrape = fake_board.make_scrape_jobs(available=30)
+    first = scrape(site_name=["indeed", "linkedin"], search_term="chemist", results_wanted=10)
+    again = scrape(site_name=["indeed", "linkedin"], search_term="chemist", results_wanted=10)
+    assert len(first) == 20 and first.equals(again)
+    page = scrape(site_name=["indeed"], search_term="chemist", results_wanted=10, offset=10)
+    assert set(page['job_url']).isdisjoint(first['job_url'])
+    batch = scrape(site_name=["indeed"], search_term='"Acme" OR "Globex"', results_wanted=10)
+    assert {"Acme", "Globex"} <= set(batch['company'])
+
+
+def test_compare_flags_regressions_beyond_tolerance_and_min_delta():
+    baselines = {'small/search': {'seconds': 1.0, 'rows': 10}, 'small/verify': {'seconds': 0.01, 'rows': 5},
+                 'small/postprocess': {'seconds': 2.0, 'rows': 7}, 'small/watchlist': {'seconds': 1.0, 'rows': 3}}
+    results = {'small/search': {'seconds': 1.6, 'rows': 10},  # 60% slower
+               'small/verify': {'seconds': 0.04, 'rows': 5},  # 4x slower but within min_delta
+               'small/postprocess': {'seconds': 1.0, 'rows': 8},
+               'small/watchlist': {'seconds': 1.1, 'rows': 4},
+               'medium/search': {'seconds': 3.0, 'rows': 20}}
+    report = bench_suite.compare(results, baselines, tolerance=0.5, min_delta=0.05).set_index('scenario')
+    assert report['status'].to_dict() == {
+        'small/search': 'regression', 'small/verify': 'ok', 'small/postprocess': 'faster',
+        'small/watchlist': 'rows changed', 'medium/search': 'new'}
+
+
+def test_tiny_suite_runs_offline_and_updates_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_suite, "SCALES", {'tiny': {
+        'search': dict(sites=2, terms=1, rows=10, latency=0),
+        'watchlist': dict(companies=3, sites=2, rows=5, latency=0),
+        'verify': dict(urls=20, hosts=1),
+        'postprocess': dict(rows=100),
+    }})
+    results = bench_suite.run_suite(['tiny'], repeat=1)
+    assert set(results) == {'tiny/search', 'tiny/watchlist', 'tiny/verify', 'tiny/postprocess'}
+    assert all(r['rows'] > 0 for r in results.values())
+
+    path = tmp_path / "baselines.json"
+    bench_suite.save_baselines(str(path), {'other/search': {'seconds': 1.0, 'rows': 1}})
+    bench_suite.save_baselines(str(path), results)
+    saved = json.loads(path.read_text())['results']
+    assert 'other/search' in saved and saved['tiny/verify'] == results['tiny/verify']
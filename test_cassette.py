@@ -0,0 +1,89 @@
+import functools
+import time
+
+import pandas as pd
+import pytest
+
+import cassette
+import fake_ats
+import fake_board
+import fanout
+import link_cache
+import link_checker
+import scrape_cache
+
+
+@pytest.fixture(autouse=True)
+def no_cassette(isolated, monkeypatch):
+    monkeypatch.setattr(cassette._cassette, "instance", None)
+
+
+def test_record_then_replay_scrapes_without_calling_the_board(tmp_path):
+    calls = []
+    board = fake_board.make_scrape_jobs(latency=0.2, available=20, calls=calls)
+    scrape = functools.partial(scrape_cache.cached_scrape_jobs, scrape_fn=board)
+    queries = fanout.build_queries(["indeed", "linkedin"], ["chemist", "biologist"], results_wanted=10)
+    path = str(tmp_path / "tape")
+
+    cassette.configure('record', path=path)
+    recorded, errors = fanout.run_queries(queries, scrape_fn=scrape)
+    assert not errors and len(calls) == 4
+    # Recording bypasses the cache, so a repeat is recorded again rather than served from it
+    fanout.run_queries(queries, scrape_fn=scrape)
+    assert len(calls) == 8
+    assert cassette.get_cassette().stats()['scrapes'] == 4
+
+    tape = cassette.configure('replay', path=path)
+    start = time.perf_counter()
+    replayed, errors = fanout.run_queries(queries, scrape_fn=scrape)
+    assert time.perf_counter() - start < 0.2
+    assert not errors and len(calls) == 8 and tape.hits == 4
+    for before, after in zip(recorded, replayed):
+        pd.testing.assert_frame_equal(before.reset_index(drop=True), after, check_dtype=False)
+
+    # A query that was never recorded fails instead of going out
+    _, errors = fanout.run_queries(fanout.build_queries(["indeed"], ["physicist"]), scrape_fn=scrape)
+    assert len(errors) == 1 and isinstance(errors[0]['error'], cassette.CassetteMiss) and len(calls) == 8
+
+    tape.latency = 'recorded'
+    start = time.perf_counter()
+    scrape(**queries[0])
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_mixed_type_columns_are_recorded_as_strings(tmp_path):
+    tape = cassette.Cassette(path=str(tmp_path / "tape"), mode='record')
+    frame = pd.DataFrame({'title': ["a", "b"], 'emails': [["x@y.com"], 3]})
+    tape.record_scrape("k", {'site': ["indeed"]}, frame, 0.1)
+    tape.record_scrape("none", {'site': ["indeed"]}, None, 0.1)
+    replay = cassette.Cassette(path=str(tmp_path / "tape"), mode='replay')
+    assert replay.replay_scrape("k")['emails'].tolist() == ["['x@y.com']", "3"]
+    assert replay.replay_scrape("none") is None
+    with pytest.raises(cassette.CassetteMiss):
+        replay.replay_scrape("other")
+
+
+def test_record_then_replay_link_checks(tmp_path):
+    server, base = fake_ats.start_server(slow_delay=0.3)
+    urls = [f"{base}/ok/1", f"{base}/gone/2", f"{base}/slow/3", f"{base}/missing/4"]
+    path = str(tmp_path / "tape")
+    try:
+        cassette.configure('record', path=path)
+        recorded = link_checker.verify_urls(urls)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert cassette.get_cassette().stats()['checks'] == 4
+
+    cassette.configure('replay', path=path)
+    start = time.perf_counter()
+    assert link_checker.verify_urls(urls) == recorded
+    assert time.perf_counter() - start < 0.3
+    assert link_checker.verify_urls([f"{base}/ok/5"])[f"{base}/ok/5"]['status'] == 'Error'
+
+    cassette.configure('replay', path=path, latency='recorded')
+    start = time.perf_counter()
+    link_checker.verify_urls([f"{base}/slow/3"])
+    assert time.perf_counter() - start >= 0.3
+    # Replays never touch the link cache
+    assert link_cache.get_cache().stats()['entries'] == 0
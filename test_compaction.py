@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import compaction
+import global_search
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(compaction._store, "instance", compaction.DescriptionStore(path=str(tmp_path / "descriptions.sqlite")))
+
+
+def _jobs(site, n, offset=0):
+    return pd.DataFrame({
+        'site': site,
+        'job_url': [f"https://{site}/{i}" for i in range(offset, offset + n)],
+        'title': [f"Scientist {i}" for i in range(offset, offset + n)],
+        'company': ["Pfizer", "Merck"] * (n // 2),
+        'description': [f"Posting {i} " * 50 for i in range(offset, offset + n)],
+    })
+
+
+def test_compaction_moves_descriptions_and_shrinks_the_frame():
+    jobs = _jobs("indeed", 100)
+    jobs.attrs['coverage'] = {'complete': True}
+    compact = compaction.compact_jobs(jobs)
+    assert 'description' not in compact.columns
+    assert isinstance(compact['company'].dtype, pd.CategoricalDtype)
+    assert compact['title'].dtype == object  # one distinct title per row stays as is
+    assert compact.attrs == {'coverage': {'complete': True}}
+    assert compaction.memory_bytes(compact) < compaction.memory_bytes(jobs) / 5
+
+    restored = compaction.with_descriptions(compact)
+    assert list(restored['description']) == list(jobs['description'])
+    assert compaction.get_store().get("https://indeed/3") == "Posting 3 " * 50
+
+
+def test_rows_without_job_url_keep_their_description():
+    jobs = pd.DataFrame({'job_url': ["https://a/1", None], 'description': ["stored", "kept"]})
+    compact = compaction.compact_jobs(jobs)
+    assert list(compact['description'].fillna("")) == ["", "kept"]
+    assert list(compaction.with_descriptions(compact)['description']) == ["stored", "kept"]
+
+
+def test_concat_keeps_categoricals_across_frames():
+    frames = [compaction.compact_jobs(_jobs("indeed", 10)), compaction.compact_jobs(_jobs("linkedin", 10))]
+    merged = compaction.concat_jobs(frames)
+    assert isinstance(merged['site'].dtype, pd.CategoricalDtype)
+    assert isinstance(merged['company'].dtype, pd.CategoricalDtype)
+    assert list(merged['site'].value_counts().sort_index()) == [10, 10]
+
+
+def test_merge_results_loads_descriptions_only_for_near_duplicate_matching():
+    indeed = _jobs("indeed", 4)
+    # Same postings, retitled on another board: only the descriptions match
+    linkedin = _jobs("linkedin", 4).assign(title=lambda df: "Senior " + df['title'])
+    frames = [compaction.compact_jobs(indeed), compaction.compact_jobs(linkedin)]
+    assert len(global_search.merge_results(frames)) == 8
+    merged = global_search.merge_results(frames, use_minhash=True)
+    assert len(merged) == 4 and 'description' not in merged.columns
+    assert set(merged['sources']) == {"indeed, linkedin"}
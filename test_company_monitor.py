@@ -0,0 +1,185 @@
+import re
+import time
+
+import pandas as pd
+import pytest
+
+import company_monitor
+import scrape_cache
+import search_index
+import seen_store
+
+
+# Pacing is covered by test_rate_limiter; here fake boards answer instantly
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+def _fake_scrape_jobs(delays=None, fail=(), rows_per_company=3):
+    """Fake board: each company in the (possibly OR-ed) search term posts a few jobs."""
+    delays = delays or {}
+    calls = []
+
+    def fake(site_name=None, search_term=None, job_type=None, **kwargs):
+        calls.append((site_name[0], search_term, job_type))
+        names = re.findall(r'"([^"]+)"', search_term) or [search_term]
+        time.sleep(max(delays.get(n, 0) for n in names))
+        if any(n in fail for n in names):
+            raise RuntimeError("blocked")
+        rows = []
+        for name in names:
+            rows += [("Research Scientist", name), ("Sales Rep", name), ("Scientist II", "Someone Else")][:rows_per_company]
+        return pd.DataFrame({
+            'title': [t for t, _ in rows],
+            'company': [c for _, c in rows],
+            'job_url': [f"https://x/{site_name[0]}/{c}/{job_type}/{i}" for i, (_, c) in enumerate(rows)],
+        })
+
+    return fake, calls
+
+
+def test_results_follow_watchlist_order(monkeypatch):
+    fake, _ = _fake_scrape_jobs(delays={"Alpha": 0.2})
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    jobs = company_monitor.scrape_aggregator_companies(
+        [{"name": "Alpha", "keywords": ["scientist"]}, {"name": "Beta"}], sites=["glassdoor"], max_workers=4)
+    assert list(jobs['monitored_company']) == ["Alpha", "Beta", "Beta"]
+    assert list(jobs['title']) == ["Research Scientist", "Research Scientist", "Sales Rep"]
+
+
+def test_failing_and_slow_companies_do_not_block_others(monkeypatch):
+    fake, _ = _fake_scrape_jobs(delays={"Slow": 3}, fail={"Broken"})
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    start = time.monotonic()
+    jobs = company_monitor.scrape_aggregator_companies(
+        [{"name": "Slow"}, {"name": "Broken"}, {"name": "Gamma"}], sites=["glassdoor"], company_timeout=0.3)
+    assert time.monotonic() - start < 2
+    assert set(jobs['monitored_company']) == {"Gamma"}
+
+
+def test_fans_out_over_job_types(monkeypatch):
+    fake, calls = _fake_scrape_jobs()
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    jobs = company_monitor.scrape_aggregator_companies(
+        [{"name": "Alpha"}], sites=["indeed"], job_types=["fulltime", "contract"], max_workers=1)
+    assert calls == [("indeed", "Alpha", "fulltime"), ("indeed", "Alpha", "contract")]
+    assert len(jobs) == 4
+
+
+def test_plan_batches_only_on_batchable_sites():
+    companies = [{"name": n} for n in ["A", "B", "C"]]
+    plan = company_monitor.plan_queries(companies, ["indeed", "glassdoor"], [None], batch_size=2)
+    assert [(q['site'], q['search_term']) for q in plan] == [
+        ("indeed", '"A" OR "B"'), ("indeed", "C"),
+        ("glassdoor", "A"), ("glassdoor", "B"), ("glassdoor", "C"),
+    ]
+
+
+def test_batched_rows_are_routed_back_to_their_company(monkeypatch):
+    fake, calls = _fake_scrape_jobs(rows_per_company=2)
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    companies = [{"name": "Johnson & Johnson"}, {"name": "Merck"}, {"name": "Pfizer", "keywords": ["sales"]}]
+    jobs = company_monitor.scrape_aggregator_companies(companies, sites=["indeed"], results_wanted=100)
+    assert len(calls) == 1
+    assert list(jobs['monitored_company']) == ["Johnson & Johnson"] * 2 + ["Merck"] * 2 + ["Pfizer"]
+    assert jobs.attrs['query_plan'] == {'calls': 1, 'per_company_calls': 3, 'saved': 2, 'fallbacks': 0}
+
+
+def test_saturated_batch_falls_back_to_per_company_queries(monkeypatch):
+    fake, calls = _fake_scrape_jobs(rows_per_company=2)
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    companies = [{"name": "Alpha"}, {"name": "Beta"}]
+    jobs = company_monitor.scrape_aggregator_companies(companies, sites=["indeed"], results_wanted=4)
+    terms = [term for _, term, _ in calls]
+    assert terms[0] == '"Alpha" OR "Beta"' and sorted(terms[1:]) == ["Alpha", "Beta"]
+    assert list(jobs['monitored_company']) == ["Alpha", "Alpha", "Beta", "Beta"]
+    assert jobs.attrs['query_plan'] == {'calls': 3, 'per_company_calls': 2, 'saved': 0, 'fallbacks': 2}
+    assert "1 more than one per company" in company_monitor.describe_query_plan(jobs.attrs['query_plan'])
+
+
+def test_order_and_surviving_duplicates_do_not_depend_on_completion_order(monkeypatch):
+    def fake(site_name=None, search_term=None, **kwargs):
+        site = site_name[0]
+        # The first board in the plan answers last
+        time.sleep(0.3 if site == "indeed" else 0)
+        rows = []
+        for name in re.findall(r'"([^"]+)"', search_term) or [search_term]:
+            rows += [(f"Research Scientist ({site})", name, f"https://x/{name}/shared"),
+                     (f"Scientist II ({site})", name, f"https://x/{site}/{name}/own")]
+        return pd.DataFrame({'title': [t for t, _, _ in rows], 'company': [c for _, c, _ in rows],
+                             'job_url': [u for _, _, u in rows], 'site': site})
+
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    # The Alpha/Beta batch on indeed comes back full, so it is re-run per company
+    jobs = company_monitor.scrape_aggregator_companies(
+        [{"name": "Alpha"}, {"name": "Beta"}], sites=["indeed", "glassdoor"], results_wanted=4, max_workers=4)
+    assert jobs.attrs['query_plan']['fallbacks'] == 2
+    assert list(zip(jobs['monitored_company'], jobs['title'])) == [
+        ("Alpha", "Research Scientist (indeed)"), ("Alpha", "Scientist II (indeed)"),
+        ("Alpha", "Scientist II (glassdoor)"),
+        ("Beta", "Research Scientist (indeed)"), ("Beta", "Scientist II (indeed)"),
+        ("Beta", "Scientist II (glassdoor)"),
+    ]
+
+
+def test_adaptive_scan_only_falls_back_when_coverage_is_incomplete(monkeypatch):
+    fake, calls = _fake_scrape_jobs(rows_per_company=2)
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    companies = [{"name": "Alpha"}, {"name": "Beta"}]
+    # Four rows come back for a first page of 25: complete, one call
+    jobs = company_monitor.scrape_aggregator_companies(companies, sites=["indeed"], results_wanted=100,
+                                                       adaptive=True)
+    assert len(calls) == 1 and jobs.attrs['query_plan']['fallbacks'] == 0
+    # With a cap of 4 the same page is full, so the batch may be truncated
+    jobs = company_monitor.scrape_aggregator_companies(companies, sites=["indeed"], results_wanted=4,
+                                                       adaptive=True)
+    assert jobs.attrs['query_plan']['fallbacks'] == 2
+
+
+def test_new_only_returns_delta_and_disappeared(monkeypatch, tmp_path):
+    monkeypatch.setattr(seen_store._store, "instance", seen_store.SeenStore(path=str(tmp_path / "seen.sqlite")))
+    fake, _ = _fake_scrape_jobs(rows_per_company=2)
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    companies = [{"name": "Alpha"}, {"name": "Beta"}]
+    first = company_monitor.scrape_aggregator_companies(companies, sites=["glassdoor"], new_only=True)
+    assert len(first) == 4 and set(first['change']) == {"new"}
+
+    scrape_cache.get_cache().clear()
+    fake, _ = _fake_scrape_jobs(rows_per_company=1)
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    second = company_monitor.scrape_aggregator_companies(companies, sites=["glassdoor"], new_only=True)
+    assert second.empty
+    assert sorted(d['scope'] for d in second.attrs['disappeared']) == ["watchlist:Alpha", "watchlist:Beta"]
+
+
+def test_keyword_index_filter_matches_title_scan(monkeypatch):
+    fake, _ = _fake_scrape_jobs()
+    monkeypatch.setattr(company_monitor, "scrape_jobs", fake)
+    companies = [{"name": "Alpha", "keywords": ["scientist"]}, {"name": "Beta", "keywords": ["sales", "ii"]}]
+    scanned = company_monitor.scrape_aggregator_companies(companies, sites=["glassdoor"])
+    indexed = company_monitor.scrape_aggregator_companies(companies, sites=["glassdoor"], keyword_index=True)
+    assert search_index.get_index().stats()['postings'] == 5  # both queries return one shared posting
+    pd.testing.assert_frame_equal(indexed, scanned)
+
+
+def test_config_is_parsed_once_per_file_version(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    path = str(config_dir / "companies.yaml")
+    company_monitor.save_config({'aggregator_companies': [{'name': "Pfizer", 'keywords': ["scientist", "lab"]}]}, path)
+    parses = []
+    safe_load = company_monitor.yaml.safe_load
+    monkeypatch.setattr(company_monitor.yaml, "safe_load", lambda f: parses.append(1) or safe_load(f))
+
+    config = company_monitor.load_config(path)
+    config['aggregator_companies'].clear()  # callers get a copy
+    assert company_monitor.load_config(path)['aggregator_companies'][0]['name'] == "Pfizer"
+    frame = company_monitor.watchlist_frame(path)
+    assert frame.to_dict('records') == [{'scan': True, 'name': "Pfizer", 'keywords': "scientist, lab"}]
+    assert len(parses) == 1
+
+    company_monitor.save_config({'aggregator_companies': [{'name': "Merck", 'keywords': []}]}, path)
+    assert list(company_monitor.watchlist_frame(path)['name']) == ["Merck"]
+    assert len(parses) == 2
+    assert [p.name for p in config_dir.iterdir()] == ["companies.yaml"]  # no temporary files left
+    assert company_monitor.load_config(str(tmp_path / "missing.yaml")) == {}
+    assert list(company_monitor.watchlist_frame(str(tmp_path / "missing.yaml")).columns) == ['scan', 'name', 'keywords']
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import dedup
+
+
+def _jobs():
+    return pd.DataFrame({
+        'site': ["indeed", "linkedin", "glassdoor", "indeed", "linkedin", "indeed"],
+        'title': ["Research Scientist I", "Research Scientist I", "research scientist i",
+                  "Lab Technician", "Chemist", "Senior Chemist"],
+        'company': ["Pfizer Inc.", "Pfizer", "PFIZER, INC", "Pfizer", None, "Merck"],
+        'location': ["Atlanta, GA, US", "Atlanta, GA", "Atlanta, GA", "Atlanta, GA", "Atlanta, GA", "Rahway, NJ"],
+        'job_url': [f"https://x/{i}" for i in range(6)],
+        'job_url_direct': [None, None, "https://pfizer.wd1.myworkdayjobs.com/1", None, None, None],
+        'min_amount': [np.nan, 90000, 90000, np.nan, np.nan, np.nan],
+        'description': ["We are hiring a research scientist to run assays in our Atlanta lab"] * 3
+                       + ["Prepare samples", "Analyze compounds", "Senior role analyzing compounds"],
+    })
+
+
+def test_collapses_cross_site_copies_and_keeps_best_row():
+    out = dedup.collapse_duplicates(_jobs())
+    assert list(out['job_url']) == ["https://x/2", "https://x/3", "https://x/4", "https://x/5"]
+    assert out.loc[0, 'sources'] == "glassdoor, indeed, linkedin"
+    assert list(out['duplicates']) == [2, 0, 0, 0]
+
+
+def test_rows_without_company_are_not_merged_on_key():
+    jobs = pd.DataFrame({'site': ["indeed", "linkedin"], 'title': ["Chemist"] * 2, 'company': [None, None],
+                         'location': ["GA"] * 2, 'job_url': ["a", "b"]})
+    assert len(dedup.collapse_duplicates(jobs)) == 2
+
+
+def test_minhash_merges_retitled_copies_of_the_same_description():
+    text = " ".join(f"word{i}" for i in range(200))
+    jobs = pd.DataFrame({
+        'site': ["indeed", "linkedin", "glassdoor"],
+        'title': ["Scientist II", "Scientist 2 - Biology", "Data Analyst"],
+        'company': ["Pfizer", "Pfizer", "Pfizer"],
+        'location': ["Atlanta, GA"] * 3,
+        'job_url': ["a", "b", "c"],
+        'description': [text, text + " apply now", " ".join(f"other{i}" for i in range(200))],
+    })
+    assert len(dedup.collapse_duplicates(jobs)) == 3
+    out = dedup.collapse_duplicates(jobs, use_minhash=True)
+    assert list(out['job_url']) == ["a", "c"]
+    assert out.loc[0, 'sources'] == "indeed, linkedin"
+
+
+def test_minhash_similarity_estimate():
+    sig = dedup.minhash_signatures(["a b c d e f g h", "a b c d e f g h", "p q r s t u v w"])
+    assert np.mean(sig[0] == sig[1]) == 1.0
+    assert np.mean(sig[0] == sig[2]) < 0.2
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import fake_ats
+import fanout
+import global_search
+import scrape_cache
+import task_runner
+
+
+def _stub(latency=0.0, fail_terms=(), hang_terms=()):
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def fake_scrape_jobs(site_name=None, search_term=None, job_type=None, **kwargs):
+        site = site_name[0]
+        with lock:
+            active[site] = active.get(site, 0) + 1
+            peak[site] = max(peak.get(site, 0), active[site])
+        try:
+            if search_term in hang_terms:
+                time.sleep(5)
+            time.sleep(latency)
+            if search_term in fail_terms:
+                raise RuntimeError("blocked")
+            return pd.DataFrame({'site': [site], 'title': [search_term], 'job_type': [job_type],
+                                 'job_url': [f"https://x/{site}/{search_term}/{job_type}"]})
+        finally:
+            with lock:
+                active[site] -= 1
+
+    return fake_scrape_jobs, peak
+
+
+def test_build_queries_one_per_site_term_and_job_type():
+    queries = fanout.build_queries(["indeed", "linkedin"], ["a", "b"], ["fulltime", "contract"], location="Georgia")
+    assert len(queries) == 8
+    assert all(len(q['site_name']) == 1 and q['location'] == "Georgia" for q in queries)
+    assert fanout.build_queries(["indeed"], ["a"])[0]['job_type'] is None
+
+
+def test_results_keep_query_order_and_failures_are_isolated():
+    stub, _ = _stub(latency=0.01, fail_terms={"bad"})
+    queries = fanout.build_queries(["indeed", "linkedin"], ["a", "bad", "c"])
+    frames, errors = fanout.run_queries(queries, scrape_fn=stub)
+    assert [f['title'][0] for f in frames] == ["a", "a", "c", "c"]
+    assert len(errors) == 2
+    assert all(isinstance(e['error'], RuntimeError) for e in errors)
+
+
+def test_per_site_limit_is_respected():
+    stub, peak = _stub(latency=0.05)
+    queries = fanout.build_queries(["indeed", "linkedin"], [str(i) for i in range(10)])
+    fanout.run_queries(queries, scrape_fn=stub, max_workers=10, per_site_limit=2)
+    assert peak == {"indeed": 2, "linkedin": 2}
+
+
+def test_slow_query_times_out_without_blocking_the_rest():
+    stub, _ = _stub(hang_terms={"slow"})
+    progress = []
+    queries = fanout.build_queries(["indeed"], ["slow", "a", "b"])
+    start = time.monotonic()
+    frames, errors = fanout.run_queries(queries, scrape_fn=stub, per_site_limit=3, timeout=0.3,
+                                        on_result=lambda q, f, e, done, total: progress.append((done, total)))
+    assert time.monotonic() - start < 3
+    assert [f['title'][0] for f in frames] == ["a", "b"]
+    assert isinstance(errors[0]['error'], TimeoutError)
+    assert progress[-1] == (3, 3)
+
+
+def test_iter_queries_yields_fast_boards_first():
+    def scrape(site_name=None, search_term=None, **kwargs):
+        time.sleep({'indeed': 0.6, 'linkedin': 0.0}[site_name[0]])
+        return pd.DataFrame({'site': [site_name[0]]})
+
+    queries = fanout.build_queries(["indeed", "linkedin"], ["chemist"])
+    start = time.monotonic()
+    stream = fanout.iter_queries(queries, scrape_fn=scrape)
+    idx, frame, error = next(stream)
+    assert (idx, error) == (1, None) and time.monotonic() - start < 0.5
+    assert [i for i, _, _ in stream] == [0]
+
+
+@pytest.fixture
+def runner():
+    runner = task_runner.TaskRunner(max_workers=1)
+    yield runner
+    runner.shutdown()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_search_publishes_partial_results_before_the_slow_board_answers(isolated, runner, monkeypatch):
+    linkedin_may_answer = threading.Event()
+
+    def board(site_name=None, search_term=None, **kwargs):
+        if site_name[0] == "linkedin":
+            linkedin_may_answer.wait(5)
+        return pd.DataFrame({'site': site_name[0], 'title': [f"{search_term} {site_name[0]}"],
+                             'company': [site_name[0]], 'job_url': [f"https://{site_name[0]}/1"]})
+
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", board)
+    task = runner.submit(global_search.run_search, ["indeed", "linkedin"], ["chemist"], rank=False)
+    _wait_for(lambda: task.partial is not None)
+    assert task.active and list(task.partial['site']) == ["indeed"]
+    linkedin_may_answer.set()
+    _wait_for(lambda: not task.active)
+    assert task.status == 'done' and sorted(task.result['site']) == ["indeed", "linkedin"]
+
+
+def test_search_publishes_link_statuses_as_they_arrive(isolated, runner, monkeypatch):
+    server, base = fake_ats.start_server(slow_delay=1.0)
+    urls = [f"{base}/ok/1", f"{base}/slow/2"]
+
+    def board(site_name=None, **kwargs):
+        return pd.DataFrame({'site': site_name[0], 'title': ["Chemist", "Senior Chemist"],
+                             'company': ["A", "B"], 'job_url': urls})
+
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", board)
+    try:
+        task = runner.submit(global_search.run_search, ["indeed"], ["chemist"], rank=False, verify_links=True)
+        _wait_for(lambda: task.partial is not None and 'url_status' in task.partial.columns)
+        statuses = dict(zip(task.partial['job_url'], task.partial['url_status']))
+        assert task.active and statuses[urls[1]] == "Checking..." and statuses[urls[0]] != "Checking..."
+        _wait_for(lambda: not task.active)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "Checking..." not in set(task.result['url_status'])
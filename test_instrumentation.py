@@ -0,0 +1,79 @@
+import json
+import logging
+import time
+
+import pandas as pd
+import pytest
+
+import fanout
+import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def recorder(monkeypatch):
+    recorder = instrumentation.Recorder()
+    monkeypatch.setattr(instrumentation._recorder, "instance", recorder)
+    return recorder
+
+
+def test_stages_log_json_and_count_errors(caplog):
+    caplog.set_level(logging.INFO, logger="company_monitor")
+    with instrumentation.stage('linkedin', rows=3) as span:
+        span['bytes'] = 100
+    with pytest.raises(ValueError):
+        with instrumentation.stage('rank', site="indeed"):
+            raise ValueError("boom")
+    events = [json.loads(r.getMessage()) for r in caplog.records if r.name == "company_monitor"]
+    assert [(e['stage'], e.get('rows'), e.get('bytes'), e['errors']) for e in events] == [
+        ('linkedin', 3, 100, 0), ('rank', None, None, 1)]
+    assert events[1]['site'] == "indeed" and 'trace' not in events[1]
+
+
+def test_traced_pipeline_returns_per_stage_timings_from_worker_threads():
+    def scrape(search_term=None, site_name=None, **kwargs):
+        time.sleep(0.01)
+        return pd.DataFrame({'title': [search_term] * 2})
+
+    @instrumentation.traced('search')
+    def pipeline():
+        queries = fanout.build_queries(["indeed", "linkedin"], ["chemist", "biologist"])
+        frames, _ = fanout.run_queries(queries, scrape_fn=scrape)
+        with instrumentation.stage('merge') as span:
+            jobs = pd.concat(frames, ignore_index=True)
+            instrumentation.frame_stats(span, jobs)
+        return jobs
+
+    jobs = pipeline()
+    timings = {(t['stage'], t['site'], t['target']): t for t in jobs.attrs['timings']}
+    scrape_chemist = timings[('scrape', "indeed", "chemist")]
+    assert scrape_chemist['calls'] == 1 and scrape_chemist['rows'] == 2 and scrape_chemist['seconds'] >= 0.01
+    assert sum(t['calls'] for key, t in timings.items() if key[0] == 'scrape') == 4
+    assert timings[('merge', None, None)]['rows'] == 8 and timings[('merge', None, None)]['bytes'] > 0
+    assert timings[('total', None, "search")]['rows'] == 8
+    # Outside the pipeline nothing is traced any more
+    assert instrumentation.current_trace() is None
+
+
+def test_concurrent_runs_keep_separate_traces():
+    @instrumentation.traced('search')
+    def pipeline(term):
+        frames, _ = fanout.run_queries(fanout.build_queries(["indeed"], [term]),
+                                       scrape_fn=lambda **q: pd.DataFrame({'title': [q['search_term']]}))
+        return pd.concat(frames)
+
+    results = fanout.run_queries([{'site_name': ["a"], 'search_term': "x"}, {'site_name': ["b"], 'search_term': "y"}],
+                                 scrape_fn=lambda search_term, **_: pipeline(search_term))[0]
+    for jobs, term in zip(results, ["x", "y"]):
+        assert {t['target'] for t in jobs.attrs['timings'] if t['stage'] == 'scrape'} == {term}
+
+
+def test_latency_percentiles_accumulate_across_runs(recorder):
+    for seconds in range(1, 101):
+        instrumentation.record('check_url', seconds / 100, site="boards.example", log=False)
+    instrumentation.record('check_url', 5.0, site="slow.example", errors=1, log=False)
+    table = recorder.percentiles('check_url').set_index('site')
+    assert table.loc["boards.example", 'calls'] == 100
+    assert table.loc["boards.example", 'p50'] == pytest.approx(0.505)
+    assert table.loc["boards.example", 'p99'] == pytest.approx(0.99, abs=0.01)
+    assert table.loc["slow.example", 'errors'] == 1 and table.loc["slow.example", 'max'] == 5.0
+    assert recorder.percentiles('render').empty
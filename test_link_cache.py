@@ -0,0 +1,36 @@
+import time
+
+import link_cache
+
+
+def test_bulk_lookup_returns_only_valid_entries(tmp_path):
+    cache = link_cache.LinkCache(path=str(tmp_path / "links.sqlite"))
+    cache.put_many({
+        "https://a/1": {'status': '200 OK', 'url_to_use': "https://a/1"},
+        "https://a/2": {'status': 'Unavailable (Redirected)', 'url_to_use': "https://a/expired"},
+    })
+    found = cache.get_many(["https://a/1", "https://a/2", "https://a/3"])
+    assert set(found) == {"https://a/1", "https://a/2"}
+    assert found["https://a/2"]['url_to_use'] == "https://a/expired"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_ttl_depends_on_status(tmp_path, monkeypatch):
+    monkeypatch.setitem(link_cache.STATUS_TTLS, 'Error', 0.1)
+    cache = link_cache.LinkCache(path=str(tmp_path / "links.sqlite"))
+    cache.put_many({
+        "https://a/err": {'status': 'Error', 'url_to_use': None},
+        "https://a/gone": {'status': 'Unavailable (Redirected)', 'url_to_use': "https://a/expired"},
+    })
+    time.sleep(0.2)
+    assert set(cache.get_many(["https://a/err", "https://a/gone"])) == {"https://a/gone"}
+    assert link_cache.ttl_for('Status 503') == link_cache.DEFAULT_STATUS_TTL
+
+
+def test_large_batch_is_one_lookup(tmp_path):
+    cache = link_cache.LinkCache(path=str(tmp_path / "links.sqlite"))
+    urls = [f"https://a/{i}" for i in range(5000)]
+    cache.put_many({u: {'status': '200 OK', 'url_to_use': u} for u in urls})
+    start = time.perf_counter()
+    assert len(cache.get_many(urls)) == 5000
+    assert time.perf_counter() - start < 1
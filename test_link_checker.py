@@ -0,0 +1,95 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import fake_ats
+import link_cache
+import link_checker
+import rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(link_cache._cache, "instance", link_cache.LinkCache(path=str(tmp_path / "links.sqlite")))
+    monkeypatch.setattr(rate_limiter._registry, "instance", rate_limiter.RateLimiterRegistry())
+
+
+@pytest.fixture(scope="module")
+def ats():
+    server, base_url = fake_ats.start_server(slow_delay=0.3)
+    yield server, base_url
+    server.shutdown()
+
+
+def test_classify():
+    assert link_checker.classify(200, "https://x/jobs/1") == '200 OK'
+    assert link_checker.classify(200, "https://x/job-expired") == 'Unavailable (Redirected)'
+    assert link_checker.classify(404, "https://x/jobs/1") == 'Status 404'
+
+
+def test_verify_jobs_statuses(ats):
+    _, base = ats
+    jobs = pd.DataFrame({'job_url': [
+        f"{base}/ok/1", f"{base}/gone/2", f"{base}/slow/3", f"{base}/nohead/4",
+        f"{base}/missing/5", None, "http://127.0.0.1:1/refused",
+    ]}, index=[10, 11, 12, 13, 14, 15, 16])
+    out = link_checker.verify_jobs(jobs)
+    assert list(out.index) == list(jobs.index)
+    assert list(out['url_status']) == [
+        '200 OK', 'Unavailable (Redirected)', '200 OK', '200 OK', 'Status 404', 'Missing Link', 'Error',
+    ]
+    assert out.loc[11, 'best_url'] == f"{base}/job-expired"
+
+
+def test_head_first_and_duplicates_checked_once(ats):
+    server, base = ats
+    server.requests.clear()
+    progress = []
+    results = link_checker.verify_urls([f"{base}/ok/a", f"{base}/ok/a", f"{base}/ok/b"],
+                                       on_progress=lambda done, total: progress.append((done, total)))
+    assert set(results) == {f"{base}/ok/a", f"{base}/ok/b"}
+    assert server.requests == {'HEAD': 2}
+    assert progress[-1] == (2, 2)
+
+
+def test_slow_host_times_out(ats):
+    _, base = ats
+    results = link_checker.verify_urls([f"{base}/slow/1", f"{base}/ok/1"], timeout=0.1)
+    assert results[f"{base}/slow/1"]['status'] == 'Error'
+    assert results[f"{base}/ok/1"]['status'] == '200 OK'
+
+
+def test_cached_urls_are_not_rechecked(ats):
+    server, base = ats
+    urls = [f"{base}/ok/c1", f"{base}/gone/c2"]
+    first = link_checker.verify_urls(urls)
+    server.requests.clear()
+    progress = []
+    second = link_checker.verify_urls(urls, on_progress=lambda done, total: progress.append((done, total)))
+    assert second == first
+    assert server.requests == {}
+    assert progress == [(2, 2)]
+
+
+def test_results_stream_before_slow_urls_finish(ats):
+    _, base = ats
+    arrived = []
+    link_checker.verify_urls([f"{base}/slow/s1", f"{base}/ok/s2"],
+                             on_result=lambda url, result: arrived.append((url, result['status'])))
+    assert arrived == [(f"{base}/ok/s2", '200 OK'), (f"{base}/slow/s1", '200 OK')]
+
+
+def test_concurrent_runs_share_in_flight_checks(ats):
+    server, base = ats
+    server.requests.clear()
+    urls = [f"{base}/slow/shared{i}" for i in range(3)]
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(link_checker.verify_urls(urls, use_cache=False)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 4 and all(r == results[0] for r in results)
+    assert server.requests == {'HEAD': 3}
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from linkedin import add_linkedin_columns, build_linkedin_url
+
+
+def _reference(df):
+    """The row-wise implementation add_linkedin_columns replaced."""
+    def _recruiter(row):
+        company = str(row.get('company', '') or '')
+        loc = str(row.get('location', '') or '')
+        if not company:
+            return None
+        return build_linkedin_url(f"recruiter {company} {loc}".strip())
+
+    def _hiring_mgr(row):
+        company = str(row.get('company', '') or '')
+        loc = str(row.get('location', '') or '')
+        if not company:
+            return None
+        return build_linkedin_url(f"hiring manager {company} {loc}".strip())
+
+    def _team(row):
+        company = str(row.get('company', '') or '')
+        title = str(row.get('title', '') or '')
+        if not company:
+            return None
+        return build_linkedin_url(f"{title} {company}".strip())
+
+    df['find_recruiter'] = df.apply(_recruiter, axis=1)
+    df['find_manager'] = df.apply(_hiring_mgr, axis=1)
+    df['find_team'] = df.apply(_team, axis=1)
+    return df
+
+
+def _jobs():
+    return pd.DataFrame({
+        'title': ["Research Scientist", None, "Chemist / R&D", np.nan, "", "Sr. Scientist"],
+        'company': ["Pfizer", "Johnson & Johnson", None, np.nan, "", "Pfizer"],
+        'location': ["Atlanta, GA", None, "Remote", "Atlanta, GA", "", "Atlanta, GA"],
+    }, index=[5, 3, 9, 1, 7, 2])
+
+
+def test_matches_row_wise_implementation():
+    expected = _reference(_jobs())
+    actual = add_linkedin_columns(_jobs())
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_missing_columns_and_empty_frame():
+    expected = _reference(pd.DataFrame({'title': ["x", "y"]}))
+    pd.testing.assert_frame_equal(add_linkedin_columns(pd.DataFrame({'title': ["x", "y"]})), expected)
+    assert add_linkedin_columns(pd.DataFrame()).empty
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+import company_monitor
+import global_search
+import location_shards
+import scrape_cache
+
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+def _capped_board(cap=3):
+    """
+    Fake board that never returns more than `cap` postings per query. The
+    unsharded Georgia query sees the first Atlanta postings plus one in Savannah;
+    each metro query sees that metro's own postings.
+    """
+    postings = {"Atlanta, GA": [f"atl/{i}" for i in range(5)], "Savannah, GA": ["sav/0"]}
+    postings["Georgia"] = postings["Atlanta, GA"][:2] + postings["Savannah, GA"]
+    calls = []
+
+    def scrape(location=None, search_term=None, **kwargs):
+        calls.append(location)
+        ids = postings.get(location, [])[:cap]
+        return pd.DataFrame({'title': [f"Chemist {i}" for i in ids], 'company': [search_term] * len(ids),
+                             'job_url': [f"https://x/{i}" for i in ids], 'site': ["indeed"] * len(ids)})
+
+    return scrape, calls
+
+
+def test_broad_locations_resolve_to_metro_shards():
+    georgia = location_shards.shards_for("Georgia")
+    assert "Atlanta, GA" in georgia and "Savannah, GA" in georgia
+    assert location_shards.shards_for(" ga ") == georgia
+    assert location_shards.shards_for("Georgia, USA") == georgia
+    assert "Atlanta, GA" in location_shards.shards_for("United States")
+    assert location_shards.shards_for("Atlanta, GA") == []
+    assert location_shards.shards_for("") == []
+
+
+def test_shard_queries_keep_the_unsharded_query_first():
+    queries = [{'search_term': "chemist", 'location': "GA"}, {'search_term': "chemist", 'location': "Atlanta, GA"}]
+    expanded, shards = location_shards.shard_queries(queries)
+    assert expanded[0] is queries[0] and shards[0] is None
+    georgia = location_shards.shards_for("Georgia")
+    assert [q['location'] for q in expanded[1:len(georgia) + 1]] == georgia
+    assert expanded[-1] is queries[1] and shards[-1] is None
+    assert len(expanded) == len(georgia) + 2
+
+
+def test_shard_report_counts_postings_the_unsharded_query_missed():
+    frame = lambda *urls: pd.DataFrame({'job_url': list(urls)})
+    report = location_shards.shard_report([
+        ("Georgia", "Atlanta, GA", frame("a", "b", "c")),
+        ("Georgia", None, frame("a", "s")),
+        ("Georgia", "Savannah, GA", frame("s")),
+        ("Georgia", "Macon, GA", None),
+    ])
+    assert report == [
+        {'region': "Georgia", 'shard': "unsharded", 'rows': 2, 'added': 0},
+        {'region': "Georgia", 'shard': "Atlanta, GA", 'rows': 3, 'added': 2},
+        {'region': "Georgia", 'shard': "Savannah, GA", 'rows': 1, 'added': 0},
+        {'region': "Georgia", 'shard': "Macon, GA", 'rows': 0, 'added': 0},
+    ]
+
+
+def test_sharded_search_gets_past_the_per_query_cap(monkeypatch):
+    scrape, calls = _capped_board()
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", scrape)
+    plain = global_search.run_search(["indeed"], ["chemist"], location="Georgia", max_results=3)
+    assert len(plain) == 3 and 'shards' not in plain.attrs
+
+    jobs = global_search.run_search(["indeed"], ["chemist"], location="Georgia", max_results=3, shard=True)
+    # The unsharded query is served from the cache; each metro is scraped once
+    assert calls[0] == "Georgia" and sorted(calls[1:]) == sorted(location_shards.shards_for("Georgia"))
+    assert set(jobs['job_url']) == {f"https://x/atl/{i}" for i in range(3)} | {"https://x/sav/0"}
+    added = {s['shard']: s['added'] for s in jobs.attrs['shards']}
+    assert added["Atlanta, GA"] == 1 and added["Savannah, GA"] == 0
+
+
+def test_sharded_watchlist_scan_reports_shards(monkeypatch):
+    scrape, calls = _capped_board()
+    monkeypatch.setattr(company_monitor, "scrape_jobs", scrape)
+    companies = [{"name": "Acme"}]
+    jobs = company_monitor.scrape_aggregator_companies(companies, sites=["glassdoor"], location="Georgia",
+                                                       results_wanted=100, shard=True)
+    shards = location_shards.shards_for("Georgia")
+    assert sorted(calls) == sorted(["Georgia"] + shards)
+    assert len(jobs) == 4
+    assert jobs.attrs['query_plan']['calls'] == 1 + len(shards)
+    added = {s['shard']: s['added'] for s in jobs.attrs['shards']}
+    assert added["Atlanta, GA"] == 1 and added["unsharded"] == 0
@@ -0,0 +1,111 @@
+import json
+import os
+import random
+import threading
+
+import pandas as pd
+import pytest
+
+import company_monitor
+import monitor_daemon
+import scrape_cache
+
+COMPANIES = ["Pfizer", "Merck", "Moderna"]
+
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+@pytest.fixture
+def board(monkeypatch):
+    """Fake board: one posting per searched company or term; records every search term."""
+    calls = []
+
+    def scrape(search_term=None, site_name=None, **kwargs):
+        calls.append(search_term)
+        return pd.DataFrame({'title': [f"Scientist at {search_term}"], 'company': [search_term],
+                             'site': [site_name[0]], 'job_url': [f"https://x/{search_term}"],
+                             'description': [f"Lab work at {search_term}"]})
+
+    monkeypatch.setattr(company_monitor, "scrape_jobs", scrape)
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", scrape)
+    return calls
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    config = tmp_path / "companies.yaml"
+    company_monitor.save_config({
+        'aggregator_companies': [{'name': name, 'keywords': []} for name in COMPANIES],
+        'monitor': {'sites': ["glassdoor"], 'new_only': False},
+        'saved_searches': [{'name': "chemists", 'search_terms': ["chemist"]}],
+    }, str(config))
+    return dict(config_path=str(config), output_dir=str(tmp_path / "out"), state_dir=str(tmp_path / "state"),
+                chunk_size=2, parallel_units=1)
+
+
+def test_run_writes_parquet_per_unit_and_a_manifest(board, dirs):
+    manifest = monitor_daemon.run_once(**dirs)
+    assert manifest['status'] == 'done' and manifest['errors'] == []
+    assert sorted(board) == sorted(COMPANIES + ["chemist"])
+    assert [u['kind'] for u in manifest['units']] == ['watchlist', 'watchlist', 'search']
+    assert manifest['rows'] == 4
+    watchlist = pd.read_parquet(manifest['units'][0]['path'])
+    assert set(watchlist['monitored_company']) == {"Pfizer", "Merck"}
+    assert list(watchlist['description']) == ["Lab work at Pfizer", "Lab work at Merck"]
+    with open(f"{manifest['output_dir']}/manifest.json") as f:
+        assert json.load(f)['run_id'] == manifest['run_id']
+    assert not os.path.exists(os.path.join(dirs["state_dir"], "checkpoint.json"))
+
+
+def test_interrupted_run_resumes_after_the_last_finished_unit(board, dirs, monkeypatch):
+    run_unit = monitor_daemon._run_unit
+
+    def crash_on_search(unit, settings, workers):
+        if unit['kind'] == 'search':
+            raise KeyboardInterrupt
+        return run_unit(unit, settings, workers)
+
+    monkeypatch.setattr(monitor_daemon, "_run_unit", crash_on_search)
+    with pytest.raises(KeyboardInterrupt):
+        monitor_daemon.run_once(**dirs)
+    assert sorted(board) == sorted(COMPANIES)
+
+    monkeypatch.setattr(monitor_daemon, "_run_unit", run_unit)
+    board.clear()
+    manifest = monitor_daemon.run_once(**dirs)
+    assert board == ["chemist"]
+    assert manifest['status'] == 'done' and len(manifest['units']) == 3
+
+
+def test_stop_keeps_the_checkpoint_for_the_next_run(board, dirs):
+    stop = threading.Event()
+    stop.set()
+    manifest = monitor_daemon.run_once(stop=stop, **dirs)
+    assert manifest['status'] == 'stopped' and len(manifest['skipped']) == 3 and board == []
+    assert monitor_daemon.run_once(**dirs)['run_id'] == manifest['run_id']
+
+
+def test_overlapping_runs_are_refused(board, dirs):
+    with monitor_daemon.RunLock(f"{dirs['state_dir']}/monitor.lock"):
+        with pytest.raises(monitor_daemon.RunLocked):
+            monitor_daemon.run_once(**dirs)
+    assert board == []
+
+
+def test_changed_config_starts_a_new_run(board, dirs):
+    stop = threading.Event()
+    stop.set()
+    stopped = monitor_daemon.run_once(stop=stop, **dirs)
+    config = company_monitor.load_config(dirs['config_path'])
+    config['saved_searches'] = []
+    company_monitor.save_config(config, dirs['config_path'])
+    manifest = monitor_daemon.run_once(**dirs)
+    assert manifest['run_id'] != stopped['run_id'] and len(manifest['units']) == 2
+
+
+def test_delay_is_jittered_around_the_interval():
+    rng = random.Random(0)
+    delays = [monitor_daemon.next_delay(600, 0.1, rng=rng) for _ in range(200)]
+    assert 540 <= min(delays) < 560 and 640 < max(delays) <= 660
+    assert monitor_daemon.next_delay(600, 0) == 600
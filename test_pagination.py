@@ -0,0 +1,148 @@
+import logging
+
+import pandas as pd
+import pytest
+
+import pagination
+import rate_limiter
+import scrape_cache
+
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+SITE = "example"  # not in pagination.PAGING, so taken to honour offset exactly
+
+
+def _board(total, cycle=None):
+    """
+    Fake board with `total` postings; records the page sizes asked for. With
+    cycle, results past that many wrap around to the first postings again.
+    """
+    pages = []
+
+    def scrape(offset=0, results_wanted=15, **params):
+        pages.append(results_wanted)
+        positions = range(offset, min(offset + results_wanted, total))
+        urls = [f"https://x/{i % cycle if cycle else i}" for i in positions]
+        return pd.DataFrame({'job_url': urls, 'title': ["Chemist"] * len(urls)})
+
+    return scrape, pages
+
+
+def _zip_board(total, cycle=None):
+    """Fake board that ignores offset, like ZipRecruiter; records (offset, results_wanted) per call."""
+    calls = []
+
+    def scrape(offset=0, results_wanted=15, **params):
+        calls.append((offset, results_wanted))
+        positions = range(min(results_wanted, total))
+        urls = [f"https://x/{i % cycle if cycle else i}" for i in positions]
+        return pd.DataFrame({'job_url': urls, 'title': ["Chemist"] * len(urls)})
+
+    return scrape, calls
+
+
+def _glassdoor_board(total):
+    """
+    Fake board paged like JobSpy's Glassdoor: 30-posting pages from the one
+    offset falls in up to page results_wanted // 30 + 1, at most results_wanted postings.
+    """
+    calls = []
+
+    def scrape(offset=0, results_wanted=15, **params):
+        calls.append((offset, results_wanted))
+        positions = range(offset // 30 * 30, min((results_wanted // 30 + 1) * 30, total))[:results_wanted]
+        urls = [f"https://x/{i}" for i in positions]
+        return pd.DataFrame({'job_url': urls, 'title': ["Chemist"] * len(urls)})
+
+    return scrape, calls
+
+
+def test_small_query_needs_one_small_fetch():
+    scrape, pages = _board(12)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=[SITE])
+    assert len(jobs) == 12 and pages == [25]
+    assert jobs.attrs['coverage'] == {'complete': True, 'stop': 'exhausted', 'fetches': 1,
+                                      'rows': 12, 'requested': 25}
+
+
+def test_pages_grow_geometrically_while_saturated():
+    scrape, pages = _board(300)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=[SITE])
+    assert pages == [25, 50, 100, 200]
+    assert list(jobs['job_url']) == [f"https://x/{i}" for i in range(300)]
+    assert jobs.attrs['coverage']['complete']
+
+
+def test_cap_reports_incomplete_coverage():
+    scrape, pages = _board(300)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=100, site_name=[SITE])
+    assert pages == [25, 50, 25] and len(jobs) == 100
+    assert jobs.attrs['coverage']['stop'] == 'max_results'
+    assert pagination.is_saturated(jobs, 100)
+
+
+def test_board_repeating_itself_stops_early():
+    scrape, pages = _board(1000, cycle=50)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=[SITE])
+    assert pages == [25, 50, 100] and len(jobs) == 50
+    assert jobs.attrs['coverage']['stop'] == 'repeats'
+
+
+def test_page_cut_short_by_a_429_is_not_complete():
+    rate_limiter.watch_jobspy_logs()
+    board, pages = _board(300)
+
+    def scrape(offset=0, **params):
+        frame = board(offset=offset, **params)
+        if offset:
+            # What JobSpy does on a 429: log it and return the postings it has so far
+            logging.getLogger("JobSpy:Indeed").error("429 Response - Blocked by Indeed for too many requests")
+            return frame.head(10)
+        return frame
+
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=[SITE])
+    assert pages == [25, 50] and len(jobs) == 35
+    assert jobs.attrs['coverage']['stop'] == 'throttled'
+    assert pagination.is_saturated(jobs, 1000)
+    # The partial page was not cached
+    assert scrape_cache.get_cache().stats()['entries'] == 1
+
+
+def test_board_ignoring_offset_is_asked_from_the_start():
+    scrape, calls = _zip_board(300)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=["ziprecruiter"])
+    assert calls == [(0, 25), (0, 75), (0, 175), (0, 375)]
+    assert list(jobs['job_url']) == [f"https://x/{i}" for i in range(300)]
+    assert jobs.attrs['coverage']['stop'] == 'exhausted' and jobs.attrs['coverage']['complete']
+
+
+def test_repeats_are_not_complete_on_a_board_ignoring_offset():
+    scrape, calls = _zip_board(1000, cycle=50)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=["ziprecruiter"])
+    assert calls == [(0, 25), (0, 75), (0, 175)] and len(jobs) == 50
+    assert jobs.attrs['coverage']['stop'] == 'repeats'
+    assert pagination.is_saturated(jobs, 1000)
+
+
+def test_paged_board_is_asked_at_page_boundaries():
+    scrape, calls = _glassdoor_board(200)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=1000, site_name=["glassdoor"])
+    # Offsets are whole pages and results_wanted is where the last page ends
+    assert calls == [(0, 30), (30, 90), (120, 240)]
+    assert list(jobs['job_url']) == [f"https://x/{i}" for i in range(200)]
+    assert jobs.attrs['coverage']['stop'] == 'exhausted' and jobs.attrs['coverage']['complete']
+
+
+def test_paged_board_stays_within_the_cap():
+    scrape, calls = _glassdoor_board(1000)
+    jobs = pagination.adaptive_scrape(scrape_fn=scrape, results_wanted=100, site_name=["glassdoor"])
+    assert all(offset % 30 == 0 for offset, _ in calls)
+    assert list(jobs['job_url']) == [f"https://x/{i}" for i in range(100)]
+    assert jobs.attrs['coverage']['stop'] == 'max_results'
+
+
+def test_is_saturated_falls_back_to_row_count():
+    frame = pd.DataFrame({'job_url': ["a", "b"]})
+    assert pagination.is_saturated(frame, 2)
+    assert not pagination.is_saturated(frame, 3)
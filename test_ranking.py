@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import compaction
+import global_search
+import ranking
+import scrape_cache
+
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+def _jobs(titles, descriptions):
+    return pd.DataFrame({
+        'job_url': [f"https://x/{i}" for i in range(len(titles))],
+        'title': titles,
+        'description': descriptions,
+    })
+
+
+def test_query_words_map_to_their_search_terms():
+    words, membership = ranking.query_words(["Research Scientist", "lab scientist", "R"])
+    assert words == ["research", "scientist", "lab"]
+    assert membership.tolist() == [[1, 0, 0], [1, 1, 0], [0, 1, 0]]
+
+
+def test_title_matches_rank_above_description_matches():
+    jobs = _jobs(["Sales Rep", "Research Scientist", "Data Analyst", "Scientist"],
+                 ["Sell to research scientists", "Run assays", "Dashboards", "Research and more research"])
+    ranked = ranking.rank_jobs(jobs, ["research scientist"])
+    assert list(ranked['title']) == ["Research Scientist", "Scientist", "Sales Rep", "Data Analyst"]
+    assert ranked['score'].is_monotonic_decreasing
+    assert ranked['score'].iloc[-1] == 0
+
+
+def test_best_matching_term_wins_and_short_words_must_start_a_word():
+    jobs = _jobs(["Collaborative Sales Lead", "Lab Technician", "Research Scientist", "Research Technician"],
+                 ["", "", "", ""])
+    scores = ranking.score_jobs(jobs, ["lab technician", "research scientist"])
+    assert scores[0] == 0  # "lab" inside "collaborative" does not count
+    # Half-matching both terms scores below fully matching one
+    assert min(scores[1], scores[2]) > scores[3] > 0
+
+
+def test_top_k_keeps_the_best_rows_in_order():
+    jobs = _jobs([f"Job {i}" for i in range(5)] + ["Chemist"], [""] * 5 + ["Analytical chemist"])
+    ranked = ranking.rank_jobs(jobs, ["chemist"], top_k=3)
+    assert list(ranked['title']) == ["Chemist", "Job 0", "Job 1"]
+    assert list(ranking.rank_jobs(jobs, [""])['title']) == list(jobs['title'])
+
+
+def test_compacted_frames_are_ranked_on_stored_descriptions():
+    jobs = _jobs(["Associate", "Associate"], ["Cell culture", "Immunology and cell biology"])
+    compact = compaction.compact_jobs(jobs)
+    assert 'description' not in compact.columns
+    ranked = ranking.rank_jobs(compact, ["cell biology"])
+    assert list(ranked['job_url']) == ["https://x/1", "https://x/0"]
+    assert 'description' not in ranked.columns
+
+
+def test_ranking_fifty_thousand_rows_takes_under_a_second():
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"word{i}" for i in range(2000)] + ["research", "scientist", "lab", "cell"])
+    descriptions = [" ".join(words) for words in rng.choice(vocabulary, size=(50000, 60))]
+    jobs = pd.DataFrame({'title': rng.choice(["Research Scientist", "Lab Technician", "Sales Rep"], 50000),
+                         'description': descriptions})
+    start = time.perf_counter()
+    ranked = ranking.rank_jobs(jobs, ["research scientist", "lab technician", "cell biology"], top_k=100)
+    assert time.perf_counter() - start < 1.0
+    assert len(ranked) == 100 and ranked['score'].is_monotonic_decreasing
+
+
+def test_search_results_are_ranked_and_cut_to_top_k(monkeypatch):
+    def scrape(search_term=None, **kwargs):
+        return pd.DataFrame({'title': ["Sales Rep", "Senior Chemist", "Chemist"],
+                             'company': ["A", "B", "C"], 'site': ["indeed"] * 3,
+                             'job_url': [f"https://x/{search_term}/{i}" for i in range(3)],
+                             'description': ["Sell chemicals", "Chemist role", "Lab work"]})
+
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", scrape)
+    jobs = global_search.run_search(["indeed"], ["chemist"], top_k=2)
+    assert list(jobs['title']) == ["Senior Chemist", "Chemist"]
+    assert 'find_recruiter' in jobs.columns and 'errors' in jobs.attrs
+    unranked = global_search.run_search(["indeed"], ["chemist"], rank=False)
+    assert 'score' not in unranked.columns and len(unranked) == 3
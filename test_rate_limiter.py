@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import fake_ats
+import link_checker
+import rate_limiter
+import scrape_cache
+
+
+def _limiter(**overrides):
+    settings = dict(rate=10.0, min_rate=1.0, max_rate=50.0, increase=5.0, backoff=0.2)
+    settings.update(overrides)
+    return rate_limiter.AdaptiveRateLimiter("test", **settings)
+
+
+def test_slow_start_then_additive_increase_and_halving():
+    limiter = _limiter()
+    for _ in range(5):
+        limiter.success()
+    assert limiter.rate == 15.0
+    limiter.throttled()
+    assert limiter.rate == 7.5 and not limiter.slow_start
+    limiter.throttled()  # same congestion event: no second halving
+    assert limiter.rate == 7.5
+    limiter.success()
+    assert limiter.rate == pytest.approx(7.5 + 5.0 / 7.5)
+    for _ in range(100):
+        limiter.success()
+    assert limiter.rate <= 50.0
+
+
+def test_acquire_paces_to_the_rate_and_respects_pauses():
+    limiter = _limiter(rate=20.0)
+    start = time.monotonic()
+    for _ in range(30):
+        limiter.acquire()
+    assert 0.4 < time.monotonic() - start < 1.0
+    limiter.throttled()
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def _successes_in_window(base, window, use_limiter):
+    ok = 0
+    batch = 0
+    deadline = time.monotonic() + window
+    while time.monotonic() < deadline:
+        urls = [f"{base}/limited/{use_limiter}-{batch}-{i}" for i in range(40)]
+        batch += 1
+        results = link_checker.verify_urls(urls, use_cache=False, use_limiter=use_limiter)
+        ok += sum(r['status'] == '200 OK' for r in results.values())
+    return ok
+
+
+def test_adaptive_limiter_sustains_more_successes_than_fixed_concurrency(monkeypatch):
+    # Same throttling stand-in for both: 30 requests/s, rejected requests count too
+    monkeypatch.setattr(rate_limiter._registry, "instance", rate_limiter.RateLimiterRegistry())
+    fixed_server, fixed_base = fake_ats.start_server(rate_limit=30)
+    adaptive_server, adaptive_base = fake_ats.start_server(rate_limit=30)
+    try:
+        fixed = _successes_in_window(fixed_base, 3.0, use_limiter=False)
+        adaptive = _successes_in_window(adaptive_base, 3.0, use_limiter=True)
+    finally:
+        fixed_server.shutdown()
+        adaptive_server.shutdown()
+    assert adaptive > 1.5 * fixed
+    stats = rate_limiter.get_registry().stats()
+    assert stats[0]['throttles'] > 0 and stats[0]['rate'] < 60
+
+
+def test_jobspy_block_log_slows_the_board_and_retries(tmp_path, monkeypatch):
+    cache = scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite"))
+    monkeypatch.setattr(scrape_cache._cache, "instance", cache)
+    settings = dict(rate_limiter.DEFAULT_SETTINGS, scrape=dict(rate=5.0, min_rate=0.5, max_rate=10.0,
+                                                               increase=1.0, backoff=0.1))
+    monkeypatch.setattr(rate_limiter._registry, "instance", rate_limiter.RateLimiterRegistry(settings))
+    rate_limiter.watch_jobspy_logs()
+    calls = []
+
+    def blocked_once(site_name=None, **params):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            # What JobSpy does on a 429: log it and return nothing
+            logging.getLogger("JobSpy:LinkedIn").error("429 Response - Blocked by LinkedIn for too many requests")
+            return pd.DataFrame()
+        return pd.DataFrame({'job_url': ["https://x/1"]})
+
+    frame = scrape_cache.cached_scrape_jobs(scrape_fn=blocked_once, site_name=["linkedin"], search_term="chemist")
+    assert list(frame['job_url']) == ["https://x/1"]
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.1
+    stats = rate_limiter.get_registry().stats()[0]
+    assert (stats['name'], stats['throttles'], stats['successes']) == ("scrape:linkedin", 1, 1)
+    assert stats['rate'] == pytest.approx(2.5 + 1.0 / 2.5)
+
+
+def test_throttles_count_against_the_call_that_logged_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_cache._cache, "instance", scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite")))
+    settings = dict(rate_limiter.DEFAULT_SETTINGS, scrape=dict(rate=5.0, min_rate=0.5, max_rate=10.0,
+                                                               increase=1.0, backoff=0.1))
+    monkeypatch.setattr(rate_limiter._registry, "instance", rate_limiter.RateLimiterRegistry(settings))
+    rate_limiter.watch_jobspy_logs()
+    blocked_started = threading.Event()
+    calls = []
+
+    def scrape_site(scraper_input):
+        logging.getLogger("JobSpy:LinkedIn").error("429 Response - Blocked by LinkedIn for too many requests")
+
+    def board(search_term=None, location=None, **params):
+        calls.append(search_term)
+        if search_term == "blocked":
+            blocked_started.set()
+            time.sleep(0.1)
+            # Logged on a worker thread, as JobSpy's scrapers do
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(scrape_site, types.SimpleNamespace(
+                    search_term=search_term, location=location, offset=0, hours_old=None)).result()
+            return pd.DataFrame({'job_url': ["https://x/partial"]})
+        blocked_started.wait()
+        time.sleep(0.2)
+        # A legitimately empty result while the other query was throttled
+        return pd.DataFrame()
+
+    results = {}
+    threads = [threading.Thread(target=lambda t=t: results.__setitem__(t, scrape_cache.cached_scrape_jobs(
+        scrape_fn=board, site_name=["linkedin"], search_term=t))) for t in ["blocked", "empty"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # The empty query was not re-issued for someone else's 429, and counts as a success
+    assert calls.count("empty") == 1 and results["empty"].empty
+    stats = rate_limiter.get_registry().stats()[0]
+    assert (stats['throttles'], stats['successes']) == (1, 1)
+
+
+def test_rate_limiting_is_chosen_per_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_cache._cache, "instance", scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite")))
+    registry = rate_limiter.RateLimiterRegistry()
+    monkeypatch.setattr(rate_limiter._registry, "instance", registry)
+
+    def board(search_term=None, **params):
+        return pd.DataFrame({'job_url': [f"https://x/{search_term}"]})
+
+    scrape_cache.cached_scrape_jobs(scrape_fn=board, use_limiter=False, site_name=["indeed"], search_term="a")
+    assert registry.enabled and registry.stats() == []
+
+    def blocked(search_term=None, **params):
+        logging.getLogger("JobSpy:Indeed").error("429 Response - Blocked by Indeed for too many requests")
+        return pd.DataFrame({'job_url': [f"https://x/{search_term}"]})
+
+    rate_limiter.watch_jobspy_logs()
+    frame = scrape_cache.cached_scrape_jobs(scrape_fn=blocked, use_limiter=False, site_name=["indeed"], search_term="c")
+    # Counted against the call, but an unlimited call never touches the limiter
+    assert frame.attrs['throttled'] and registry.stats() == []
+    scrape_cache.cached_scrape_jobs(scrape_fn=board, site_name=["indeed"], search_term="b")
+    assert [s['successes'] for s in registry.stats()] == [1]
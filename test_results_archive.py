@@ -0,0 +1,87 @@
+import datetime
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import compaction
+import global_search
+import results_archive
+import scrape_cache
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(compaction._store, "instance", compaction.DescriptionStore(path=str(tmp_path / "descriptions.sqlite")))
+    return results_archive.ResultsArchive(path=str(tmp_path / "archive"))
+
+
+def _jobs(site, companies, day=0):
+    return pd.DataFrame({
+        'site': site,
+        'job_url': [f"https://{site}/{day}/{i}" for i in range(len(companies))],
+        'title': [f"Scientist {i}" for i in range(len(companies))],
+        'company': companies,
+        'date_posted': [datetime.date(2026, 1, 1)] * len(companies),
+        'min_amount': [100000, None, "n/a"][:len(companies)],
+        'not_archived': 1,
+    })
+
+
+def test_appends_are_partitioned_by_date_and_site(archive):
+    today = datetime.datetime.now()
+    archive.append(_jobs("indeed", ["Pfizer", "Merck"]), query={'kind': 'search', 'terms': ["chemist"]}, now=today)
+    archive.append(_jobs("linkedin", ["Pfizer"]), query={'kind': 'watchlist'}, now=today)
+    partitions = sorted(os.path.relpath(root, archive.path) for root, _, files in os.walk(archive.path) if files)
+    assert partitions == [f"scrape_date={today.date().isoformat()}/site=indeed",
+                          f"scrape_date={today.date().isoformat()}/site=linkedin"]
+
+    jobs = archive.query()
+    assert len(jobs) == 3 and 'not_archived' not in jobs.columns
+    assert sorted(jobs['min_amount'].dropna()) == [100000.0, 100000.0]
+    kinds = jobs.groupby('site')['query'].first().map(lambda q: json.loads(q)['kind'])
+    assert kinds.to_dict() == {'indeed': 'search', 'linkedin': 'watchlist'}
+
+
+def test_query_prunes_dates_and_pushes_down_filters(archive):
+    now = datetime.datetime.now()
+    archive.append(_jobs("indeed", ["Pfizer Inc", "Merck"], day=1), now=now)
+    archive.append(_jobs("indeed", ["pfizer"], day=2), now=now - datetime.timedelta(days=45))
+    archive.append(_jobs("glassdoor", ["Pfizer"], day=3), now=now)
+
+    recent = archive.query(columns=['title', 'date_posted'], company="PFIZER", days=30)
+    assert list(recent.columns) == ['title', 'date_posted']
+    assert len(recent) == 2
+    assert len(archive.query(company="pfizer")) == 3
+    assert len(archive.query(company="pfizer", sites=["Indeed"])) == 2
+    assert len(archive.query(until=now - datetime.timedelta(days=40))) == 1
+
+
+def test_compaction_keeps_every_row(archive, monkeypatch):
+    monkeypatch.setattr(results_archive, "MAX_FILES_PER_PARTITION", 3)
+    for day in range(5):
+        archive.append(_jobs("indeed", ["Pfizer", "Merck"], day=day))
+    assert archive.stats()['files'] <= 3
+    archive.compact()
+    stats = archive.stats()
+    assert (stats['files'], stats['rows']) == (1, 10)
+    assert len(archive.query(limit=4)) == 4
+    assert sorted(archive.query()['job_url']) == sorted(f"https://indeed/{d}/{i}" for d in range(5) for i in range(2))
+
+
+def test_archive_failures_do_not_break_searches(monkeypatch):
+    class Broken:
+        def append(self, jobs, query=None):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(results_archive._archive, "instance", Broken())
+    assert results_archive.archive_results(_jobs("indeed", ["Pfizer"]), kind='search') is None
+
+
+def test_archiving_is_chosen_per_search(isolated, monkeypatch):
+    monkeypatch.setattr(scrape_cache, "scrape_jobs", lambda site_name=None, **params: _jobs(site_name[0], ["Pfizer"]))
+    global_search.run_search(["indeed"], ["chemist"], archive=False)
+    assert results_archive.get_archive().stats()['rows'] == 0
+    global_search.run_search(["indeed"], ["chemist"], use_cache=False)
+    assert results_archive.get_archive().stats()['rows'] == 1
@@ -0,0 +1,103 @@
+import time
+
+import pandas as pd
+
+import scrape_cache
+
+
+def _frame(n=3):
+    return pd.DataFrame({'title': [f"job {i}" for i in range(n)],
+                         'job_url': [f"https://x/{i}" for i in range(n)]})
+
+
+def test_key_is_normalized():
+    a = {'site_name': ['LinkedIn', 'indeed'], 'search_term': ' Research  Scientist',
+         'location': 'georgia', 'hours_old': 168.0, 'results_wanted': 20}
+    b = {'site_name': ['indeed', 'linkedin'], 'search_term': 'research scientist',
+         'location': 'Georgia ', 'hours_old': 168, 'results_wanted': '20'}
+    assert scrape_cache.cache_key(a) == scrape_cache.cache_key(b)
+    assert scrape_cache.cache_key(a) != scrape_cache.cache_key(dict(b, job_type='contract'))
+
+
+def test_hit_miss_and_ttl(tmp_path):
+    cache = scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite"), ttl=0.2)
+    params = {'site_name': ['indeed'], 'search_term': 'chemist'}
+    assert cache.get(params) is None
+    cache.put(params, _frame())
+    pd.testing.assert_frame_equal(cache.get(params), _frame())
+    time.sleep(0.3)
+    assert cache.get(params) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lru_eviction_by_size(tmp_path):
+    probe = scrape_cache.ScrapeCache(path=str(tmp_path / "probe.sqlite"))
+    probe.put({'search_term': 'x'}, _frame(50))
+    entry_size = probe.stats()['bytes']
+
+    cache = scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite"), max_bytes=int(entry_size * 2.5))
+    for term in ["a", "b"]:
+        cache.put({'search_term': term}, _frame(50))
+        time.sleep(0.01)
+    cache.get({'search_term': 'a'})  # "b" is now least recently used
+    cache.put({'search_term': 'c'}, _frame(50))
+    assert cache.get({'search_term': 'b'}) is None
+    assert cache.get({'search_term': 'a'}) is not None
+    assert cache.get({'search_term': 'c'}) is not None
+
+
+def test_cached_scrape_jobs_skips_network_on_hit(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_cache._cache, "instance", scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite")))
+    calls = []
+
+    def fake(**params):
+        calls.append(params)
+        return _frame()
+
+    for _ in range(3):
+        scrape_cache.cached_scrape_jobs(scrape_fn=fake, site_name=['indeed'], search_term='chemist')
+    assert len(calls) == 1
+    assert scrape_cache.get_cache().hits == 2
+
+    scrape_cache.cached_scrape_jobs(scrape_fn=lambda **p: pd.DataFrame(), search_term='blocked')
+    assert scrape_cache.get_cache().get({'search_term': 'blocked'}) is None
+
+
+def test_stand_in_scrapers_do_not_share_cache_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_cache._cache, "instance", scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite")))
+    params = {'site_name': ['indeed'], 'search_term': 'chemist'}
+
+    def stub(**params):
+        return _frame(1)
+
+    def other_stub(**params):
+        return _frame(2)
+
+    assert len(scrape_cache.cached_scrape_jobs(scrape_fn=stub, **params)) == 1
+    assert len(scrape_cache.cached_scrape_jobs(scrape_fn=other_stub, **params)) == 2
+    # Nothing a stand-in cached is served to the real scraper
+    assert scrape_cache.get_cache().get(params) is None
+    assert scrape_cache.scraper_id(scrape_cache.scrape_jobs) is None
+    assert scrape_cache.cache_key(params, scrape_cache.scraper_id(stub)) != scrape_cache.cache_key(params)
+
+
+def test_cache_settings_are_per_call(tmp_path, monkeypatch):
+    cache = scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite"))
+    monkeypatch.setattr(scrape_cache._cache, "instance", cache)
+    params = {'site_name': ['indeed'], 'search_term': 'chemist'}
+    calls = []
+
+    def fake(**params):
+        calls.append(params)
+        return _frame()
+
+    scrape_cache.cached_scrape_jobs(scrape_fn=fake, **params)
+    # One caller skipping the cache does not turn it off for the others
+    scrape_cache.cached_scrape_jobs(scrape_fn=fake, use_cache=False, **params)
+    scrape_cache.cached_scrape_jobs(scrape_fn=fake, **params)
+    assert len(calls) == 2
+    time.sleep(0.2)
+    # Nor does one asking for fresher results expire them for everyone
+    scrape_cache.cached_scrape_jobs(scrape_fn=fake, cache_ttl=0.1, **params)
+    assert len(calls) == 3
+    assert cache.enabled and cache.ttl == scrape_cache.MAX_TTL
@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+import pytest
+
+import search_index
+
+
+@pytest.fixture
+def index(tmp_path):
+    return search_index.JobIndex(path=str(tmp_path / "index.sqlite"))
+
+
+def _jobs(titles, descriptions, start=0):
+    return pd.DataFrame({
+        'job_url': [f"https://x/{i}" for i in range(start, start + len(titles))],
+        'title': titles,
+        'company': pd.Categorical(["Pfizer"] * len(titles)),
+        'description': descriptions,
+    })
+
+
+def test_postings_are_indexed_once_and_reindexed_when_changed(index):
+    jobs = _jobs(["Research Scientist", "Sales Rep"], ["Cell culture and assays", "Sell to clinics"])
+    assert index.add(jobs) == 2
+    assert index.add(jobs) == 0
+    assert index.add(jobs.assign(title=["Senior Research Scientist", "Sales Rep"])) == 1
+    assert index.stats()['postings'] == 2
+    assert list(index.search("senior")['title']) == ["Senior Research Scientist"]
+    assert index.search("research scientist")['title'].str.startswith("Senior").all()
+
+
+def test_search_ranks_title_matches_first_and_snippets_descriptions(index):
+    index.add(_jobs(["Lab Technician", "Research Scientist", "Data Analyst"],
+                    ["Supports our scientists", "Leads assay development", "Scientist-facing dashboards"]))
+    results = index.search("scientist")
+    assert list(results['title']) == ["Research Scientist", "Lab Technician", "Data Analyst"]
+    assert results['score'].is_monotonic_decreasing
+    assert "**scientists**" in results.loc[1, 'snippet']
+    assert list(index.search('"assay development"')['title']) == ["Research Scientist"]
+    assert list(index.search("dash*")['title']) == ["Data Analyst"]
+
+
+def test_free_text_never_breaks_the_query(index):
+    index.add(_jobs(["C++ Developer"], ["Embedded C++ and Python"]))
+    assert search_index.match_query('C++ "unterminated AND (') == '"C" "unterminated" "AND"'
+    assert search_index.match_query("  ") is None
+    assert index.search("  ").empty
+    assert list(index.search("c++ python")['title']) == ["C++ Developer"]
+
+
+def test_match_titles_finds_substrings(index):
+    index.add(_jobs(["Sr. Scientists II", "R&D Lead", "Nurse"], ["", "", ""]))
+    pairs = index.match_titles([f"https://x/{i}" for i in range(3)], ["scientist", "r&d", "ii", "lead"])
+    assert sorted(map(tuple, pairs.to_numpy())) == [("https://x/0", "scientist"), ("https://x/1", "lead"),
+                                                     ("https://x/1", "r&d")]
+
+
+def test_search_over_history_takes_milliseconds(index):
+    words = [f"word{i}" for i in range(2000)]
+    titles = [f"Scientist {i}" for i in range(20000)]
+    descriptions = [" ".join(words[(i * 7 + k) % 2000] for k in range(60)) for i in range(20000)]
+    index.add(_jobs(titles, descriptions))
+    start = time.perf_counter()
+    results = index.search("word42 word43", limit=50)
+    assert time.perf_counter() - start < 0.25
+    assert len(results) == 50
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from seen_store import SeenStore
+
+
+def _jobs(urls, titles=None):
+    return pd.DataFrame({
+        'job_url': urls,
+        'title': titles or [f"Job {u}" for u in urls],
+        'company': "Pfizer",
+        'location': "Atlanta, GA",
+    })
+
+
+def test_delta_reports_new_changed_and_disappeared(tmp_path):
+    store = SeenStore(path=str(tmp_path / "seen.sqlite"))
+    delta, gone = store.delta(_jobs(["a", "b", "c"]), scope="search:1")
+    assert list(delta['change']) == ["new"] * 3
+    assert gone.empty
+
+    delta, gone = store.delta(_jobs(["a", "b", "d"], ["Job a", "Job B (updated)", "Job d"]), scope="search:1")
+    assert dict(zip(delta['job_url'], delta['change'])) == {"b": "changed", "d": "new"}
+    assert list(gone['job_url']) == ["c"]
+
+    # Unchanged rerun: nothing new, and "c" is not reported twice
+    delta, gone = store.delta(_jobs(["a", "b", "d"], ["Job a", "Job B (updated)", "Job d"]), scope="search:1")
+    assert delta.empty and gone.empty
+
+
+def test_normalization_ignores_case_and_whitespace(tmp_path):
+    store = SeenStore(path=str(tmp_path / "seen.sqlite"))
+    store.delta(_jobs(["a"], ["Research  Scientist"]), scope="s")
+    delta, _ = store.delta(_jobs(["a"], ["research scientist "]), scope="s")
+    assert delta.empty
+
+
+def test_scopes_track_disappearance_separately(tmp_path):
+    store = SeenStore(path=str(tmp_path / "seen.sqlite"))
+    jobs = _jobs(["a", "b"])
+    store.delta(jobs, scope=pd.Series(["watchlist:Pfizer", "watchlist:Merck"]))
+    delta, gone = store.delta(jobs.iloc[:1], scope=pd.Series(["watchlist:Pfizer"]),
+                              scanned_scopes=["watchlist:Pfizer"])
+    assert delta.empty and gone.empty  # Merck was not scanned, so "b" is not gone
+    _, gone = store.delta(jobs.iloc[:0], scope=pd.Series(dtype=object), scanned_scopes=["watchlist:Merck"])
+    assert list(gone['job_url']) == ["b"]
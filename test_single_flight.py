@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pandas as pd
+
+import scrape_cache
+import single_flight
+
+
+def _run_concurrently(fn, n):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def _target(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=_target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_calls_share_one_execution():
+    flights = single_flight.SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    results = _run_concurrently(lambda: flights.do("key", slow), 5)
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flights.stats() == {'calls': 5, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_errors_are_shared_and_later_calls_run_again():
+    flights = single_flight.SingleFlight("test")
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("blocked")
+
+    results = _run_concurrently(lambda: flights.do("key", boom), 3)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flights.do("key", lambda: 1) == (1, False)
+
+
+def test_concurrent_identical_searches_scrape_once(tmp_path, monkeypatch):
+    cache = scrape_cache.ScrapeCache(path=str(tmp_path / "c.sqlite"))
+    cache.enabled = False
+    monkeypatch.setattr(scrape_cache._cache, "instance", cache)
+    calls = []
+
+    def fake_scrape(**params):
+        calls.append(params)
+        time.sleep(0.2)
+        return pd.DataFrame({'job_url': ["https://x/1"]})
+
+    frames = _run_concurrently(lambda: scrape_cache.cached_scrape_jobs(
+        scrape_fn=fake_scrape, site_name=["indeed"], search_term="Chemist"), 4)
+    assert len(calls) == 1
+    assert all(list(f['job_url']) == ["https://x/1"] for f in frames)
+    # Callers get their own frames, so one session cannot mutate another's results
+    assert len({id(f) for f in frames}) == 4
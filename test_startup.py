@@ -0,0 +1,98 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+import cassette
+import results_archive
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+# Measured on a dev laptop: about 1.1s cold (1.7s before JobSpy and aiohttp were
+# imported lazily) and under 0.1s per rerun; the budgets leave room for slower CI
+COLD_START_BUDGET = 4.0
+RERUN_BUDGET = 0.5
+LAZY_MODULES = ['jobspy', 'aiohttp', 'requests']
+
+COLD_START = f"""
+import sys, time
+sys.path.insert(0, {REPO!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({os.path.join(REPO, 'app.py')!r}, default_timeout=60).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start, ",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+"""
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch, isolated):
+    shutil.copy(os.path.join(REPO, "companies.yaml"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_cold_start_defers_scraper_imports(app_dir):
+    result = subprocess.run([sys.executable, "-c", COLD_START], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    elapsed, _, loaded = result.stdout.strip().splitlines()[-1].partition(" ")
+    assert float(elapsed) < COLD_START_BUDGET
+    assert loaded == ""
+
+
+def _slow(method):
+    """method, taking the whole rerun budget on every call, as it can on a large archive."""
+    def slow(*args, **kwargs):
+        time.sleep(RERUN_BUDGET)
+        return method(*args, **kwargs)
+    return slow
+
+
+def test_rerun_fits_the_budget(app_dir, monkeypatch):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    st.cache_data.clear()
+    # An empty archive answers instantly; make reading it as slow as a large one
+    # so any archive read on every rerun blows the budget
+    monkeypatch.setattr(results_archive.ResultsArchive, "query", _slow(results_archive.ResultsArchive.query))
+    monkeypatch.setattr(results_archive.ResultsArchive, "stats", _slow(results_archive.ResultsArchive.stats))
+    at = AppTest.from_file(os.path.join(REPO, "app.py"), default_timeout=60).run()
+    assert not at.exception
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    assert not at.exception
+    assert max(timings) < RERUN_BUDGET, timings
+
+
+def test_history_is_only_queried_on_request(app_dir, monkeypatch):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    st.cache_data.clear()
+    queries = []
+    query = results_archive.ResultsArchive.query
+    monkeypatch.setattr(results_archive.ResultsArchive, "query",
+                        lambda self, **kwargs: queries.append(kwargs) or query(self, **kwargs))
+    at = AppTest.from_file(os.path.join(REPO, "app.py"), default_timeout=60).run()
+    at.run()
+    assert not at.exception and queries == []
+    at.text_input(key="history_company").input("pfizer")
+    next(b for b in at.button if b.label == "Show History").click().run()
+    assert not at.exception and [q['company'] for q in queries] == ["pfizer"]
+    at.run()
+    assert len(queries) == 1
+
+
+def test_sessions_cannot_switch_the_cassette(app_dir, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+    tape = cassette.Cassette(path=str(app_dir / "tape"), mode='replay')
+    monkeypatch.setattr(cassette._cassette, "instance", tape)
+    at = AppTest.from_file(os.path.join(REPO, "app.py"), default_timeout=60).run()
+    at.run()
+    assert not at.exception
+    assert cassette.get_cassette() is tape and tape.mode == 'replay'
+    assert any("Replay" in c.value for c in at.caption)
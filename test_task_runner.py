@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+import task_runner
+
+
+def _wait(task, timeout=5):
+    deadline = time.monotonic() + timeout
+    while task.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not task.active
+
+
+@pytest.fixture
+def runner():
+    runner = task_runner.TaskRunner(max_workers=2)
+    yield runner
+    runner.shutdown()
+
+
+def test_result_and_progress_are_kept(runner):
+    def work(n):
+        for i in range(1, n + 1):
+            task_runner.report_progress(i, n, f"step {i}", partial=list(range(i)))
+        return n * 2
+
+    task = runner.submit(work, 3, label="double")
+    _wait(task)
+    assert (task.status, task.result, task.label) == ('done', 6, "double")
+    assert (task.done, task.total, task.message) == (3, 3, "step 3")
+    assert task.partial is None
+    assert runner.get(task.id) is task
+
+
+def test_failure_is_captured(runner):
+    def boom():
+        raise ValueError("blocked")
+
+    task = runner.submit(boom)
+    _wait(task)
+    assert task.status == 'failed'
+    assert isinstance(task.error, ValueError)
+
+
+def test_cancel_stops_at_next_progress_report(runner):
+    started = threading.Event()
+    steps = []
+
+    def work():
+        started.set()
+        for i in range(200):
+            steps.append(i)
+            task_runner.report_progress(i, 200)
+            time.sleep(0.01)
+
+    task = runner.submit(work)
+    started.wait(2)
+    runner.cancel(task.id)
+    _wait(task)
+    assert task.status == 'cancelled'
+    assert len(steps) < 200
+
+
+def test_report_progress_outside_a_task_is_a_no_op():
+    task_runner.report_progress(1, 2, "ignored")
+    assert task_runner.current_task() is None
+
+
+def test_finished_tasks_are_pruned():
+    runner = task_runner.TaskRunner(max_workers=1, max_retained=2)
+    try:
+        tasks = [runner.submit(lambda i=i: i) for i in range(4)]
+        for task in tasks:
+            _wait(task)
+        assert [t.result for t in runner.tasks()] == [3, 2]
+        assert runner.get(tasks[0].id) is None
+    finally:
+        runner.shutdown()
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+import search_index
+from watchlist_matcher import WatchlistMatcher, _Vocabulary
+
+
+def _reference(jobs, companies):
+    """The per-company lambda filters WatchlistMatcher replaced."""
+    out = []
+    for company in companies:
+        name = company['name']
+        keywords = company.get('keywords', [])
+        rows = jobs[jobs['monitored_company'] == name]
+        name_lower = name.lower()
+        matches = rows[rows['company'].apply(lambda c: not pd.isna(c) and name_lower in c.lower())]
+        if keywords:
+            kw_lower = [k.lower() for k in keywords]
+            matches = matches[matches['title'].apply(
+                lambda t: not pd.isna(t) and any(k in t.lower() for k in kw_lower))]
+        out.append(matches)
+    return pd.concat(out).sort_index()
+
+
+def test_vocabulary_finds_overlapping_words():
+    vocab = _Vocabulary(["research", "research scientist", "scientist", "sci"])
+    pairs = vocab.pairs(pd.Series(["Sr. Research Scientist", "Lab Tech", None]))
+    assert sorted(pairs['word']) == ["research", "research scientist", "sci", "scientist"]
+    assert set(pairs['row']) == {0}
+
+
+def test_filter_tags_keyword_and_drops_non_matches():
+    companies = [{'name': "Boehringer Ingelheim", 'keywords': ["Scientist", "Research"]},
+                 {'name': "Pfizer", 'keywords': []}]
+    jobs = pd.DataFrame({
+        'monitored_company': ["Boehringer Ingelheim"] * 3 + ["Pfizer"] * 2,
+        'company': ["Boehringer Ingelheim", "Acme Pharma", "BOEHRINGER INGELHEIM USA", "Pfizer Inc.", None],
+        'title': ["Senior Scientist", "Scientist", "Sales Rep", "Anything", "Anything"],
+    })
+    out = WatchlistMatcher(companies).filter(jobs)
+    assert list(out['company']) == ["Boehringer Ingelheim", "Pfizer Inc."]
+    assert list(out['matched_keyword']) == ["Scientist", None]
+
+
+def test_matches_per_company_lambdas_on_random_data():
+    rng = random.Random(1)
+    names = ["Johnson & Johnson", "Johnson", "Merck", "Merck KGaA", "Emory", "Emory University Hospital"]
+    keywords = ["scientist", "research", "research scientist", "sales", "lab", "r&d"]
+    companies = [{'name': n, 'keywords': rng.sample(keywords, rng.randint(0, 3))} for n in names]
+    n = 3000
+    jobs = pd.DataFrame({
+        'monitored_company': [rng.choice(names) for _ in range(n)],
+        'company': [rng.choice(names + ["Acme"]) + rng.choice(["", " Inc", " LLC"])
+                    if rng.random() > 0.1 else rng.choice([None, np.nan]) for _ in range(n)],
+        'title': [rng.choice(["Sr ", "", "Lead "]) + rng.choice(keywords + ["Engineer", "Nurse"]).title()
+                  for _ in range(n)],
+    })
+    expected = _reference(jobs, companies).reset_index(drop=True)
+    actual = WatchlistMatcher(companies).filter(jobs).drop(columns=['matched_keyword'])
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_index_lookup_matches_per_company_lambdas(tmp_path):
+    rng = random.Random(2)
+    names = ["Merck", "Merck KGaA", "Emory"]
+    keywords = ["scientist", "research scientist", "r&d", "rn", "lab"]
+    companies = [{'name': n, 'keywords': rng.sample(keywords, rng.randint(0, 3))} for n in names]
+    n = 500
+    jobs = pd.DataFrame({
+        'monitored_company': [rng.choice(names) for _ in range(n)],
+        'company': [rng.choice(names) + rng.choice(["", " Inc"]) for _ in range(n)],
+        'title': [rng.choice(["Sr ", "", "RN "]) + rng.choice(keywords + ["Engineer"]).upper() for _ in range(n)],
+        # Postings without a job_url are never indexed and fall back to the regex
+        'job_url': [f"https://x/{i}" if i % 10 else None for i in range(n)],
+    })
+    index = search_index.JobIndex(path=str(tmp_path / "index.sqlite"))
+    index.add(jobs)
+    expected = _reference(jobs, companies).reset_index(drop=True)
+    actual = WatchlistMatcher(companies).filter(jobs, index=index).drop(columns=['matched_keyword'])
+    pd.testing.assert_frame_equal(actual, expected)
@@ -1,20 +1,20 @@
-from jobspy import scrape_jobs
 import pandas as pd
+import pagination
 
 # 1. Define a specific, verifiable target
 SITE = "indeed"
 COMPANY = "Emory University"
 SEARCH_TERM = "Research Scientist"
 LOCATION = "Atlanta, GA"
-# Set this higher than the expected number of jobs to test "saturation"
-LIMIT = 100 
+# Upper bound only: the adaptive fetch starts small and asks for more while pages come back full
+LIMIT = 1000
 
 print(f"--- STARTING COVERAGE TEST ---")
 print(f"Target: {SEARCH_TERM} at {COMPANY} in {LOCATION}")
-print(f"Limit set to: {LIMIT} (We want to see fewer than this to confirm we got everything)")
+print(f"Cap set to: {LIMIT} (pages grow only while the board keeps returning full pages)")
 print(f"------------------------------")
 
-jobs = scrape_jobs(
+jobs = pagination.adaptive_scrape(
     site_name=[SITE],
     search_term=f'"{SEARCH_TERM}"', # Use quotes for exact phrase match
     location=LOCATION,
@@ -23,22 +23,25 @@ jobs = scrape_jobs(
     hours_old=168, # Last 7 days
 )
 
+coverage = jobs.attrs['coverage']
+
 # Filter explicitly for the company to ensure clean comparison
 # (Sometimes fuzzy matching returns other companies)
 if not jobs.empty:
     jobs = jobs[jobs['company'].str.contains(COMPANY, case=False, na=False)]
 
 print(f"\n--- RESULTS ---")
-print(f"Jobs Found: {len(jobs)}")
+print(f"Jobs Found: {len(jobs)} ({coverage['rows']} before the company filter, "
+      f"{coverage['fetches']} page fetches, {coverage['requested']} results requested)")
 
-if len(jobs) == LIMIT:
-    print(f"⚠️  WARNING: We hit the limit of {LIMIT}. There are likely more jobs available.")
-    print(f"   Action: Increase 'results_wanted' in your main script.")
+if not coverage['complete']:
+    print(f"⚠️  WARNING: Coverage incomplete ({coverage['stop']}). There are likely more jobs available.")
+    print(f"   Action: Raise LIMIT (or retry if a page failed), or narrow the query.")
 elif len(jobs) == 0:
     print(f"⚠️  WARNING: Found 0 jobs. Either none exist, or the scraper is being blocked.")
 else:
-    print(f"✅ SUCCESS: Found {len(jobs)} jobs (below the limit of {LIMIT}).")
-    print(f"   This indicates we likely scraped ALL available jobs for this specific query.")
+    print(f"✅ SUCCESS: Coverage complete ({coverage['stop']}).")
+    print(f"   The board ran out of results before the cap, so we scraped ALL available jobs for this query.")
 
 print(f"\n--- TITLES FOUND ---")
 print(jobs[['title', 'date_posted']].to_string(index=False))
@@ -0,0 +1,153 @@
+"""
+Compiled company / keyword matching for the whole watchlist.
+
+All watchlist company names and all title keywords are each compiled into one
+trie-shaped regex, which is run once over the concatenated scan results with
+pandas' vectorized string methods. Matching keeps the semantics of the old
+per-company filters: a row found by searching for company X is kept when X's
+name is a substring of the row's `company` (case-insensitive) and, if X has
+keywords, one of them is a substring of the row's `title`. Title keywords can
+also be looked up in the full-text index of scraped postings (search_index).
+"""
+import re
+
+import pandas as pd
+
+from search_index import MIN_TRIGRAM_CHARS
+
+
+def _trie_pattern(words):
+    """
+    Regex matching any of `words`, shaped like a trie so that matching cost does
+    not grow with the number of words, and greedy so the longest word wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def _node_pattern(node):
+        branches = [re.escape(ch) + _node_pattern(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return _node_pattern(trie)
+
+
+class _Vocabulary:
+    """
+    Finds every vocabulary word that occurs in each string of a Series.
+
+    A zero-width lookahead finds the longest word starting at every position;
+    any shorter word occurring in the text is a substring of one of those, so
+    expanding each hit to the words it contains yields all matches.
+    """
+
+    def __init__(self, words):
+        self.words = sorted({w for w in words if w})
+        self.regex = None
+        if self.words:
+            self.regex = re.compile(f"(?=({_trie_pattern(self.words)}))")
+        self.contained = {w: [v for v in self.words if v in w] for w in self.words}
+
+    def pairs(self, text):
+        """Return a DataFrame of (row, word) for every word found in text.str.lower()."""
+        if self.regex is None or text.empty:
+            return pd.DataFrame({'row': pd.Series(dtype='int64'), 'word': pd.Series(dtype=object)})
+        # Non-string cells (NaN, None) become NaN and match nothing
+        hits = text.astype(object).str.lower().str.findall(self.regex).explode().dropna()
+        words = hits.map(self.contained).explode()
+        return pd.DataFrame({'row': words.index.to_numpy(), 'word': words.to_numpy()}).drop_duplicates()
+
+
+class WatchlistMatcher:
+    """Company-name and keyword matcher compiled from the watchlist entries."""
+
+    def __init__(self, companies):
+        names = []
+        allowed = []
+        self.keyword_spelling = {}
+        self.unfiltered = set()
+        for company in companies:
+            name = str(company.get('name') or '').lower()
+            names.append(name)
+            keywords = [str(k) for k in (company.get('keywords') or [])]
+            if not keywords or any(not k for k in keywords):
+                self.unfiltered.add(name)
+                continue
+            for keyword in keywords:
+                allowed.append((name, keyword.lower()))
+                self.keyword_spelling.setdefault(keyword.lower(), keyword)
+        self.names = _Vocabulary(names)
+        self.keywords = _Vocabulary(kw for _, kw in allowed)
+        self.allowed = pd.DataFrame(allowed, columns=['name', 'word']).drop_duplicates()
+
+    def route(self, jobs, names):
+        """
+        For rows returned by a query that searched for several companies at once,
+        return the watchlist name (from `names`) found in each row's `company`,
+        preferring the longest, or None when none of them occurs.
+        """
+        spelling = {str(n).lower(): n for n in names}
+        hits = self.names.pairs(jobs['company'].reset_index(drop=True))
+        hits = hits[hits['word'].isin(spelling)]
+        hits = hits.assign(length=hits['word'].str.len()).sort_values(['row', 'length'], ascending=[True, False])
+        best = hits.drop_duplicates('row').set_index('row')['word'].map(spelling)
+        routed = best.reindex(range(len(jobs))).astype(object)
+        return pd.Series(routed.where(routed.notna(), None).to_numpy(), index=jobs.index)
+
+    def _keyword_pairs(self, jobs, rows, index):
+        """(row, keyword) for every keyword found in the titles of `rows`."""
+        titles = jobs['title'].iloc[rows]
+        if index is None:
+            return self.keywords.pairs(titles)
+        # Keywords long enough for the index's trigrams are looked up there; short
+        # keywords and rows without a job_url go through the regex
+        urls = jobs['job_url'].iloc[rows] if 'job_url' in jobs.columns else pd.Series(None, index=titles.index)
+        indexed = [w for w in self.keywords.words if len(w) >= MIN_TRIGRAM_CHARS]
+        by_url = index.match_titles(urls.dropna(), indexed)
+        url_rows = pd.DataFrame({'row': urls.index, 'job_url': urls.astype(object).to_numpy()}).dropna()
+        pairs = [url_rows.merge(by_url, on='job_url')[['row', 'word']]]
+        unindexed = urls.isna().to_numpy()
+        short = _Vocabulary(w for w in self.keywords.words if len(w) < MIN_TRIGRAM_CHARS)
+        pairs.append(short.pairs(titles[~unindexed]))
+        pairs.append(self.keywords.pairs(titles[unindexed]))
+        return pd.concat(pairs, ignore_index=True).drop_duplicates()
+
+    def filter(self, jobs, company_col='monitored_company', index=None):
+        """
+        Keep the rows of `jobs` that match the watchlist company in `company_col`
+        (the company that was searched for) and tag them with 'matched_keyword'.
+
+        With index (a search_index.JobIndex that already holds these postings),
+        title keywords are looked up in its trigram index instead of scanning
+        the titles.
+        """
+        if jobs.empty:
+            return jobs.assign(matched_keyword=pd.Series(dtype=object))
+        jobs = jobs.reset_index(drop=True)
+        searched = jobs[company_col].astype(str).str.lower()
+
+        # Company filter: the searched-for name must occur in the company column
+        name_hits = self.names.pairs(jobs['company'])
+        rows = name_hits[name_hits['word'].to_numpy() == searched.to_numpy()[name_hits['row'].to_numpy()]]['row']
+        rows = pd.Index(rows.unique()).sort_values()
+
+        # Keyword filter: only for companies that have keywords
+        keep_all = searched[rows].isin(self.unfiltered)
+        need_kw = rows[~keep_all.to_numpy()]
+        kw_hits = self._keyword_pairs(jobs, need_kw, index)
+        kw_hits = kw_hits.assign(name=searched.to_numpy()[kw_hits['row'].to_numpy()])
+        kw_hits = kw_hits.merge(self.allowed, on=['name', 'word']).drop_duplicates('row')
+        matched = pd.Series(kw_hits['word'].map(self.keyword_spelling).to_numpy(), index=kw_hits['row'].to_numpy())
+
+        keep = rows[keep_all.to_numpy()].union(pd.Index(matched.index)).sort_values()
+        result = jobs.loc[keep].copy()
+        matched = matched.reindex(keep).astype(object)
+        result['matched_keyword'] = matched.where(matched.notna(), None).to_numpy()
+        return result.reset_index(drop=True)